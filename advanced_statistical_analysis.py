@@ -20,6 +20,11 @@ from plotly.subplots import make_subplots
 import warnings
 warnings.filterwarnings('ignore')
 
+from grouped_arrays import GroupedArrays
+from posthoc import posthoc_table
+from model_tournament import run_tournament, tournament_summary
+from clustering import make_kmeans, find_optimal_k, clustering_score
+
 class AdvancedStatisticalAnalyzer:
     def __init__(self, df):
         """
@@ -71,60 +76,41 @@ class AdvancedStatisticalAnalyzer:
         if column not in self.df.columns or group_column not in self.df.columns:
             return None
         
-        groups = self.df[group_column].unique()
-        group_data = [self.df[self.df[group_column] == group][column].dropna() for group in groups]
-        group_data = [g for g in group_data if len(g) > 0]
+        # Groupes construits en un seul passage: chaque groupe est une vue sans copie
+        grouped = GroupedArrays(self.df, column, group_column)
+        groups = grouped.labels
+        group_data = grouped.arrays()
         
         if len(group_data) < 2:
             return None
         
-        # Test principal
-        statistic, p_value = stats.kruskal(*group_data)
+        # Test principal (rangs calculés une seule fois)
+        statistic, p_value = grouped.kruskal()
         
         # Effect size (eta-squared)
-        n_total = sum(len(g) for g in group_data)
+        n_total = grouped.n_total
         eta_squared = (statistic - len(groups) + 1) / (n_total - len(groups))
         
-        # Post-hoc tests (Mann-Whitney U)
+        # Post-hoc sur toutes les paires: Mann-Whitney U et Dunn, correction de Holm
         post_hoc_results = []
-        for i in range(len(groups)):
-            for j in range(i+1, len(groups)):
-                group1_name, group2_name = groups[i], groups[j]
-                group1_data, group2_data = group_data[i], group_data[j]
-                
-                u_stat, u_p_value = stats.mannwhitneyu(group1_data, group2_data, alternative='two-sided')
-                
-                # Effect size pour Mann-Whitney (r)
-                n1, n2 = len(group1_data), len(group2_data)
-                r_effect = 1 - (2 * u_stat) / (n1 * n2)
-                
-                post_hoc_results.append({
-                    'group1': group1_name,
-                    'group2': group2_name,
-                    'u_statistic': u_stat,
-                    'p_value': u_p_value,
-                    'effect_size_r': abs(r_effect),
-                    'significant': u_p_value < 0.05,
-                    'mean_diff': group1_data.mean() - group2_data.mean()
-                })
+        for row in posthoc_table(grouped).itertuples(index=False):
+            post_hoc_results.append({
+                'group1': groups[row.i],
+                'group2': groups[row.j],
+                'u_statistic': row.u_statistic,
+                'p_value': row.p_value,
+                'p_value_holm': row.p_value_adjusted,
+                'effect_size_r': row.effect_size_r,
+                'significant': row.p_value < 0.05,
+                'significant_holm': row.p_value_adjusted < 0.05,
+                'dunn_z': row.dunn_z,
+                'dunn_p_value_holm': row.dunn_p_value_adjusted,
+                'dunn_p_value_bh': row.dunn_p_value_bh,
+                'mean_diff': row.mean_diff
+            })
         
         # Statistiques descriptives par groupe
-        descriptive_stats = []
-        for i, group in enumerate(groups):
-            data = group_data[i]
-            descriptive_stats.append({
-                'group': group,
-                'n': len(data),
-                'mean': data.mean(),
-                'median': data.median(),
-                'std': data.std(),
-                'q25': data.quantile(0.25),
-                'q75': data.quantile(0.75),
-                'min': data.min(),
-                'max': data.max(),
-                'skewness': stats.skew(data),
-                'kurtosis': stats.kurtosis(data)
-            })
+        descriptive_stats = [grouped.describe(i) for i in range(len(groups))]
         
         result = {
             'test_name': 'Kruskal-Wallis Advanced',
@@ -294,9 +280,6 @@ class AdvancedStatisticalAnalyzer:
         # Standardiser les features
         X_scaled = self.scaler.fit_transform(X)
         
-        # Diviser en train/test
-        X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-        
         # Modèles à tester
         models = {
             'Linear Regression': LinearRegression(),
@@ -306,15 +289,16 @@ class AdvancedStatisticalAnalyzer:
             'Gradient Boosting': GradientBoostingRegressor(n_estimators=100, random_state=42)
         }
         
+        # Entraînement et validation croisée de tous les modèles en parallèle
+        tournament = run_tournament(models, X_scaled, y, cv=5, test_size=0.2, random_state=42)
+        y_train, y_test = tournament['y_train'], tournament['y_test']
+        
         model_results = {}
         
-        for name, model in models.items():
-            # Entraîner le modèle
-            model.fit(X_train, y_train)
-            
-            # Prédictions
-            y_pred_train = model.predict(X_train)
-            y_pred_test = model.predict(X_test)
+        for name, fitted in tournament['models'].items():
+            model = fitted['model']
+            y_pred_train = fitted['y_pred_train']
+            y_pred_test = fitted['y_pred_test']
             
             # Métriques
             train_r2 = r2_score(y_train, y_pred_train)
@@ -324,8 +308,8 @@ class AdvancedStatisticalAnalyzer:
             train_mae = mean_absolute_error(y_train, y_pred_train)
             test_mae = mean_absolute_error(y_test, y_pred_test)
             
-            # Validation croisée
-            cv_scores = cross_val_score(model, X_scaled, y, cv=5, scoring='r2')
+            # Validation croisée (plis calculés par le tournoi)
+            cv_scores = fitted['cv_r2']
             
             # Feature importance (si disponible)
             feature_importance = None
@@ -344,9 +328,14 @@ class AdvancedStatisticalAnalyzer:
                 'cv_mean': cv_scores.mean(),
                 'cv_std': cv_scores.std(),
                 'feature_importance': feature_importance,
-                'overfitting': train_r2 - test_r2 > 0.1
+                'overfitting': train_r2 - test_r2 > 0.1,
+                'fit_time': fitted['fit_seconds'],
+                'cv_fit_time': fitted['cv_fit_seconds']
             }
         
+        if not model_results:
+            return None
+        
         # Sélectionner le meilleur modèle
         best_model = max(model_results.keys(), key=lambda x: model_results[x]['test_r2'])
         
@@ -374,6 +363,7 @@ class AdvancedStatisticalAnalyzer:
             'models_comparison': model_results,
             'best_model': best_model,
             'best_model_performance': model_results[best_model],
+            'tournament': tournament_summary(tournament),
             'residual_analysis': {
                 'shapiro_statistic': shapiro_stat,
                 'shapiro_p_value': shapiro_p,
@@ -389,9 +379,12 @@ class AdvancedStatisticalAnalyzer:
         self.results['advanced_regression'] = result
         return result
     
-    def cluster_analysis(self, columns, n_clusters=None):
+    def cluster_analysis(self, columns, n_clusters=None, criterion='silhouette'):
         """
         Analyse de clustering pour segmenter les données
+        
+        criterion: 'silhouette' (échantillonnée sur les grands volumes) ou
+        'calinski_harabasz' pour choisir le nombre de clusters
         """
         if not all(col in self.df.columns for col in columns):
             return None
@@ -405,13 +398,20 @@ class AdvancedStatisticalAnalyzer:
         # Standardiser les données
         data_scaled = self.scaler.fit_transform(data)
         
-        # Déterminer le nombre optimal de clusters
+        # Déterminer le nombre optimal de clusters (le modèle retenu est réutilisé)
+        k_selection = None
         if n_clusters is None:
-            n_clusters = self._find_optimal_clusters(data_scaled)
+            k_selection = self._find_optimal_clusters(data_scaled, criterion=criterion)
+            if k_selection is None:
+                # Aucune partition valide (une seule valeur distincte, par exemple)
+                return None
+            n_clusters = k_selection['best_k']
+            kmeans = k_selection['model']
+        else:
+            kmeans = make_kmeans(n_clusters, len(data_scaled)).fit(data_scaled)
         
-        # K-means clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        clusters = kmeans.fit_predict(data_scaled)
+        # Affectation de toutes les lignes en un seul predict vectorisé
+        clusters = kmeans.predict(data_scaled)
         
         # Ajouter les clusters au DataFrame
         self.df.loc[data.index, 'cluster'] = clusters
@@ -440,6 +440,12 @@ class AdvancedStatisticalAnalyzer:
             'pca_components': pca.components_,
             'pca_explained_variance': pca.explained_variance_ratio_,
             'silhouette_score': self._calculate_silhouette_score(data_scaled, clusters),
+            'clustering_method': type(kmeans).__name__,
+            'k_selection': {
+                'criterion': k_selection['criterion'],
+                'scores': k_selection['scores'],
+                'inertias': k_selection['inertias']
+            } if k_selection else None,
             'interpretation': self._cluster_interpretation(cluster_analysis),
             'recommendations': self._generate_cluster_recommendations(cluster_analysis)
         }
@@ -447,24 +453,14 @@ class AdvancedStatisticalAnalyzer:
         self.results['cluster_analysis'] = result
         return result
     
-    def _find_optimal_clusters(self, data, max_clusters=10):
-        """Trouve le nombre optimal de clusters avec la méthode du coude"""
-        from sklearn.metrics import silhouette_score
-        
-        silhouette_scores = []
-        for k in range(2, min(max_clusters + 1, len(data))):
-            kmeans = KMeans(n_clusters=k, random_state=42)
-            clusters = kmeans.fit_predict(data)
-            score = silhouette_score(data, clusters)
-            silhouette_scores.append(score)
-        
-        return silhouette_scores.index(max(silhouette_scores)) + 2
+    def _find_optimal_clusters(self, data, max_clusters=10, criterion='silhouette'):
+        """Trouve le nombre optimal de clusters (valeurs de k ajustées en parallèle)"""
+        return find_optimal_k(data, range(2, min(max_clusters + 1, len(data))), criterion=criterion)
     
     def _calculate_silhouette_score(self, data, clusters):
-        """Calcule le score de silhouette"""
+        """Calcule le score de silhouette (échantillonné sur les grands volumes)"""
         try:
-            from sklearn.metrics import silhouette_score
-            return silhouette_score(data, clusters)
+            return clustering_score(data, clusters, 'silhouette')
         except:
             return None
     
@@ -89,6 +89,13 @@ class AIAssistant:
                 context += f"Corrélation de Spearman: r = {result['correlation']:.3f}, "
                 context += f"p-value = {result['p_value']:.4f}\n"
             
+            elif test_name == 'correlation_matrix':
+                context += f"Corrélations les plus fortes ({result['method']}): "
+                context += ", ".join(
+                    f"{pair['columns'][0]}/{pair['columns'][1]} r = {pair['correlation']:.3f}"
+                    for pair in result['top_pairs']
+                ) + "\n"
+            
             elif test_name == 'chi2':
                 context += f"Test du Chi-carré: χ² = {result['chi2_statistic']:.2f}, "
                 context += f"p-value = {result['p_value']:.4f}\n"
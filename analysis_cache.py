@@ -0,0 +1,189 @@
+"""
+Module de cache des résultats d'analyse
+Les résultats sont indexés par l'empreinte des colonnes utilisées et les
+paramètres de l'appel: une analyse identique (même session, autre session ou
+après redémarrage si la persistance disque est activée) est servie sans calcul.
+
+Les fichiers du cache disque sont des pickles: les relire revient à exécuter
+du code. Chaque fichier est donc signé (HMAC-SHA256 de la clé et du contenu
+avec ANALYSIS_CACHE_SECRET) et un fichier dont la signature ne correspond pas
+est ignoré sans être désérialisé. Sans secret, la persistance disque reste
+désactivée. Le répertoire ne doit de toute façon être accessible en écriture
+qu'à l'application.
+"""
+
+import os
+import json
+import pickle
+import hmac
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+from utils import dataframe_fingerprint
+
+load_dotenv()
+
+# Limites du cache en mémoire
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '256'))
+ANALYSIS_CACHE_MAX_MB = float(os.getenv('ANALYSIS_CACHE_MAX_MB', '256'))
+# Répertoire de persistance sur disque (vide = désactivée)
+ANALYSIS_CACHE_DIR = os.getenv('ANALYSIS_CACHE_DIR', '')
+ANALYSIS_CACHE_MAX_DISK_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_DISK_ENTRIES', '1000'))
+# Secret de signature des fichiers du cache disque (obligatoire pour la persistance)
+ANALYSIS_CACHE_SECRET = os.getenv('ANALYSIS_CACHE_SECRET', '')
+SIGNATURE_BYTES = hashlib.sha256().digest_size
+
+
+def analysis_key(name, df, columns, params=None):
+    """
+    Construit la clé d'une analyse
+
+    Parameters:
+    name (str): Nom de l'analyse
+    df (pd.DataFrame): Données analysées
+    columns (list): Colonnes dont dépend le résultat
+    params (dict): Autres paramètres de l'appel
+
+    Returns:
+    str: Clé SHA-256 hexadécimale
+    """
+    payload = json.dumps({
+        'analysis': name,
+        'columns': [str(col) for col in columns],
+        'params': params or {},
+        'data': dataframe_fingerprint(df, columns),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """Cache LRU borné en nombre d'entrées et en mémoire, avec persistance optionnelle"""
+
+    def __init__(self, max_entries=ANALYSIS_CACHE_MAX_ENTRIES, max_mb=ANALYSIS_CACHE_MAX_MB,
+                 cache_dir=ANALYSIS_CACHE_DIR, max_disk_entries=ANALYSIS_CACHE_MAX_DISK_ENTRIES,
+                 secret=ANALYSIS_CACHE_SECRET):
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024**2)
+        self.secret = secret.encode('utf-8') if secret else None
+        # Pas de secret, pas de persistance: un fichier non signé ne doit jamais être relu
+        self.cache_dir = (cache_dir or None) if self.secret else None
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()  # clé -> (résultat sérialisé, taille)
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _signature(self, key, payload):
+        return hmac.new(self.secret, key.encode('utf-8') + payload, hashlib.sha256).digest()
+
+    def _read_disk(self, key):
+        """Contenu d'un fichier du cache si sa signature est valide (None sinon)"""
+        try:
+            with open(self._disk_path(key), 'rb') as handle:
+                data = handle.read()
+        except OSError:
+            return None
+        signature, payload = data[:SIGNATURE_BYTES], data[SIGNATURE_BYTES:]
+        if not hmac.compare_digest(signature, self._signature(key, payload)):
+            return None
+        return payload
+
+    def get(self, key):
+        """Retourne le résultat en cache (une copie indépendante) ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return pickle.loads(entry[0])
+
+        if self.cache_dir:
+            payload = self._read_disk(key)
+            if payload is not None:
+                try:
+                    value = pickle.loads(payload)
+                except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                    pass
+                else:
+                    self._store(key, payload)
+                    with self._lock:
+                        self.stats['disk_hits'] += 1
+                    return value
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, value):
+        """Ajoute un résultat (ignoré s'il n'est pas sérialisable)"""
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        self._store(key, payload)
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), 'wb') as handle:
+                    handle.write(self._signature(key, payload) + payload)
+                self._prune_disk()
+            except OSError:
+                pass
+
+    def _store(self, key, payload):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous[1]
+            self._entries[key] = (payload, size)
+            self._size_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self.stats['evictions'] += 1
+
+    def _prune_disk(self):
+        """Supprime les fichiers les plus anciens au-delà de max_disk_entries"""
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith('.pkl')]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get_or_compute(self, key, compute):
+        """Retourne le résultat en cache ou le calcule et le met en cache"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'size_mb': self._size_bytes / 1024**2}
+
+
+# Cache partagé par toutes les sessions du processus
+analysis_cache = AnalysisCache()
@@ -41,6 +41,7 @@ except (ImportError, KeyError, ModuleNotFoundError) as e:
 
 try:
     from visualizations import DataVisualizer
+    from plot_downsampling import SCATTER_POINT_BUDGET
 except (ImportError, KeyError, ModuleNotFoundError) as e:
     import_errors.append(f"visualizations: {e}")
 
@@ -54,6 +55,11 @@ try:
 except (ImportError, KeyError, ModuleNotFoundError) as e:
     import_errors.append(f"notifications: {e}")
 
+try:
+    from data_loader import load_csv, should_stream, MemoryLimitExceeded
+except (ImportError, KeyError, ModuleNotFoundError) as e:
+    import_errors.append(f"data_loader: {e}")
+
 # Afficher les erreurs d'import si nécessaire
 if import_errors:
     st.error("❌ Erreurs lors du chargement des modules:")
@@ -2528,8 +2534,33 @@ def show_upload_page():
     if uploaded_file is not None:
         try:
             # Lire le fichier selon son extension
+            streamed = False
             if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
+                if should_stream(uploaded_file):
+                    # Gros fichier: lecture par blocs une seule fois; un seul DataFrame est
+                    # gardé (st.session_state.df) et réutilisé tel quel par les reruns
+                    upload_key = (uploaded_file.name, uploaded_file.size)
+                    current = st.session_state.get('df')
+                    if current is not None and current.attrs.get('ingestion', {}).get('upload_key') == upload_key:
+                        df = current
+                    else:
+                        # Libérer le jeu précédent avant de lire le nouveau
+                        st.session_state.df = None
+                        st.session_state.analyzer = None
+                        progress_bar = st.progress(0.0, text="Lecture du fichier par blocs...")
+                        df = load_csv(
+                            uploaded_file,
+                            progress_callback=lambda fraction, rows: progress_bar.progress(
+                                fraction, text=f"Lecture du fichier par blocs... {rows:,} lignes"
+                            )
+                        )
+                        progress_bar.empty()
+                        df.attrs.setdefault('ingestion', {})['upload_key'] = upload_key
+                        st.session_state.df = df
+                        st.session_state.analyzer = StatisticalAnalyzer(df)
+                    streamed = True
+                else:
+                    df = pd.read_csv(uploaded_file)
             else:
                 df = pd.read_excel(uploaded_file)
             
@@ -2573,7 +2604,7 @@ def show_upload_page():
                 """, unsafe_allow_html=True)
             
             with col2:
-                cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+                cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
                 st.markdown(f"""
                 <div style="background: white; padding: 1.5rem; border-radius: 15px;
                             box-shadow: 0 4px 20px rgba(0,0,0,0.08);">
@@ -2614,10 +2645,17 @@ def show_upload_page():
                 if remove_na:
                     df = df.dropna()
                 
-                # Calculer l'engagement
-                if calculate_engagement:
+                # Calculer l'engagement (déjà fait bloc par bloc en streaming, uniquement
+                # quand le fichier n'avait pas sa propre colonne engagement_rate)
+                engagement_streamed = (streamed and 'engagement_rate' in df.columns
+                                       and df.attrs.get('ingestion', {}).get('engagement_computed'))
+                if calculate_engagement and not engagement_streamed:
                     analyzer = StatisticalAnalyzer(df)
                     df = analyzer.calculate_engagement_rate()
+                elif not calculate_engagement and engagement_streamed:
+                    # Colonne créée pendant la lecture: la retirer sans copier le reste
+                    del df['engagement_rate']
+                    df.attrs['ingestion']['engagement_computed'] = False
                 
                 # Sauvegarder dans la session
                 st.session_state.df = df
@@ -2643,6 +2681,8 @@ def show_upload_page():
                     )
                     st.success(f"✅ Projet '{save_project}' sauvegardé!")
         
+        except MemoryLimitExceeded as e:
+            st.error(f"❌ Fichier trop volumineux: {str(e)}")
         except Exception as e:
             st.error(f"❌ Erreur lors de la lecture du fichier: {str(e)}")
     
@@ -2900,7 +2940,7 @@ def show_analysis_page():
             kw_column = st.selectbox("Métrique à comparer", numeric_cols, key="kw_col")
         
         with col2:
-            cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+            cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
             if cat_cols:
                 kw_group = st.selectbox("Grouper par", cat_cols, key="kw_group")
         
@@ -2959,7 +2999,7 @@ def show_analysis_page():
         st.markdown("#### Test du Chi-carré")
         st.info("Teste l'indépendance entre deux variables catégorielles")
         
-        cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+        cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
         
         if len(cat_cols) >= 2:
             col1, col2 = st.columns(2)
@@ -3097,14 +3137,6 @@ def show_analysis_page():
                         else:
                             return obj
                     
-                    # Convertir le DataFrame en dictionnaire et nettoyer les types
-                    try:
-                        data_dict = df.to_dict('records')
-                        data_dict = convert_numpy_types(data_dict)
-                    except Exception as e:
-                        st.error(f"❌ Erreur lors de la conversion des données: {str(e)}")
-                        return
-                    
                     # Récupérer les résultats d'analyse si disponibles
                     results_dict = None
                     if analyzer:
@@ -3118,10 +3150,11 @@ def show_analysis_page():
                     
                     # Sauvegarder le projet
                     try:
+                        # Le DataFrame est passé tel quel: stockage en colonnes côté base
                         success = st.session_state.db.save_project(
                             st.session_state.user['id'],
                             project_name.strip(),
-                            data_dict,
+                            df,
                             results_dict
                         )
                         
@@ -3199,7 +3232,8 @@ def show_ai_assistant_page():
     </div>
     """, unsafe_allow_html=True)
     
-    # Obtenir les résultats d'analyse
+    # Obtenir les résultats d'analyse (avec les corrélations les plus fortes, en cache)
+    st.session_state.analyzer.correlation_overview()
     results = st.session_state.analyzer.get_all_results()
     
     if results:
@@ -3503,7 +3537,12 @@ def show_visualizations_page():
                     )
                 
                 try:
-                    if color_by != "Aucun" and color_by in st.session_state.df.columns:
+                    if len(st.session_state.df) > SCATTER_POINT_BUDGET:
+                        # Grands volumes: échantillon WebGL ou densité, tendance sur toutes les lignes
+                        fig_scatter = visualizer.plot_scatter_with_regression(
+                            x_col, y_col, group_by=color_by if color_by != "Aucun" else None
+                        )
+                    elif color_by != "Aucun" and color_by in st.session_state.df.columns:
                         fig_scatter = px.scatter(
                             st.session_state.df,
                             x=x_col,
@@ -3547,7 +3586,18 @@ def show_visualizations_page():
                                          key="time_metric")
                 
                 try:
-                    fig_time = visualizer.plot_time_series(date_col, metric_col)
+                    # Fenêtre affichée: une période plus courte est rendue plus finement
+                    window = (None, None)
+                    bounds = visualizer.time_series_bounds(date_col, metric_col)
+                    if bounds and bounds[0] < bounds[1]:
+                        window = st.slider(
+                            "Période affichée",
+                            min_value=bounds[0].to_pydatetime(),
+                            max_value=bounds[1].to_pydatetime(),
+                            value=(bounds[0].to_pydatetime(), bounds[1].to_pydatetime()),
+                            key="time_window"
+                        )
+                    fig_time = visualizer.plot_time_series(date_col, metric_col, start=window[0], end=window[1])
                     if fig_time:
                         st.plotly_chart(fig_time, use_container_width=True, key="time_series")
                 except Exception as e:
@@ -3912,6 +3962,15 @@ def show_projects_page():
             created_date = project['created_at'][:10] if len(project.get('created_at', '')) > 10 else project.get('created_at', 'N/A')
             updated_date = project['updated_at'][:10] if len(project.get('updated_at', '')) > 10 else project.get('updated_at', 'N/A')
             
+            # Métadonnées calculées à la sauvegarde (les données ne sont pas lues ici)
+            if project.get('row_count') is not None:
+                size_info = (f"{project['row_count']:,} lignes • {project.get('column_count') or 0} colonnes • "
+                             f"{(project.get('data_size_bytes') or 0) / 1024**2:.1f} Mo")
+            else:
+                size_info = "N/A"
+            analysis_summary = project.get('analysis_summary') or {}
+            analyses_info = ', '.join(entry['test'] for entry in analysis_summary.values()) or "Aucune"
+            
             st.markdown(f"""
             <div style="background: white; padding: 1.5rem; border-radius: 15px;
                         box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 1.5rem;
@@ -3920,6 +3979,8 @@ def show_projects_page():
                 <div style="color: #6b7280; font-size: 0.9rem; margin-bottom: 1rem;">
                     <p style="margin: 0.25rem 0;"><strong>Créé:</strong> {created_date}</p>
                     <p style="margin: 0.25rem 0;"><strong>Dernière modification:</strong> {updated_date}</p>
+                    <p style="margin: 0.25rem 0;"><strong>Données:</strong> {size_info}</p>
+                    <p style="margin: 0.25rem 0;"><strong>Analyses:</strong> {analyses_info}</p>
                 </div>
             </div>
             """, unsafe_allow_html=True)
@@ -3931,17 +3992,21 @@ def show_projects_page():
             
             with col2:
                 if st.button("📂 Charger", key=f"load_{project['id']}", use_container_width=True):
-                    loaded_project = st.session_state.db.load_project(
+                    # Seules les données sont lues: les résultats sont recalculés à la demande
+                    loaded_data = st.session_state.db.load_project_data(
                         st.session_state.user['id'],
                         project['project_name']
                     )
                     
-                    if loaded_project:
+                    if loaded_data is not None:
                         try:
-                            # Restaurer le DataFrame
-                            data_list = loaded_project['data']
-                            if data_list:
-                                st.session_state.df = pd.DataFrame(data_list)
+                            # Restaurer le DataFrame (format colonnes ou JSON historique)
+                            if isinstance(loaded_data, pd.DataFrame):
+                                restored_df = loaded_data
+                            else:
+                                restored_df = pd.DataFrame(loaded_data) if isinstance(loaded_data, list) else None
+                            if restored_df is not None and not restored_df.empty:
+                                st.session_state.df = restored_df
                                 
                                 # Recréer l'analyzer avec les données restaurées
                                 if st.session_state.df is not None:
@@ -3979,7 +4044,7 @@ def show_projects_page():
                         if st.button("✅ Oui, supprimer", key=f"confirm_{delete_key}", use_container_width=True):
                             success = st.session_state.db.delete_project(
                                 st.session_state.user['id'],
-                                project['id']
+                                project['project_name']
                             )
                             
                             if success:
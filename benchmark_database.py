@@ -0,0 +1,119 @@
+"""
+Benchmark de la base de données sous charge concurrente
+Simule N sessions Streamlit qui se connectent, lisent leurs préférences et
+sauvegardent un projet en parallèle.
+
+Usage:
+    python benchmark_database.py --sessions 16 --iterations 5
+    python benchmark_database.py --legacy   # moteur SQLite sans pool ni WAL
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+import database
+from database import Database
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+def simulate_session(db, session_index, iterations, n_rows, timings, errors, lock):
+    """Une session: création de compte, connexion, lectures de préférences, sauvegardes"""
+    email = f"session{session_index}@benchmark.local"
+    rng = np.random.default_rng(session_index)
+    df = pd.DataFrame({
+        'platform': rng.choice(['TikTok', 'Instagram', 'YouTube'], n_rows),
+        'likes': rng.integers(100, 5000, n_rows),
+        'engagement_rate': rng.uniform(0, 10, n_rows),
+    })
+
+    def timed(operation, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            with lock:
+                errors.append(f"{operation}: {e}")
+            return None
+        with lock:
+            timings[operation].append(time.perf_counter() - start)
+        return result
+
+    timed('create_user', db.create_user, email, 'benchmark')
+    for iteration in range(iterations):
+        user = timed('login', db.authenticate_user, email, 'benchmark')
+        if not user:
+            continue
+        for _ in range(5):
+            timed('preferences', db.get_user_preferences, user['id'])
+        df.loc[iteration % n_rows, 'likes'] += 1
+        saved = timed('save_project', db.save_project, user['id'], f"Projet {iteration % 2}", df)
+        if saved is False:
+            with lock:
+                errors.append("save_project: échec de la sauvegarde")
+
+
+def run_benchmark(sessions, iterations, n_rows, legacy=False):
+    """
+    Lance le benchmark et affiche les latences par opération
+
+    Returns:
+    dict: Statistiques (débit, latences, erreurs)
+    """
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    db_url = f"sqlite:///{db_path}"
+    os.environ['DATABASE_URL'] = db_url
+    try:
+        db = Database()
+    finally:
+        del os.environ['DATABASE_URL']
+
+    if legacy:
+        # Comportement d'origine: moteur dédié, pas de PRAGMA, pas de file d'écriture
+        db.engine = create_engine(db_url, echo=False, connect_args={"check_same_thread": False})
+        database._writer_locks.pop(db_url, None)
+
+    timings = {op: [] for op in ('create_user', 'login', 'preferences', 'save_project')}
+    errors = []
+    lock = threading.Lock()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        for index in range(sessions):
+            executor.submit(simulate_session, db, index, iterations, n_rows, timings, errors, lock)
+    elapsed = time.perf_counter() - start
+    total_operations = sum(len(values) for values in timings.values())
+
+    mode = "historique" if legacy else "pool + WAL + file d'écriture"
+    print(f"📊 {sessions} sessions x {iterations} itérations ({mode})")
+    print("=" * 60)
+    for operation, values in timings.items():
+        print(f"  {operation:<14} n={len(values):<5} p50={percentile(values, 50):7.1f} ms "
+              f"p95={percentile(values, 95):7.1f} ms")
+    print(f"  Débit: {total_operations / elapsed:.0f} opérations/s en {elapsed:.2f} s")
+    print(f"  Erreurs: {len(errors)}")
+    for message in errors[:5]:
+        print(f"    ❌ {message}")
+
+    db.engine.dispose()
+    database.dispose_engines()
+    return {'elapsed': elapsed, 'operations': total_operations, 'errors': errors, 'timings': timings}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de sessions concurrentes")
+    parser.add_argument('--sessions', type=int, default=16)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--legacy', action='store_true', help="Moteur sans pool, WAL ni file d'écriture")
+    args = parser.parse_args()
+    run_benchmark(args.sessions, args.iterations, args.rows, legacy=args.legacy)
@@ -0,0 +1,92 @@
+"""
+Benchmark du regroupement pour la famille Kruskal-Wallis
+Compare la construction historique des groupes (un masque booléen par groupe)
+au regroupement en un seul passage de GroupedArrays.
+
+Usage:
+    python benchmark_kruskal.py --rows 1000000 --groups 50
+    python benchmark_kruskal.py --rows 100000 --groups 40 --posthoc
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from grouped_arrays import GroupedArrays
+from posthoc import mann_whitney_all_pairs
+
+
+def create_data(n_rows, n_groups, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'platform': rng.choice([f"groupe_{i}" for i in range(n_groups)], n_rows),
+        'engagement_rate': rng.gamma(2.0, 2.0, n_rows),
+    })
+
+
+def masked_groups(df, column, group_column):
+    """Construction historique: O(n·k), une copie par groupe"""
+    groups = df[group_column].unique()
+    group_data = [df[df[group_column] == group][column].dropna() for group in groups]
+    return [g for g in group_data if len(g) > 0]
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmark(n_rows, n_groups):
+    df = create_data(n_rows, n_groups)
+    print(f"📊 Kruskal-Wallis sur {n_rows:,} lignes x {n_groups} groupes")
+    print("=" * 60)
+
+    masked_time, group_data = timed(lambda: masked_groups(df, 'engagement_rate', 'platform'))
+    grouped_time, grouped = timed(lambda: GroupedArrays(df, 'engagement_rate', 'platform'))
+    print(f"  Regroupement par masques : {masked_time * 1000:8.1f} ms")
+    print(f"  Regroupement en un passage: {grouped_time * 1000:8.1f} ms "
+          f"(x{masked_time / grouped_time:.1f})")
+
+    scipy_time, scipy_result = timed(lambda: stats.kruskal(*group_data))
+    ranks_time, ranks_result = timed(lambda: GroupedArrays(df, 'engagement_rate', 'platform').kruskal())
+    print(f"  stats.kruskal sur les groupes: {scipy_time * 1000:8.1f} ms")
+    print(f"  Regroupement + rangs communs : {ranks_time * 1000:8.1f} ms")
+
+    assert np.isclose(scipy_result[0], ranks_result[0])
+    total_before = masked_time + scipy_time
+    print(f"  Total: {total_before * 1000:.0f} ms -> {ranks_time * 1000:.0f} ms "
+          f"(x{total_before / ranks_time:.1f}), statistique identique")
+
+
+def run_posthoc_benchmark(n_rows, n_groups):
+    df = create_data(n_rows, n_groups)
+    grouped = GroupedArrays(df, 'engagement_rate', 'platform')
+    n_pairs = len(grouped) * (len(grouped) - 1) // 2
+    print(f"📊 Mann-Whitney sur {n_pairs} paires")
+
+    def pair_loop():
+        return [stats.mannwhitneyu(grouped.array(i), grouped.array(j), alternative='two-sided')
+                for i in range(len(grouped)) for j in range(i + 1, len(grouped))]
+
+    loop_time, _ = timed(pair_loop, repeat=1)
+    vectorized_time, _ = timed(lambda: mann_whitney_all_pairs(grouped), repeat=1)
+    print(f"  Boucle sur les paires : {loop_time * 1000:8.1f} ms")
+    print(f"  Toutes paires vectorisé: {vectorized_time * 1000:8.1f} ms (x{loop_time / vectorized_time:.1f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du regroupement Kruskal-Wallis")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--groups', type=int, default=50)
+    parser.add_argument('--posthoc', action='store_true', help="Mesurer aussi les post-hoc sur toutes les paires")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.groups)
+    if args.posthoc:
+        run_posthoc_benchmark(args.rows, args.groups)
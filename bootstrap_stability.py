@@ -0,0 +1,99 @@
+"""
+Module de bootstrap de stabilité des modèles
+Tous les indices de rééchantillonnage sont tirés d'un coup (matrice d'entiers,
+générateur initialisé) puis des copies du modèle sont ajustées en parallèle,
+par lots. Chaque copie est évaluée sur ses observations hors sac (out-of-bag);
+l'échantillonnage s'arrête dès que la largeur de l'intervalle de confiance
+se stabilise.
+"""
+
+import os
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Processus utilisés pour les ajustements (-1 = tous les cœurs)
+BOOTSTRAP_N_JOBS = int(os.getenv('BOOTSTRAP_N_JOBS', '-1'))
+# Variation relative de la largeur de l'IC en dessous de laquelle on s'arrête (0 = jamais)
+BOOTSTRAP_CI_TOLERANCE = float(os.getenv('BOOTSTRAP_CI_TOLERANCE', '0.05'))
+# Nombre de rééchantillonnages avant de tester la convergence
+BOOTSTRAP_MIN_RESAMPLES = 30
+BOOTSTRAP_BATCH_SIZE = 10
+
+
+def draw_indices(n, n_bootstrap, seed=42):
+    """Matrice (n_bootstrap x n) des indices tirés avec remise"""
+    dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+    return np.random.default_rng(seed).integers(0, n, size=(n_bootstrap, n), dtype=dtype)
+
+
+def _oob_score(model, X, y, indices):
+    """Ajuste une copie sur le rééchantillon et l'évalue hors sac (R²)"""
+    out_of_bag = np.ones(len(y), dtype=bool)
+    out_of_bag[indices] = False
+    if out_of_bag.sum() < 2:
+        return np.nan
+    estimator = clone(model)
+    estimator.fit(X[indices], y[indices])
+    return estimator.score(X[out_of_bag], y[out_of_bag])
+
+
+def _confidence_interval(scores, confidence):
+    alpha = (1 - confidence) / 2
+    low, high = np.nanquantile(scores, [alpha, 1 - alpha])
+    return low, high
+
+
+def bootstrap_scores(model, X, y, n_bootstrap=100, seed=42, n_jobs=None,
+                     ci_tolerance=None, confidence=0.95, batch_size=BOOTSTRAP_BATCH_SIZE):
+    """
+    R² hors sac d'un modèle sur des rééchantillonnages bootstrap
+
+    Le modèle fourni n'est jamais modifié: chaque rééchantillon ajuste une copie.
+
+    Parameters:
+    n_bootstrap (int): Nombre maximal de rééchantillonnages
+    seed (int): Graine du tirage des indices
+    n_jobs (int): Processus (BOOTSTRAP_N_JOBS par défaut)
+    ci_tolerance (float): Arrêt quand la largeur de l'IC varie de moins que cette
+        fraction d'un lot à l'autre (BOOTSTRAP_CI_TOLERANCE par défaut, 0 = jamais)
+
+    Returns:
+    dict: {'scores', 'ci_low', 'ci_high', 'n_resamples', 'early_stopped'}
+    """
+    n_jobs = BOOTSTRAP_N_JOBS if n_jobs is None else n_jobs
+    ci_tolerance = BOOTSTRAP_CI_TOLERANCE if ci_tolerance is None else ci_tolerance
+
+    X = np.asarray(X)
+    y = np.asarray(y)
+    indices = draw_indices(len(y), n_bootstrap, seed)
+
+    scores = []
+    previous_width = None
+    early_stopped = False
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for start in range(0, n_bootstrap, batch_size):
+            batch = indices[start:start + batch_size]
+            scores.extend(parallel(delayed(_oob_score)(model, X, y, rows) for rows in batch))
+
+            if ci_tolerance <= 0 or len(scores) < BOOTSTRAP_MIN_RESAMPLES or len(scores) >= n_bootstrap:
+                continue
+            low, high = _confidence_interval(scores, confidence)
+            width = high - low
+            if previous_width and abs(width - previous_width) <= ci_tolerance * previous_width:
+                early_stopped = True
+                break
+            previous_width = width
+
+    scores = np.array(scores, dtype=float)
+    ci_low, ci_high = _confidence_interval(scores, confidence)
+    return {
+        'scores': scores,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'n_resamples': len(scores),
+        'early_stopped': early_stopped
+    }
@@ -0,0 +1,91 @@
+"""
+Module de clustering K-means adapté aux grands volumes
+Les valeurs de k candidates sont ajustées en parallèle; au-delà d'un seuil de
+taille, MiniBatchKMeans remplace KMeans. Le choix de k utilise une silhouette
+calculée sur un échantillon (la silhouette exacte est quadratique en mémoire)
+ou le critère de Calinski-Harabasz (linéaire). Le modèle retenu est réutilisé
+pour affecter toutes les lignes en un seul predict vectorisé.
+"""
+
+import os
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score, calinski_harabasz_score
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Au-delà de ce nombre de lignes, MiniBatchKMeans est utilisé
+CLUSTERING_MINIBATCH_THRESHOLD = int(os.getenv('CLUSTERING_MINIBATCH_THRESHOLD', '20000'))
+# Taille de l'échantillon utilisé pour la silhouette
+SILHOUETTE_SAMPLE_SIZE = int(os.getenv('SILHOUETTE_SAMPLE_SIZE', '10000'))
+# Processus utilisés pour ajuster les valeurs de k (-1 = tous les cœurs)
+CLUSTERING_N_JOBS = int(os.getenv('CLUSTERING_N_JOBS', '-1'))
+# En dessous, ajuster les k en séquence coûte moins que démarrer les processus
+CLUSTERING_PARALLEL_MIN_ROWS = 5000
+MINIBATCH_SIZE = 4096
+CLUSTERING_CRITERIA = ('silhouette', 'calinski_harabasz')
+
+
+def make_kmeans(n_clusters, n_rows, random_state=42):
+    """KMeans, ou MiniBatchKMeans au-delà de CLUSTERING_MINIBATCH_THRESHOLD lignes"""
+    if n_rows > CLUSTERING_MINIBATCH_THRESHOLD:
+        return MiniBatchKMeans(n_clusters=n_clusters, batch_size=MINIBATCH_SIZE, n_init=3,
+                               random_state=random_state)
+    return KMeans(n_clusters=n_clusters, random_state=random_state)
+
+
+def clustering_score(data, labels, criterion='silhouette', random_state=42):
+    """
+    Qualité d'une partition
+
+    Parameters:
+    criterion (str): 'silhouette' (échantillonnée au-delà de SILHOUETTE_SAMPLE_SIZE
+        lignes) ou 'calinski_harabasz'
+
+    Returns:
+    float: Score (plus grand = meilleur), None si la partition n'a qu'un cluster
+    """
+    if len(np.unique(labels)) < 2:
+        return None
+    if criterion == 'calinski_harabasz':
+        return calinski_harabasz_score(data, labels)
+    if criterion != 'silhouette':
+        raise ValueError(f"Critère inconnu: {criterion}")
+    sample_size = SILHOUETTE_SAMPLE_SIZE if len(data) > SILHOUETTE_SAMPLE_SIZE else None
+    return silhouette_score(data, labels, sample_size=sample_size, random_state=random_state)
+
+
+def _fit_k(data, n_clusters, criterion):
+    model = make_kmeans(n_clusters, len(data))
+    labels = model.fit_predict(data)
+    return n_clusters, clustering_score(data, labels, criterion), model
+
+
+def find_optimal_k(data, k_range, criterion='silhouette', n_jobs=None):
+    """
+    Ajuste chaque k en parallèle et retient le meilleur score
+
+    Returns:
+    dict: {'best_k', 'model' (ajusté pour best_k), 'scores': {k: score},
+           'inertias': {k: inertie}, 'criterion', 'method'}, ou None si aucun k
+           ne donne une partition valide (trop peu de points distincts)
+    """
+    n_jobs = CLUSTERING_N_JOBS if n_jobs is None else n_jobs
+    if len(data) < CLUSTERING_PARALLEL_MIN_ROWS:
+        n_jobs = 1
+
+    fits = Parallel(n_jobs=n_jobs)(delayed(_fit_k)(data, k, criterion) for k in k_range)
+    scored = [(k, score, model) for k, score, model in fits if score is not None]
+    if not scored:
+        return None
+    best_k, _, best_model = max(scored, key=lambda fit: fit[1])
+    return {
+        'best_k': best_k,
+        'model': best_model,
+        'scores': {k: score for k, score, _ in fits},
+        'inertias': {k: model.inertia_ for k, _, model in fits},
+        'criterion': criterion,
+        'method': type(best_model).__name__
+    }
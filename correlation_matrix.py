@@ -0,0 +1,154 @@
+"""
+Module de matrices de corrélation partagées
+Chaque colonne numérique est rangée une seule fois; les matrices de Spearman
+(rangs) et de Pearson (valeurs) sont obtenues par un produit matriciel des
+colonnes centrées-réduites, et les p-values de toutes les paires par le test t
+associé. Le résultat est mis en cache par empreinte des colonnes: la heatmap,
+l'onglet Spearman et le contexte de l'assistant IA réutilisent le même calcul.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from analysis_cache import analysis_cache, analysis_key
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+
+def _pairwise_correlation(values):
+    """
+    Corrélations de Pearson sur les observations complètes de chaque paire
+
+    Sans valeur manquante, un seul produit des colonnes centrées-réduites; sinon
+    les sommes par paire sont obtenues par produits avec le masque des valeurs
+    présentes (comme DataFrame.corr).
+
+    Returns:
+    tuple: (matrice de corrélation, matrice des effectifs par paire)
+    """
+    present = np.isfinite(values)
+    if present.all():
+        n = len(values)
+        centered = values - values.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            standardized = centered / np.sqrt((centered ** 2).sum(axis=0))
+        corr = standardized.T @ standardized
+        return corr, np.full(corr.shape, n, dtype=float)
+
+    mask = present.astype(float)
+    # Centrage par la moyenne de chaque colonne (stabilité numérique)
+    filled = np.where(present, values - np.nanmean(values, axis=0), 0.0)
+    n = mask.T @ mask
+    sum_x = filled.T @ mask              # somme de x_i sur les lignes où x_j est présent
+    sum_xx = (filled ** 2).T @ mask
+    sum_xy = filled.T @ filled
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+    return corr, n
+
+
+def _p_values(corr, n):
+    """P-values bilatérales du test t de nullité de chaque corrélation"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dof = n - 2
+        t = corr * np.sqrt(dof / np.clip(1 - corr ** 2, 0, None))
+        p_values = 2 * stats.t.sf(np.abs(t), dof)
+    p_values[np.abs(corr) >= 1] = 0.0
+    p_values[np.isnan(corr) | (dof <= 0)] = np.nan
+    return p_values
+
+
+def _compute(df, columns):
+    values = df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    pearson, n = _pairwise_correlation(values)
+
+    # Rangs (ex-aequo moyennés) calculés une seule fois par colonne
+    present = np.isfinite(values)
+    ranks = np.full(values.shape, np.nan)
+    for j in range(len(columns)):
+        ranks[present[:, j], j] = stats.rankdata(values[present[:, j], j])
+    spearman, _ = _pairwise_correlation(ranks)
+
+    # Avec des valeurs manquantes, Spearman doit reclasser les seules lignes communes
+    incomplete = np.flatnonzero(~present.all(axis=0))
+    for i in incomplete:
+        for j in range(len(columns)):
+            if j == i:
+                continue
+            both = present[:, i] & present[:, j]
+            if both.sum() < 2:
+                continue
+            x, y = values[both, i], values[both, j]
+            if np.ptp(x) == 0 or np.ptp(y) == 0:
+                # Colonne constante sur les lignes communes: corrélation indéfinie
+                # (sans appeler spearmanr, qui émettrait un avertissement par paire)
+                spearman[i, j] = spearman[j, i] = np.nan
+            else:
+                spearman[i, j] = spearman[j, i] = stats.spearmanr(x, y)[0]
+
+    np.fill_diagonal(pearson, 1.0)
+    np.fill_diagonal(spearman, 1.0)
+
+    def frame(matrix):
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+
+    return {
+        'columns': list(columns),
+        'pearson': frame(pearson),
+        'spearman': frame(spearman),
+        'pearson_p': frame(_p_values(pearson, n)),
+        'spearman_p': frame(_p_values(spearman, n)),
+        'n': frame(n)
+    }
+
+
+def correlation_matrices(df, columns=None):
+    """
+    Matrices de corrélation de Pearson et de Spearman et leurs p-values (en cache)
+
+    Parameters:
+    df (pd.DataFrame): Données
+    columns (list): Colonnes (toutes les colonnes numériques par défaut)
+
+    Returns:
+    dict: {'columns', 'pearson', 'spearman', 'pearson_p', 'spearman_p', 'n'}
+    (DataFrames carrés), ou None avec moins de deux colonnes
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    columns = list(columns)
+    if len(columns) < 2:
+        return None
+    return analysis_cache.get_or_compute(
+        analysis_key('correlation_matrix', df, columns),
+        lambda: _compute(df, columns)
+    )
+
+
+def correlation_pair(matrices, column1, column2, method='spearman'):
+    """Corrélation, p-value et effectif d'une paire de colonnes"""
+    return (
+        matrices[method].loc[column1, column2],
+        matrices[f'{method}_p'].loc[column1, column2],
+        int(matrices['n'].loc[column1, column2])
+    )
+
+
+def strongest_pairs(matrices, method='spearman', top=5):
+    """Paires de colonnes les plus corrélées (en valeur absolue)"""
+    corr = matrices[method].to_numpy()
+    rows, cols = np.triu_indices(len(corr), k=1)
+    strength = np.abs(corr[rows, cols])
+    order = np.argsort(-np.nan_to_num(strength, nan=-1))[:top]
+    columns = matrices['columns']
+    return [
+        {
+            'columns': [columns[rows[k]], columns[cols[k]]],
+            'correlation': corr[rows[k], cols[k]],
+            'p_value': matrices[f'{method}_p'].to_numpy()[rows[k], cols[k]]
+        }
+        for k in order if np.isfinite(strength[k])
+    ]
@@ -4,14 +4,59 @@ Affiche les cartes interactives avec taux d'engagement par pays
 Utilise Plotly pour une meilleure compatibilité avec Streamlit
 """
 
+import threading
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pycountry
 import numpy as np
 import streamlit as st
 
+from country_resolver import country_resolver
+from group_aggregation import aggregate_by_group
+
+# Métriques par pays: (nom, colonne source, fonction); ignorées si la colonne est absente
+COUNTRY_METRIC_SPEC = [
+    ('avg_engagement', 'engagement_rate', 'mean'),
+    ('median_engagement', 'engagement_rate', 'median'),
+    ('total_likes', 'likes', 'sum'),
+    ('avg_likes', 'likes', 'mean'),
+    ('avg_followers', 'followers', 'mean'),
+    ('total_comments', 'comments', 'sum'),
+    ('total_views', 'views', 'sum'),
+]
+
+_base_layout = None
+_base_layout_lock = threading.Lock()
+
+
+def _choropleth_base_layout():
+    """Mise en page statique de la carte choroplèthe (construite une fois par processus)"""
+    global _base_layout
+    if _base_layout is None:
+        with _base_layout_lock:
+            if _base_layout is None:
+                fig = go.Figure()
+                # Améliorer le style de la carte
+                fig.update_geos(
+                    showframe=False,
+                    showcoastlines=True,
+                    projection_type='natural earth',
+                    bgcolor='#f0f2f6',
+                    coastlinecolor='white',
+                    landcolor='lightgray'
+                )
+                fig.update_layout(
+                    height=600,
+                    margin=dict(l=0, r=0, t=50, b=0),
+                    title_font_size=20,
+                    title_x=0.5,
+                    font=dict(family="Arial", size=12),
+                    coloraxis=dict(colorscale='Viridis')  # Palette de couleurs moderne
+                )
+                _base_layout = fig.layout
+    return _base_layout
+
 class CountryMapVisualizer:
     """
     Classe pour créer des cartes interactives montrant l'engagement par pays
@@ -36,31 +81,7 @@ class CountryMapVisualizer:
         Returns:
         str: Nom normalisé du pays
         """
-        if pd.isna(country_name):
-            return None
-        
-        country_name = str(country_name).strip().upper()
-        
-        # Mapping manuel pour les cas courants
-        country_mapping = {
-            'USA': 'UNITED STATES OF AMERICA',
-            'US': 'UNITED STATES OF AMERICA',
-            'UK': 'UNITED KINGDOM',
-            'RUSSIA': 'RUSSIAN FEDERATION',
-            'SOUTH KOREA': 'KOREA, REPUBLIC OF',
-            'NORTH KOREA': "KOREA, DEMOCRATIC PEOPLE'S REPUBLIC OF",
-            'VIETNAM': 'VIET NAM',
-        }
-        
-        if country_name in country_mapping:
-            country_name = country_mapping[country_name]
-        
-        # Essayer de trouver le pays avec pycountry
-        try:
-            country = pycountry.countries.search_fuzzy(country_name)[0]
-            return country.name.upper()
-        except:
-            return country_name
+        return country_resolver.resolve(country_name)[0]
     
     def calculate_engagement_by_country(self, country_column='country'):
         """
@@ -75,44 +96,16 @@ class CountryMapVisualizer:
         if country_column not in self.df.columns:
             return None
         
-        # Normaliser les noms de pays
-        self.df['country_normalized'] = self.df[country_column].apply(
-            self._normalize_country_name
-        )
-        
-        # Filtrer les valeurs nulles
-        df_with_country = self.df[self.df['country_normalized'].notna()].copy()
+        # Normaliser les noms de pays (une résolution par valeur distincte, sans modifier self.df)
+        country = country_resolver.normalize(self.df[country_column])
         
-        if len(df_with_country) == 0:
+        if country.isna().all():
             return None
         
-        # Calculer les métriques par pays
-        metrics = {}
-        
-        if 'engagement_rate' in df_with_country.columns:
-            metrics['avg_engagement'] = df_with_country.groupby('country_normalized')['engagement_rate'].mean()
-            metrics['median_engagement'] = df_with_country.groupby('country_normalized')['engagement_rate'].median()
-        
-        if 'likes' in df_with_country.columns:
-            metrics['total_likes'] = df_with_country.groupby('country_normalized')['likes'].sum()
-            metrics['avg_likes'] = df_with_country.groupby('country_normalized')['likes'].mean()
-        
-        if 'followers' in df_with_country.columns:
-            metrics['avg_followers'] = df_with_country.groupby('country_normalized')['followers'].mean()
-        
-        if 'comments' in df_with_country.columns:
-            metrics['total_comments'] = df_with_country.groupby('country_normalized')['comments'].sum()
-        
-        if 'views' in df_with_country.columns:
-            metrics['total_views'] = df_with_country.groupby('country_normalized')['views'].sum()
-        
-        # Compter le nombre de posts par pays
-        metrics['post_count'] = df_with_country.groupby('country_normalized').size()
-        
-        # Créer le DataFrame agrégé
-        country_stats = pd.DataFrame(metrics)
-        country_stats = country_stats.reset_index()
-        country_stats.rename(columns={'country_normalized': 'country'}, inplace=True)
+        # Toutes les métriques en une seule agrégation (lignes sans pays écartées)
+        country_stats = aggregate_by_group(self.df, country, COUNTRY_METRIC_SPEC, size_name='post_count')
+        country_stats.index = country_stats.index.astype(object)
+        country_stats = country_stats.rename_axis('country').reset_index()
         
         return country_stats
     
@@ -134,7 +127,7 @@ class CountryMapVisualizer:
         plot_data = country_stats.copy()
         
         # Convertir les noms de pays en codes ISO-3 pour Plotly
-        plot_data['ISO'] = plot_data['country'].apply(self._get_iso_code)
+        plot_data['ISO'] = country_resolver.iso_codes(plot_data['country'])
         
         # Filtrer les pays sans code ISO valide
         plot_data = plot_data[plot_data['ISO'].notna()].copy()
@@ -156,50 +149,35 @@ class CountryMapVisualizer:
         
         metric_label = metric_labels.get(engagement_column, engagement_column)
         
-        # Construire hover_data dynamiquement avec seulement les colonnes existantes
-        hover_data_dict = {'ISO': False}  # Toujours masquer ISO
-        
-        # Ajouter seulement les colonnes qui existent dans plot_data
-        if 'avg_engagement' in plot_data.columns:
-            hover_data_dict['avg_engagement'] = ':.2f'
-        if 'median_engagement' in plot_data.columns:
-            hover_data_dict['median_engagement'] = ':.2f'
-        if 'total_likes' in plot_data.columns:
-            hover_data_dict['total_likes'] = ':,'
-        if 'avg_likes' in plot_data.columns:
-            hover_data_dict['avg_likes'] = ':,.0f'
-        if 'post_count' in plot_data.columns:
-            hover_data_dict['post_count'] = ':,'
-        
-        # Créer la carte choroplèthe avec Plotly
-        fig = px.choropleth(
-            plot_data,
-            locations='ISO',
-            color=engagement_column,
-            hover_name='country',
-            hover_data=hover_data_dict,
-            color_continuous_scale='Viridis',  # Palette de couleurs moderne
-            title=f'Carte mondiale - {metric_label}',
-            labels={engagement_column: metric_label}
-        )
-        
-        # Améliorer le style de la carte
-        fig.update_geos(
-            showframe=False,
-            showcoastlines=True,
-            projection_type='natural earth',
-            bgcolor='rgba(0,0,0,0)',
-            coastlinecolor='white',
-            landcolor='lightgray'
+        # Colonnes affichées au survol (seulement celles qui existent) et leur format
+        hover_formats = {
+            'avg_engagement': ':.2f',
+            'median_engagement': ':.2f',
+            'total_likes': ':,',
+            'avg_likes': ':,.0f',
+            'post_count': ':,'
+        }
+        hover_columns = [col for col in hover_formats if col in plot_data.columns]
+        hovertemplate = f"<b>%{{text}}</b><br><br>{metric_label}: %{{z{hover_formats.get(engagement_column, ':.2f')}}}"
+        for i, col in enumerate(hover_columns):
+            hovertemplate += f'<br>{metric_labels[col]}: %{{customdata[{i}]{hover_formats[col]}}}'
+        
+        # Seules les données changent d'un affichage à l'autre: la mise en page
+        # statique (géographie, marges, palette) est construite une fois par processus
+        fig = go.Figure(
+            data=[go.Choropleth(
+                locations=plot_data['ISO'],
+                z=plot_data[engagement_column],
+                text=plot_data['country'],
+                customdata=plot_data[hover_columns].to_numpy() if hover_columns else None,
+                hovertemplate=hovertemplate + '<extra></extra>',
+                coloraxis='coloraxis'
+            )],
+            layout=_choropleth_base_layout()
         )
-        
         fig.update_layout(
-            height=600,
-            margin=dict(l=0, r=0, t=50, b=0),
-            title_font_size=20,
-            title_x=0.5,
-            font=dict(family="Arial", size=12),
-            geo=dict(bgcolor='#f0f2f6')
+            title_text=f'Carte mondiale - {metric_label}',
+            coloraxis_colorbar_title_text=metric_label
         )
         
         return fig
@@ -214,37 +192,7 @@ class CountryMapVisualizer:
         Returns:
         str: Code ISO-3 ou None
         """
-        if pd.isna(country_name):
-            return None
-        
-        country_name = str(country_name).strip()
-        
-        # Mapping manuel pour les cas courants
-        iso_mapping = {
-            'UNITED STATES OF AMERICA': 'USA',
-            'UNITED STATES': 'USA',
-            'USA': 'USA',
-            'US': 'USA',
-            'UNITED KINGDOM': 'GBR',
-            'UK': 'GBR',
-            'RUSSIA': 'RUS',
-            'RUSSIAN FEDERATION': 'RUS',
-            'SOUTH KOREA': 'KOR',
-            'KOREA, REPUBLIC OF': 'KOR',
-            'VIETNAM': 'VNM',
-            'VIET NAM': 'VNM',
-        }
-        
-        country_upper = country_name.upper()
-        if country_upper in iso_mapping:
-            return iso_mapping[country_upper]
-        
-        # Essayer avec pycountry
-        try:
-            country = pycountry.countries.search_fuzzy(country_name)[0]
-            return country.alpha_3
-        except:
-            return None
+        return country_resolver.resolve(country_name)[1]
     
     def create_bar_chart(self, country_stats, engagement_column='avg_engagement', top_n=20):
         """
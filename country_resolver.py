@@ -0,0 +1,221 @@
+"""
+Module de résolution des noms de pays
+Chaque valeur distincte d'une colonne n'est résolue qu'une fois, puis le
+résultat est réparti sur toutes les lignes par indexation des codes
+(catégoriel). La résolution consulte d'abord un mémo partagé par le
+processus, puis un index exact (noms anglais et français, codes alpha-2 /
+alpha-3 et alias courants); la recherche floue de pycountry n'est qu'un
+dernier recours.
+
+L'index est lu depuis une table précalculée et versionnée
+(country_lookup.json, chargée en quelques millisecondes). Elle est régénérée
+à partir de pycountry par `python country_resolver.py`, à relancer après
+toute modification des alias ou de country_key (en incrémentant
+COUNTRY_LOOKUP_VERSION).
+"""
+
+import os
+import re
+import json
+import gettext
+import threading
+import unicodedata
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+try:
+    import pycountry
+    PYCOUNTRY_AVAILABLE = True
+except ImportError:
+    PYCOUNTRY_AVAILABLE = False
+
+load_dotenv()
+
+# Table de correspondance précalculée (vide = fichier livré à côté de ce module)
+COUNTRY_LOOKUP_PATH = os.getenv('COUNTRY_LOOKUP_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'country_lookup.json'
+)
+# Version du format et des règles de normalisation de la table
+COUNTRY_LOOKUP_VERSION = 1
+
+# Alias courants -> code ISO alpha-3
+COUNTRY_ALIASES = {
+    'US': 'USA', 'AMERICA': 'USA', 'UNITED STATES OF AMERICA': 'USA',
+    'UK': 'GBR', 'GREAT BRITAIN': 'GBR', 'BRITAIN': 'GBR', 'ENGLAND': 'GBR', 'SCOTLAND': 'GBR', 'WALES': 'GBR',
+    'RUSSIA': 'RUS',
+    'SOUTH KOREA': 'KOR', 'KOREA': 'KOR', 'NORTH KOREA': 'PRK',
+    'VIETNAM': 'VNM',
+    'IRAN': 'IRN', 'SYRIA': 'SYR', 'LAOS': 'LAO', 'BOLIVIA': 'BOL', 'VENEZUELA': 'VEN',
+    'TANZANIA': 'TZA', 'MOLDOVA': 'MDA', 'TAIWAN': 'TWN', 'BRUNEI': 'BRN', 'MICRONESIA': 'FSM',
+    'CZECH REPUBLIC': 'CZE', 'IVORY COAST': 'CIV', 'TURKEY': 'TUR', 'HOLLAND': 'NLD',
+    'UAE': 'ARE', 'CAPE VERDE': 'CPV', 'SWAZILAND': 'SWZ', 'MACEDONIA': 'MKD', 'BURMA': 'MMR',
+    'PALESTINE': 'PSE', 'VATICAN': 'VAT', 'VATICAN CITY': 'VAT',
+    'DR CONGO': 'COD', 'DRC': 'COD', 'DEMOCRATIC REPUBLIC OF THE CONGO': 'COD', 'CONGO': 'COG',
+    # Noms français usuels absents des libellés ISO traduits
+    'AMERIQUE': 'USA', 'ANGLETERRE': 'GBR', 'ECOSSE': 'GBR', 'GRANDE BRETAGNE': 'GBR',
+    'RUSSIE': 'RUS', 'COREE DU SUD': 'KOR', 'COREE': 'KOR', 'COREE DU NORD': 'PRK',
+    'SYRIE': 'SYR', 'BOLIVIE': 'BOL', 'TANZANIE': 'TZA', 'MOLDAVIE': 'MDA',
+    'REPUBLIQUE TCHEQUE': 'CZE', 'HOLLANDE': 'NLD', 'BIRMANIE': 'MMR', 'RDC': 'COD',
+}
+
+
+def country_key(value):
+    """Clé de comparaison: majuscules, sans accents, points, tirets ni espaces superflus"""
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    text = text.replace('.', '').replace('-', ' ').replace("'", ' ').upper()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def build_lookup_table(aliases=COUNTRY_ALIASES):
+    """
+    Table de correspondance construite à partir de pycountry
+
+    Returns:
+    dict: {'version', 'source', 'countries': {alpha_3: {'name', 'pays',
+    'alpha_2', 'official_name'}}, 'keys': {clé normalisée: alpha_3}}
+    """
+    french = gettext.translation('iso3166-1', pycountry.LOCALES_DIR, languages=['fr'], fallback=True)
+    countries = {}
+    keys = {}
+    for country in pycountry.countries:
+        pays = french.gettext(country.name)
+        countries[country.alpha_3] = {
+            'name': country.name,
+            'pays': pays,
+            'alpha_2': country.alpha_2,
+            'official_name': getattr(country, 'official_name', None),
+        }
+        for value in (country.name, getattr(country, 'official_name', None), getattr(country, 'common_name', None),
+                      pays, country.alpha_2, country.alpha_3):
+            if value:
+                keys.setdefault(country_key(value), country.alpha_3)
+    for alias, alpha_3 in aliases.items():
+        if alpha_3 in countries:
+            keys[country_key(alias)] = alpha_3
+    return {
+        'version': COUNTRY_LOOKUP_VERSION,
+        'source': f"pycountry {getattr(pycountry, '__version__', '')}".strip(),
+        'countries': countries,
+        'keys': dict(sorted(keys.items())),
+    }
+
+
+def load_lookup_table(path=COUNTRY_LOOKUP_PATH):
+    """Table précalculée, ou None si absente ou d'une autre version"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return table if table.get('version') == COUNTRY_LOOKUP_VERSION else None
+
+
+class CountryResolver:
+    """Résolution mémorisée des noms de pays en (nom normalisé, code ISO-3)"""
+
+    def __init__(self, aliases=COUNTRY_ALIASES, fuzzy=True, lookup_path=COUNTRY_LOOKUP_PATH):
+        self.aliases = aliases
+        self.fuzzy = fuzzy
+        self.lookup_path = lookup_path
+        self._index = None
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.stats = {'memo_hits': 0, 'exact': 0, 'fuzzy': 0, 'unresolved': 0}
+
+    def _build_index(self):
+        """Index exact construit une seule fois: clé -> (nom, code ISO-3)"""
+        table = load_lookup_table(self.lookup_path)
+        if table is None:
+            if not PYCOUNTRY_AVAILABLE:
+                raise RuntimeError("Table des pays introuvable et pycountry non installé")
+            table = build_lookup_table(self.aliases)
+        countries = table['countries']
+        entries = {alpha_3: (country['name'].upper(), alpha_3) for alpha_3, country in countries.items()}
+        index = {key: entries[alpha_3] for key, alpha_3 in table['keys'].items()}
+        # Alias propres à cette instance (la table contient déjà les alias par défaut)
+        for alias, alpha_3 in self.aliases.items():
+            if alpha_3 in entries:
+                index[country_key(alias)] = entries[alpha_3]
+        return index
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build_index()
+        return self._index
+
+    def resolve(self, value):
+        """
+        Résout une valeur
+
+        Returns:
+        tuple: (nom normalisé, code ISO-3); un pays inconnu donne (valeur en
+        majuscules, None); une valeur manquante donne (None, None)
+        """
+        if pd.isna(value):
+            return None, None
+        raw = str(value)
+        with self._lock:
+            if raw in self._memo:
+                self.stats['memo_hits'] += 1
+                return self._memo[raw]
+
+        key = country_key(raw)
+        result = self.index.get(key)
+        kind = 'exact'
+        if result is None and self.fuzzy and key and PYCOUNTRY_AVAILABLE:
+            try:
+                country = pycountry.countries.search_fuzzy(key)[0]
+                result = (country.name.upper(), country.alpha_3)
+                kind = 'fuzzy'
+            except LookupError:
+                pass
+        if result is None:
+            result = (raw.strip().upper(), None)
+            kind = 'unresolved'
+
+        with self._lock:
+            self._memo[raw] = result
+            self.stats[kind] += 1
+        return result
+
+    def _resolve_uniques(self, series):
+        codes, uniques = pd.factorize(series, sort=False)
+        return codes, [self.resolve(value) for value in uniques]
+
+    def normalize(self, series):
+        """
+        Noms normalisés d'une colonne (résolution des seules valeurs distinctes)
+
+        Returns:
+        pd.Series: Catégorielle (catégories triées), manquante si la valeur l'est
+        """
+        codes, resolved = self._resolve_uniques(series)
+        name_codes, names = pd.factorize(np.array([name for name, _ in resolved], dtype=object), sort=True)
+        row_codes = np.append(name_codes, -1).take(codes)
+        return pd.Series(pd.Categorical.from_codes(row_codes, categories=names), index=series.index, name=series.name)
+
+    def iso_codes(self, series):
+        """Codes ISO-3 d'une colonne (None si inconnu), résolus par valeur distincte"""
+        codes, resolved = self._resolve_uniques(series)
+        iso = np.array([alpha_3 for _, alpha_3 in resolved] + [None], dtype=object)
+        return pd.Series(iso.take(codes), index=series.index, name=series.name, dtype=object)
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+
+# Résolveur partagé par toutes les sessions du processus
+country_resolver = CountryResolver()
+
+
+if __name__ == "__main__":
+    # Régénère la table précalculée à partir de pycountry
+    table = build_lookup_table()
+    with open(COUNTRY_LOOKUP_PATH, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, indent=1)
+    print(f"✅ {len(table['countries'])} pays, {len(table['keys'])} clés écrits dans {COUNTRY_LOOKUP_PATH}")
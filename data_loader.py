@@ -0,0 +1,282 @@
+"""
+Module d'ingestion des données
+Lecture des fichiers CSV volumineux par blocs avec un plafond mémoire
+"""
+
+import os
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_numeric_dtype,
+)
+from pandas.api.types import union_categoricals
+from dotenv import load_dotenv
+
+from statistical_analysis import StatisticalAnalyzer
+
+load_dotenv()
+
+# Au-delà de ce seuil, le fichier est lu par blocs au lieu d'un seul pd.read_csv
+STREAMING_THRESHOLD_MB = int(os.getenv('INGESTION_STREAMING_THRESHOLD_MB', '100'))
+# Plafond mémoire strict du DataFrame construit en streaming
+MAX_MEMORY_MB = int(os.getenv('INGESTION_MAX_MEMORY_MB', '2048'))
+# Nombre de lignes lues par bloc
+CHUNK_ROWS = int(os.getenv('INGESTION_CHUNK_ROWS', '250000'))
+# Ratio valeurs distinctes / lignes en dessous duquel une colonne texte devient catégorielle
+CATEGORY_RATIO = 0.5
+
+
+class MemoryLimitExceeded(Exception):
+    """Levée lorsque le DataFrame en construction dépasse le plafond mémoire"""
+
+    def __init__(self, used_bytes, limit_bytes, rows_read):
+        self.used_bytes = used_bytes
+        self.limit_bytes = limit_bytes
+        self.rows_read = rows_read
+        super().__init__(
+            f"Plafond mémoire atteint après {rows_read:,} lignes "
+            f"({used_bytes / 1024**2:.0f} Mo utilisés, limite {limit_bytes / 1024**2:.0f} Mo). "
+            f"Augmentez INGESTION_MAX_MEMORY_MB ou filtrez le fichier."
+        )
+
+
+def get_file_size(file_obj):
+    """
+    Retourne la taille d'un fichier (chemin, UploadedFile Streamlit ou flux binaire)
+
+    Parameters:
+    file_obj: Chemin ou objet fichier
+
+    Returns:
+    int: Taille en octets (0 si inconnue)
+    """
+    if isinstance(file_obj, (str, os.PathLike)):
+        return os.path.getsize(file_obj)
+
+    size = getattr(file_obj, 'size', None)
+    if size is not None:
+        return int(size)
+
+    try:
+        position = file_obj.tell()
+        file_obj.seek(0, os.SEEK_END)
+        size = file_obj.tell()
+        file_obj.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return 0
+
+
+def should_stream(file_obj, threshold_mb=None):
+    """
+    Indique si le fichier doit être lu en mode streaming
+
+    Parameters:
+    file_obj: Chemin ou objet fichier
+    threshold_mb (int): Seuil en Mo (STREAMING_THRESHOLD_MB par défaut)
+
+    Returns:
+    bool: True si le fichier dépasse le seuil
+    """
+    threshold_mb = STREAMING_THRESHOLD_MB if threshold_mb is None else threshold_mb
+    return get_file_size(file_obj) > threshold_mb * 1024**2
+
+
+def _infer_schema(chunk):
+    """Déduit le type cible de chaque colonne à partir du premier bloc"""
+    schema = {}
+    for col in chunk.columns:
+        series = chunk[col]
+        if is_bool_dtype(series):
+            schema[col] = 'bool'
+        elif is_integer_dtype(series):
+            schema[col] = 'int64'
+        elif is_float_dtype(series):
+            schema[col] = 'float64'
+        elif is_numeric_dtype(series):
+            schema[col] = 'object'
+        else:
+            non_null = series.dropna()
+            if len(non_null) > 0 and non_null.nunique() <= CATEGORY_RATIO * len(non_null):
+                schema[col] = 'category'
+            else:
+                schema[col] = 'object'
+    return schema
+
+
+def _apply_schema(chunk, schema):
+    """
+    Convertit un bloc selon le schéma, en élargissant le schéma si nécessaire
+    (entier -> flottant en présence de valeurs manquantes, numérique -> texte).
+    """
+    columns = {}
+    for col in chunk.columns:
+        series = chunk[col]
+        target = schema.get(col)
+
+        if target is None:
+            # Colonne absente du premier bloc (CSV irrégulier): on la garde en texte
+            schema[col] = target = 'object'
+
+        if target == 'int64' and not is_integer_dtype(series):
+            schema[col] = target = 'float64' if is_numeric_dtype(series) else 'object'
+        elif target == 'float64' and not is_numeric_dtype(series):
+            schema[col] = target = 'object'
+        elif target == 'bool' and not is_bool_dtype(series):
+            schema[col] = target = 'object'
+
+        if target == 'category':
+            columns[col] = series.astype('category')
+        elif target == 'object':
+            columns[col] = series.astype(object)
+        else:
+            columns[col] = series.astype(target)
+    return columns
+
+
+def _combine_column(parts, target):
+    """Assemble les morceaux d'une colonne en une seule série"""
+    if target == 'category' and all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+        return pd.Series(union_categoricals(parts, ignore_order=True), name=parts[0].name)
+
+    if target in ('object', 'category'):
+        parts = [p.astype(object) for p in parts]
+    else:
+        parts = [p.astype(target) for p in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_csv_streaming(file_obj, chunk_rows=None, max_memory_mb=None,
+                       calculate_engagement=True, progress_callback=None, **read_csv_kwargs):
+    """
+    Lit un CSV par blocs et construit un DataFrame compact colonne par colonne
+
+    Chaque bloc est typé selon le schéma déduit du premier bloc (texte répétitif
+    en catégories), le taux d'engagement est calculé bloc par bloc (sauf si le
+    fichier contient déjà une colonne engagement_rate, conservée telle quelle),
+    et la mémoire occupée est contrôlée après chaque bloc. Le contrôle inclut
+    l'assemblage final: chaque colonne est reconstituée pendant que ses
+    morceaux existent encore, d'où un pic égal aux morceaux lus plus la plus
+    grosse colonne.
+
+    Parameters:
+    file_obj: Chemin ou objet fichier CSV
+    chunk_rows (int): Lignes par bloc (CHUNK_ROWS par défaut)
+    max_memory_mb (int): Plafond mémoire en Mo (MAX_MEMORY_MB par défaut)
+    calculate_engagement (bool): Calculer engagement_rate pendant la lecture (si absent du fichier)
+    progress_callback (callable): Appelée avec (fraction_lue, lignes_lues)
+
+    Returns:
+    pd.DataFrame: Données chargées (df.attrs['ingestion'] décrit la lecture)
+
+    Raises:
+    MemoryLimitExceeded: Si le plafond mémoire est dépassé
+    """
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    max_memory_bytes = (max_memory_mb or MAX_MEMORY_MB) * 1024**2
+    total_bytes = get_file_size(file_obj)
+
+    if isinstance(file_obj, (str, os.PathLike)):
+        # Ouvrir le fichier nous-mêmes pour suivre la progression avec tell()
+        with open(file_obj, 'rb') as handle:
+            return read_csv_streaming(
+                handle, chunk_rows, max_memory_mb, calculate_engagement,
+                progress_callback, **read_csv_kwargs
+            )
+
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+
+    schema = None
+    column_parts = {}
+    column_order = []
+    column_bytes = {}
+    used_bytes = 0
+    rows_read = 0
+    n_chunks = 0
+    engagement_computed = False
+
+    with pd.read_csv(file_obj, chunksize=chunk_rows, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            if schema is None:
+                # Ne jamais écraser une colonne engagement_rate fournie par le fichier
+                calculate_engagement = calculate_engagement and 'engagement_rate' not in chunk.columns
+            if calculate_engagement:
+                chunk = StatisticalAnalyzer(chunk).calculate_engagement_rate()
+                engagement_computed = 'engagement_rate' in chunk.columns
+
+            if schema is None:
+                schema = _infer_schema(chunk)
+
+            for col, series in _apply_schema(chunk, schema).items():
+                if col not in column_parts:
+                    column_parts[col] = []
+                    column_order.append(col)
+                series = series.reset_index(drop=True)
+                column_parts[col].append(series)
+                series_bytes = int(series.memory_usage(index=False, deep=True))
+                column_bytes[col] = column_bytes.get(col, 0) + series_bytes
+                used_bytes += series_bytes
+
+            rows_read += len(chunk)
+            n_chunks += 1
+
+            # Pic de l'assemblage: tous les morceaux plus la plus grosse colonne reconstituée
+            peak_bytes = used_bytes + max(column_bytes.values(), default=0)
+            if peak_bytes > max_memory_bytes:
+                raise MemoryLimitExceeded(peak_bytes, max_memory_bytes, rows_read)
+
+            if progress_callback is not None:
+                fraction = 0.0
+                if total_bytes and hasattr(file_obj, 'tell'):
+                    fraction = min(file_obj.tell() / total_bytes, 1.0)
+                progress_callback(fraction, rows_read)
+
+    if not column_parts:
+        return pd.DataFrame()
+
+    # Les morceaux de chaque colonne sont libérés dès qu'elle est assemblée;
+    # copy=False évite une seconde copie de toutes les colonnes
+    df = pd.DataFrame({
+        col: _combine_column(column_parts.pop(col), schema[col])
+        for col in column_order
+    }, copy=False)
+    df.attrs['ingestion'] = {
+        'mode': 'streaming',
+        'chunks': n_chunks,
+        'rows': rows_read,
+        'memory_mb': float(df.memory_usage(deep=True).sum()) / 1024**2,
+        'engagement_computed': engagement_computed,
+    }
+
+    if progress_callback is not None:
+        progress_callback(1.0, rows_read)
+
+    return df
+
+
+def load_csv(file_obj, calculate_engagement=True, progress_callback=None, **read_csv_kwargs):
+    """
+    Charge un CSV: lecture directe pour les petits fichiers, streaming au-delà du seuil
+
+    Parameters:
+    file_obj: Chemin ou objet fichier CSV
+    calculate_engagement (bool): Calculer engagement_rate pendant la lecture (streaming)
+    progress_callback (callable): Appelée avec (fraction_lue, lignes_lues)
+
+    Returns:
+    pd.DataFrame: Données chargées
+    """
+    if should_stream(file_obj):
+        return read_csv_streaming(
+            file_obj,
+            calculate_engagement=calculate_engagement,
+            progress_callback=progress_callback,
+            **read_csv_kwargs
+        )
+
+    df = pd.read_csv(file_obj, **read_csv_kwargs)
+    df.attrs['ingestion'] = {'mode': 'single', 'engagement_computed': False}
+    return df
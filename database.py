@@ -4,15 +4,215 @@ Gère les utilisateurs, les abonnements et les sauvegardes de manière persistan
 """
 
 import os
+import io
 import json
 from datetime import datetime, timedelta
 import hashlib
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+import pandas as pd
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from collections import Counter
+from sqlalchemy import create_engine, event, text, inspect, bindparam
 from sqlalchemy.exc import SQLAlchemyError
 
+from utils import dataframe_fingerprint
+from dataset_chunks import (
+    split_dataframe,
+    manifest_chunk_hashes,
+    serialize_chunk,
+    deserialize_chunk,
+    assemble_dataframe,
+)
+
+# Import conditionnel: sans pyarrow, les projets restent sauvegardés en JSON
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except (ImportError, ModuleNotFoundError):
+    pa = None
+    PYARROW_AVAILABLE = False
+
 load_dotenv()
 
+# Formats de stockage des données d'un projet (colonne saved_projects.storage_format)
+PROJECT_FORMAT_JSON = 'json'        # Historique: liste d'enregistrements dans data_json
+PROJECT_FORMAT_PARQUET = 'parquet'  # Colonnes Parquet compressées dans data_blob
+PROJECT_FORMAT_CHUNKED = 'chunked'  # Manifeste JSON de blocs de colonnes (dataset_chunks)
+PROJECT_FORMAT_VERSION = 1
+
+# Nombre de versions conservées par projet
+PROJECT_HISTORY_LIMIT = int(os.getenv('PROJECT_HISTORY_LIMIT', '20'))
+# Taille des lots pour les requêtes IN (...)
+SQL_IN_BATCH_SIZE = 500
+
+# Pool de connexions (partagé par toutes les sessions Streamlit du processus)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# Durée de vie (s) du cache des préférences et profils par session
+USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+
+# Réglages SQLite
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024**2)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+# Intervalle minimal (s) entre deux passes d'expiration des abonnements premium
+PREMIUM_SWEEP_INTERVAL_SECONDS = float(os.getenv('PREMIUM_SWEEP_INTERVAL_SECONDS', '300'))
+# Les statuts premium sont relus après ce délai (abonnement pris ou annulé dans un autre processus)
+PREMIUM_CACHE_MAX_AGE_SECONDS = float(os.getenv('PREMIUM_CACHE_MAX_AGE_SECONDS', '3600'))
+
+_engines = {}
+_writer_locks = {}
+_engines_lock = threading.Lock()
+
+
+def _is_sqlite_url(db_url):
+    return 'sqlite' in (db_url or '').lower()
+
+
+def _is_sqlite_memory_url(db_url):
+    return db_url.rstrip('/') in ('sqlite:', 'sqlite://') or ':memory:' in db_url
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Applique les PRAGMA à chaque nouvelle connexion SQLite du pool"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+class PremiumEntitlements:
+    """
+    Droits premium en mémoire, partagés par toutes les sessions du processus
+    
+    Chaque entrée conserve la date d'expiration de l'abonnement: la réponse est
+    donnée sans requête jusqu'à cet instant, dans la limite de
+    PREMIUM_CACHE_MAX_AGE_SECONDS après la lecture. Les abonnements échus ne sont pas
+    désactivés un par un mais lors d'une passe groupée (expire_premium_subscriptions).
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.next_sweep = 0.0
+
+    def get(self, db_url, user_id):
+        """
+        Returns:
+        tuple: (trouvé, premium actif, abonnement échu à désactiver)
+        """
+        with self._lock:
+            entry = self._entries.get((db_url, user_id))
+        if entry is None:
+            return False, False, False
+        expiry, loaded_at = entry
+        # Toute entrée est relue après PREMIUM_CACHE_MAX_AGE_SECONDS: un abonnement pris
+        # ou annulé via un autre processus finit par être vu
+        if time.monotonic() - loaded_at > PREMIUM_CACHE_MAX_AGE_SECONDS:
+            return False, False, False
+        if expiry is None:
+            return True, False, False
+        if expiry > datetime.now():
+            return True, True, False
+        return True, False, True
+
+    def set(self, db_url, user_id, expiry):
+        """Enregistre l'expiration d'un abonnement (None si l'utilisateur n'est pas premium)"""
+        with self._lock:
+            self._entries[(db_url, user_id)] = (expiry, time.monotonic())
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            for key in list(self._entries):
+                if user_id is None or key[1] == user_id:
+                    del self._entries[key]
+
+    def forget_expired(self, now):
+        """Marque comme non premium les entrées échues (après la passe d'expiration)"""
+        with self._lock:
+            for key, (expiry, _) in list(self._entries.items()):
+                if expiry is not None and expiry <= now:
+                    self._entries[key] = (None, time.monotonic())
+
+
+premium_entitlements = PremiumEntitlements()
+
+
+def invalidate_premium_entitlement(user_id=None):
+    """Force la relecture du statut premium d'un utilisateur (ou de tous)"""
+    premium_entitlements.invalidate(user_id)
+
+
+def get_engine(db_url):
+    """
+    Retourne le moteur SQLAlchemy partagé pour une URL de base de données
+    
+    Chaque session Streamlit crée son propre objet Database: le moteur (et donc
+    le pool de connexions) est mis en commun au niveau du processus.
+    
+    Parameters:
+    db_url (str): URL de connexion SQLAlchemy
+    
+    Returns:
+    Engine: Moteur configuré (pool pour MySQL/TiDB, WAL et busy timeout pour SQLite)
+    """
+    with _engines_lock:
+        engine = _engines.get(db_url)
+        if engine is not None:
+            return engine
+        
+        if _is_sqlite_url(db_url):
+            if _is_sqlite_memory_url(db_url):
+                # Base en mémoire: une seule connexion, pas de WAL
+                engine = create_engine(db_url, echo=False, connect_args={"check_same_thread": False})
+            else:
+                engine = create_engine(
+                    db_url,
+                    echo=False,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    connect_args={
+                        "check_same_thread": False,
+                        "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000
+                    }
+                )
+                event.listen(engine, 'connect', _configure_sqlite_connection)
+            _writer_locks[db_url] = threading.Lock()
+        else:
+            engine = create_engine(
+                db_url,
+                echo=False,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=DB_POOL_PRE_PING
+            )
+        
+        _engines[db_url] = engine
+        return engine
+
+
+def dispose_engines():
+    """Ferme toutes les connexions des pools partagés (tests, arrêt du processus)"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _writer_locks.clear()
+
+
 class Database:
     def __init__(self):
         self.db_url = os.getenv('DATABASE_URL')
@@ -20,37 +220,68 @@ class Database:
             # Fallback pour SQLite sur Streamlit Cloud
             self.db_url = "sqlite:///social_analytics.db"
         
+        # Cache des lectures par utilisateur: {(type, user_id): (expiration, valeur)}
+        self._user_cache = {}
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        
         try:
-            # Configuration spéciale pour SQLite
-            if 'sqlite' in (self.db_url or '').lower():
-                # SQLite nécessite connect_args pour activer les FOREIGN KEY
-                self.engine = create_engine(
-                    self.db_url, 
-                    echo=False,
-                    connect_args={"check_same_thread": False}
-                )
-                self.is_sqlite = True
-            else:
-                self.engine = create_engine(self.db_url, echo=False)
-                self.is_sqlite = False
-            
+            self.engine = get_engine(self.db_url)
+            self.is_sqlite = _is_sqlite_url(self.db_url)
             self.init_database()
         except Exception as e:
             print(f"Erreur lors de la connexion à la base de données: {e}")
             # En cas d'échec, revenir à SQLite pour permettre à l'application de démarrer
             self.db_url = "sqlite:///social_analytics.db"
-            self.engine = create_engine(
-                self.db_url, 
-                echo=False,
-                connect_args={"check_same_thread": False}
-            )
+            self.engine = get_engine(self.db_url)
             self.is_sqlite = True
             self.init_database()
 
+    @contextmanager
+    def _write_connection(self):
+        """Connexion d'écriture
+        
+        Avec SQLite, une seule écriture à la fois par processus: les sessions
+        attendent leur tour sur un verrou au lieu de se heurter à
+        "database is locked". MySQL/TiDB gère la concurrence lui-même.
+        """
+        with _writer_locks.get(self.db_url) or nullcontext():
+            with self.engine.connect() as connection:
+                yield connection
+
+    def _cached_user_value(self, kind, user_id, loader):
+        """Retourne la valeur en cache si elle n'a pas expiré, sinon la relit en base"""
+        key = (kind, user_id)
+        entry = self._user_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.cache_stats['hits'] += 1
+            value = entry[1]
+        else:
+            self.cache_stats['misses'] += 1
+            value = loader(user_id)
+            self._user_cache[key] = (time.monotonic() + USER_CACHE_TTL_SECONDS, value)
+        # Copie pour que l'appelant ne modifie pas la valeur en cache
+        return dict(value) if isinstance(value, dict) else value
+
+    def invalidate_user_cache(self, user_id=None, *kinds):
+        """Vide le cache d'un utilisateur (ou de tous), éventuellement pour certains types
+        ('preferences', 'profile')"""
+        for key in list(self._user_cache):
+            if (user_id is None or key[1] == user_id) and (not kinds or key[0] in kinds):
+                del self._user_cache[key]
+
+    def get_cache_stats(self):
+        """Compteurs du cache utilisateur (succès, échecs, entrées)"""
+        lookups = self.cache_stats['hits'] + self.cache_stats['misses']
+        return {
+            **self.cache_stats,
+            'entries': len(self._user_cache),
+            'hit_rate': self.cache_stats['hits'] / lookups if lookups else 0.0
+        }
+
     def init_database(self):
         """Initialise les tables de la base de données avec syntaxe adaptée"""
         try:
-            with self.engine.connect() as connection:
+            with self._write_connection() as connection:
                 if self.is_sqlite:
                     # Syntaxe SQLite (sans FOREIGN KEY pour éviter les problèmes de compatibilité)
                     # Table des utilisateurs
@@ -93,6 +324,9 @@ class Database:
                             project_name TEXT NOT NULL,
                             data_json TEXT NOT NULL,
                             results_json TEXT,
+                            storage_format TEXT DEFAULT 'json',
+                            format_version INTEGER DEFAULT 1,
+                            data_blob BLOB,
                             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
                             updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
                             UNIQUE(user_id, project_name)
@@ -117,6 +351,93 @@ class Database:
                             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
                             updated_at TEXT DEFAULT CURRENT_TIMESTAMP
                         )
+                    """))                    
+                    # Métadonnées des projets (lues sans toucher aux données)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_metadata (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            project_id INTEGER UNIQUE NOT NULL,
+                            row_count INTEGER,
+                            column_count INTEGER,
+                            columns_json TEXT,
+                            data_size_bytes INTEGER DEFAULT 0,
+                            results_size_bytes INTEGER DEFAULT 0,
+                            checksum TEXT,
+                            analysis_summary TEXT,
+                            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    
+                    # Jeux de données adressés par leur contenu (partagés entre projets)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS datasets (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            dataset_hash TEXT UNIQUE NOT NULL,
+                            storage_format TEXT NOT NULL,
+                            format_version INTEGER DEFAULT 1,
+                            data_json TEXT,
+                            data_blob BLOB,
+                            size_bytes INTEGER DEFAULT 0,
+                            ref_count INTEGER DEFAULT 0,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    
+                    # Données des projets (référence vers datasets)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_data (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            project_id INTEGER UNIQUE NOT NULL,
+                            dataset_hash TEXT,
+                            storage_format TEXT NOT NULL,
+                            format_version INTEGER DEFAULT 1,
+                            data_json TEXT,
+                            data_blob BLOB
+                        )
+                    """))
+                    
+                    # Résultats d'analyse des projets
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_results (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            project_id INTEGER UNIQUE NOT NULL,
+                            results_json TEXT
+                        )
+                    """))
+                    
+                    # Blocs immuables de colonnes (partagés entre jeux de données)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS dataset_chunks (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            chunk_hash TEXT UNIQUE NOT NULL,
+                            row_count INTEGER,
+                            size_bytes INTEGER DEFAULT 0,
+                            ref_count INTEGER DEFAULT 0,
+                            data_blob BLOB NOT NULL
+                        )
+                    """))
+                    
+                    # Résultats d'analyse stockés entrée par entrée
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS result_entries (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            entry_hash TEXT UNIQUE NOT NULL,
+                            ref_count INTEGER DEFAULT 0,
+                            entry_json TEXT NOT NULL
+                        )
+                    """))
+                    
+                    # Historique des versions des projets
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_versions (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            project_id INTEGER NOT NULL,
+                            version INTEGER NOT NULL,
+                            dataset_hash TEXT,
+                            results_manifest TEXT,
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                            UNIQUE(project_id, version)
+                        )
                     """))
                 else:
                     # Syntaxe MySQL/MariaDB
@@ -161,6 +482,9 @@ class Database:
                             project_name VARCHAR(255) NOT NULL,
                             data_json JSON NOT NULL,
                             results_json JSON,
+                            storage_format VARCHAR(20) DEFAULT 'json',
+                            format_version INT DEFAULT 1,
+                            data_blob LONGBLOB,
                             created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                             updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                             FOREIGN KEY (user_id) REFERENCES users (id),
@@ -188,12 +512,146 @@ class Database:
                             FOREIGN KEY (user_id) REFERENCES users (id)
                         )
                     """))
+                    
+                    # Métadonnées des projets (lues sans toucher aux données)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_metadata (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            project_id INT UNIQUE NOT NULL,
+                            row_count INT,
+                            column_count INT,
+                            columns_json JSON,
+                            data_size_bytes BIGINT DEFAULT 0,
+                            results_size_bytes BIGINT DEFAULT 0,
+                            checksum VARCHAR(64),
+                            analysis_summary JSON,
+                            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                            FOREIGN KEY (project_id) REFERENCES saved_projects (id) ON DELETE CASCADE
+                        )
+                    """))
+                    
+                    # Jeux de données adressés par leur contenu (partagés entre projets)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS datasets (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            dataset_hash CHAR(64) UNIQUE NOT NULL,
+                            storage_format VARCHAR(20) NOT NULL,
+                            format_version INT DEFAULT 1,
+                            data_json LONGTEXT,
+                            data_blob LONGBLOB,
+                            size_bytes BIGINT DEFAULT 0,
+                            ref_count INT DEFAULT 0,
+                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    
+                    # Données des projets (référence vers datasets)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_data (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            project_id INT UNIQUE NOT NULL,
+                            dataset_hash CHAR(64),
+                            storage_format VARCHAR(20) NOT NULL,
+                            format_version INT DEFAULT 1,
+                            data_json LONGTEXT,
+                            data_blob LONGBLOB,
+                            FOREIGN KEY (project_id) REFERENCES saved_projects (id) ON DELETE CASCADE
+                        )
+                    """))
+                    
+                    # Résultats d'analyse des projets
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_results (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            project_id INT UNIQUE NOT NULL,
+                            results_json LONGTEXT,
+                            FOREIGN KEY (project_id) REFERENCES saved_projects (id) ON DELETE CASCADE
+                        )
+                    """))
+                    
+                    # Blocs immuables de colonnes (partagés entre jeux de données)
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS dataset_chunks (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            chunk_hash CHAR(64) UNIQUE NOT NULL,
+                            row_count INT,
+                            size_bytes BIGINT DEFAULT 0,
+                            ref_count INT DEFAULT 0,
+                            data_blob LONGBLOB NOT NULL
+                        )
+                    """))
+                    
+                    # Résultats d'analyse stockés entrée par entrée
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS result_entries (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            entry_hash CHAR(64) UNIQUE NOT NULL,
+                            ref_count INT DEFAULT 0,
+                            entry_json LONGTEXT NOT NULL
+                        )
+                    """))
+                    
+                    # Historique des versions des projets
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS project_versions (
+                            id INT AUTO_INCREMENT PRIMARY KEY,
+                            project_id INT NOT NULL,
+                            version INT NOT NULL,
+                            dataset_hash CHAR(64),
+                            results_manifest LONGTEXT,
+                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                            UNIQUE KEY unique_version (project_id, version),
+                            FOREIGN KEY (project_id) REFERENCES saved_projects (id) ON DELETE CASCADE
+                        )
+                    """))
+                
+                # Migration des bases existantes (colonnes ajoutées après coup)
+                self._add_missing_columns(connection, 'saved_projects', {
+                    'storage_format': "TEXT DEFAULT 'json'" if self.is_sqlite else "VARCHAR(20) DEFAULT 'json'",
+                    'format_version': "INTEGER DEFAULT 1" if self.is_sqlite else "INT DEFAULT 1",
+                    'data_blob': "BLOB" if self.is_sqlite else "LONGBLOB",
+                })
+                self._add_missing_columns(connection, 'project_data', {
+                    'dataset_hash': "TEXT" if self.is_sqlite else "CHAR(64)",
+                })
+                self._add_missing_columns(connection, 'saved_projects', {
+                    'current_version': "INTEGER" if self.is_sqlite else "INT",
+                })
+                
+                # Les projets pointant vers un jeu de données sans historique
+                # deviennent leur propre version 1 (le compteur de références
+                # du jeu de données compte désormais les versions)
+                connection.execute(text("""
+                    INSERT INTO project_versions (project_id, version, dataset_hash)
+                    SELECT d.project_id, 1, d.dataset_hash
+                    FROM project_data d
+                    WHERE d.dataset_hash IS NOT NULL
+                      AND NOT EXISTS (SELECT 1 FROM project_versions v WHERE v.project_id = d.project_id)
+                """))
+                connection.execute(text("""
+                    UPDATE saved_projects SET current_version = 1
+                    WHERE current_version IS NULL
+                      AND id IN (SELECT project_id FROM project_versions)
+                """))
                 
                 connection.commit()
         except SQLAlchemyError as e:
             print(f"Erreur lors de l'initialisation de la base de données: {e}")
             raise
 
+    def _add_missing_columns(self, connection, table_name, columns):
+        """Ajoute les colonnes absentes d'une table existante
+        
+        Args:
+            connection: Connexion SQLAlchemy ouverte
+            table_name: Nom de la table
+            columns: Dictionnaire {nom_colonne: définition SQL}
+        """
+        existing = {col['name'] for col in inspect(connection).get_columns(table_name)}
+        for column_name, definition in columns.items():
+            if column_name not in existing:
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}"))
+
     def hash_password(self, password):
         """Hash le mot de passe avec SHA-256"""
         return hashlib.sha256(password.encode()).hexdigest()
@@ -203,7 +661,7 @@ class Database:
         """Crée un nouvel utilisateur"""
         try:
             password_hash = self.hash_password(password)
-            with self.engine.connect() as connection:
+            with self._write_connection() as connection:
                 result = connection.execute(text("""
                     INSERT INTO users (email, password_hash, first_name, last_name, 
                                      company, phone, job_title, bio)
@@ -238,7 +696,7 @@ class Database:
     def authenticate_user(self, email, password):
         """Authentifie un utilisateur"""
         password_hash = self.hash_password(password)
-        with self.engine.connect() as connection:
+        with self._write_connection() as connection:
             result = connection.execute(text("""
                 SELECT * FROM users
                 WHERE email = :email AND password_hash = :password_hash
@@ -261,6 +719,7 @@ class Database:
                         WHERE id = :id
                     """), {'id': user[0]}) # user[0] est l'ID
                 connection.commit()
+                self.invalidate_user_cache(user[0], 'profile')
                 
                 # Convertir le résultat en dictionnaire pour la compatibilité
                 return dict(user._mapping)
@@ -268,7 +727,28 @@ class Database:
             return None
 
     def check_premium_status(self, user_id):
-        """Vérifie si l'utilisateur a un abonnement premium actif"""
+        """Vérifie si l'utilisateur a un abonnement premium actif
+        
+        La réponse vient des droits en mémoire jusqu'à l'expiration de l'abonnement;
+        un abonnement échu déclenche (au plus une fois par intervalle) la passe
+        groupée de désactivation au lieu d'une mise à jour par requête.
+        """
+        found, is_premium, expired = premium_entitlements.get(self.db_url, user_id)
+        if found:
+            self.cache_stats['hits'] += 1
+        else:
+            self.cache_stats['misses'] += 1
+            expiry = self._query_premium_expiry(user_id)
+            premium_entitlements.set(self.db_url, user_id, expiry)
+            is_premium = expiry is not None and expiry > datetime.now()
+            expired = expiry is not None and not is_premium
+        
+        if expired and time.monotonic() >= premium_entitlements.next_sweep:
+            self.expire_premium_subscriptions()
+        return is_premium
+
+    def _query_premium_expiry(self, user_id):
+        """Date d'expiration de l'abonnement (None si l'utilisateur n'est pas premium)"""
         with self.engine.connect() as connection:
             result = connection.execute(text("""
                 SELECT is_premium, premium_expires
@@ -279,23 +759,39 @@ class Database:
             user = result.fetchone()
             
             if not user or not user[0]: # user[0] est is_premium
-                return False
-            
-            # Vérifier si l'abonnement n'a pas expiré
-            if user[1]: # user[1] est premium_expires
-                expiry = user[1]
-                if isinstance(expiry, str):
-                    expiry = datetime.strptime(expiry, '%Y-%m-%d %H:%M:%S')
-                
-                if expiry < datetime.now():
-                    self.update_premium_status(user_id, False)
-                    return False
+                return None
             
-            return True
+            expiry = user[1] # user[1] est premium_expires
+            if not expiry:
+                # Premium sans date d'expiration
+                return datetime.max
+            if isinstance(expiry, str):
+                expiry = datetime.strptime(expiry, '%Y-%m-%d %H:%M:%S')
+            return expiry
+
+    def expire_premium_subscriptions(self):
+        """Désactive en une seule requête tous les abonnements premium échus
+        
+        Returns:
+            int: Nombre d'abonnements désactivés
+        """
+        now = datetime.now()
+        premium_entitlements.next_sweep = time.monotonic() + PREMIUM_SWEEP_INTERVAL_SECONDS
+        with self._write_connection() as connection:
+            result = connection.execute(text(f"""
+                UPDATE users
+                SET is_premium = {'0' if self.is_sqlite else 'FALSE'}, premium_expires = NULL
+                WHERE is_premium = {'1' if self.is_sqlite else 'TRUE'}
+                  AND premium_expires IS NOT NULL AND premium_expires < :now
+            """), {'now': now.strftime('%Y-%m-%d %H:%M:%S')})
+            connection.commit()
+        premium_entitlements.forget_expired(now)
+        self.invalidate_user_cache(None, 'profile')
+        return result.rowcount
 
     def update_premium_status(self, user_id, is_premium, duration_days=30):
         """Met à jour le statut premium d'un utilisateur"""
-        with self.engine.connect() as connection:
+        with self._write_connection() as connection:
             if is_premium:
                 expiry = datetime.now() + timedelta(days=duration_days)
                 if self.is_sqlite:
@@ -324,10 +820,12 @@ class Database:
                         WHERE id = :user_id
                     """), {'user_id': user_id})
             connection.commit()
+        premium_entitlements.invalidate(user_id)
+        self.invalidate_user_cache(user_id, 'profile')
 
     def record_payment(self, user_id, amount, stripe_payment_id, status='completed'):
         """Enregistre un paiement"""
-        with self.engine.connect() as connection:
+        with self._write_connection() as connection:
             connection.execute(text("""
                 INSERT INTO payments (user_id, amount, stripe_payment_id, status)
                 VALUES (:user_id, :amount, :stripe_payment_id, :status)
@@ -340,7 +838,10 @@ class Database:
             connection.commit()
 
     def get_user_preferences(self, user_id):
-        """Récupère les préférences utilisateur"""
+        """Récupère les préférences utilisateur (avec cache)"""
+        return self._cached_user_value('preferences', user_id, self._query_user_preferences)
+
+    def _query_user_preferences(self, user_id):
         with self.engine.connect() as connection:
             result = connection.execute(text("""
                 SELECT * FROM user_preferences
@@ -370,53 +871,394 @@ class Database:
         params = dict(preferences)
         params['user_id'] = user_id
         
-        with self.engine.connect() as connection:
+        with self._write_connection() as connection:
             connection.execute(text(query), params)
             connection.commit()
+        self.invalidate_user_cache(user_id, 'preferences')
+
+    def _serialize_project_data(self, data):
+        """Sérialise les données d'un projet
+        
+        Les DataFrames sont stockés en colonnes Parquet compressées (zstd) quand
+        pyarrow est disponible, sans jamais passer par des dictionnaires ligne à ligne.
+        
+        Returns:
+            tuple: (storage_format, data_json, data_blob)
+        """
+        if not isinstance(data, pd.DataFrame):
+            return PROJECT_FORMAT_JSON, json.dumps(data, default=str), None
+        
+        if not PYARROW_AVAILABLE:
+            return PROJECT_FORMAT_JSON, data.to_json(orient='records', date_format='iso'), None
+        
+        buffer = io.BytesIO()
+        try:
+            data.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+        except (ValueError, TypeError, pa.ArrowException):
+            # Colonnes texte aux types mélangés ou noms non textuels: normaliser puis réessayer
+            data = data.copy()
+            data.columns = [str(col) for col in data.columns]
+            for col in data.select_dtypes(include=['object']).columns:
+                data[col] = data[col].where(data[col].isna(), data[col].astype(str))
+            buffer = io.BytesIO()
+            data.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+        
+        # data_json est NOT NULL dans le schéma historique
+        return PROJECT_FORMAT_PARQUET, 'null', buffer.getvalue()
+
+    def _deserialize_project_data(self, storage_format, data_json, data_blob):
+        """Reconstruit les données d'un projet selon son format de stockage"""
+        if storage_format == PROJECT_FORMAT_PARQUET:
+            if not PYARROW_AVAILABLE:
+                raise RuntimeError("pyarrow est requis pour charger ce projet (format Parquet)")
+            return pd.read_parquet(io.BytesIO(data_blob), engine='pyarrow')
+        
+        # Format JSON historique (ou données qui ne sont pas un tableau)
+        return json.loads(data_json) if isinstance(data_json, str) else data_json
+
+    def _now_sql(self):
+        """Expression SQL de la date courante selon le dialecte"""
+        return "datetime('now')" if self.is_sqlite else "NOW()"
+
+    def _upsert(self, connection, table_name, key_params, value_params):
+        """Met à jour une ligne identifiée par key_params, ou l'insère si elle n'existe pas"""
+        params = {**key_params, **value_params}
+        set_clause = ', '.join(f"{col} = :{col}" for col in value_params)
+        where_clause = ' AND '.join(f"{col} = :{col}" for col in key_params)
+        result = connection.execute(text(
+            f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}"
+        ), params)
+        if result.rowcount == 0:
+            connection.execute(text(
+                f"INSERT INTO {table_name} ({', '.join(params)}) "
+                f"VALUES ({', '.join(':' + col for col in params)})"
+            ), params)
+
+    def _summarize_results(self, results_dict):
+        """Résumé compact des analyses d'un projet (test, p-value, significativité)"""
+        summary = {}
+        for key, result in (results_dict or {}).items():
+            if not isinstance(result, dict):
+                continue
+            p_value = result.get('p_value')
+            summary[key] = {
+                'test': result.get('test') or result.get('test_name') or key,
+                'p_value': float(p_value) if isinstance(p_value, (int, float)) else None,
+                'significant': bool(result['significant']) if 'significant' in result else None
+            }
+        return summary
+
+    def _build_project_metadata(self, data, dataset_hash, size_bytes, results_dict, results_size_bytes):
+        """Calcule les métadonnées d'un projet au moment de la sauvegarde"""
+        if isinstance(data, pd.DataFrame):
+            row_count = len(data)
+            columns = [{'name': str(col), 'dtype': str(dtype)} for col, dtype in data.dtypes.items()]
+        elif isinstance(data, list):
+            row_count = len(data)
+            first = data[0] if data and isinstance(data[0], dict) else {}
+            columns = [{'name': str(col), 'dtype': None} for col in first]
+        else:
+            row_count = None
+            columns = []
+        
+        return {
+            'row_count': row_count,
+            'column_count': len(columns),
+            'columns_json': json.dumps(columns),
+            'data_size_bytes': size_bytes,
+            'results_size_bytes': results_size_bytes,
+            'checksum': dataset_hash,
+            'analysis_summary': json.dumps(self._summarize_results(results_dict), default=str)
+        }
+
+    def _get_project_id(self, connection, user_id, project_name):
+        result = connection.execute(text("""
+            SELECT id FROM saved_projects
+            WHERE user_id = :user_id AND project_name = :project_name
+        """), {'user_id': user_id, 'project_name': project_name})
+        row = result.fetchone()
+        return row[0] if row else None
+
+    def _select_in(self, connection, query, values):
+        """Exécute une requête contenant ':values' dans un IN (...), par lots"""
+        statement = text(query).bindparams(bindparam('values', expanding=True))
+        rows = []
+        for start in range(0, len(values), SQL_IN_BATCH_SIZE):
+            batch = values[start:start + SQL_IN_BATCH_SIZE]
+            rows.extend(connection.execute(statement, {'values': batch}).fetchall())
+        return rows
+
+    def _dataset_hash(self, data):
+        """Clé de contenu d'un jeu de données (empreinte des colonnes pour un DataFrame)"""
+        if isinstance(data, pd.DataFrame):
+            return dataframe_fingerprint(data)
+        return hashlib.sha256(json.dumps(data, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _prepare_dataset(self, data):
+        """Calcule la clé d'un jeu de données et, pour un DataFrame, son découpage en blocs
+        
+        Seules des empreintes sont calculées ici: la sérialisation n'a lieu que
+        pour les blocs absents de la base.
+        """
+        # Même clé quel que soit le format de stockage: une sauvegarde identique
+        # retrouve aussi les jeux de données enregistrés avant le découpage en blocs
+        dataset_hash = self._dataset_hash(data)
+        if isinstance(data, pd.DataFrame) and PYARROW_AVAILABLE:
+            manifest, chunks = split_dataframe(data)
+            return {'hash': dataset_hash, 'manifest': manifest, 'chunks': chunks, 'data': data}
+        return {'hash': dataset_hash, 'manifest': None, 'chunks': None, 'data': data}
+
+    def _store_chunks(self, connection, manifest, chunks):
+        """Écrit les blocs absents et référence tous les blocs du manifeste
+        
+        Returns:
+            int: Taille totale des blocs du jeu de données en octets
+        """
+        chunk_hashes = list(chunks)
+        sizes = dict(self._select_in(connection, """
+            SELECT chunk_hash, size_bytes FROM dataset_chunks WHERE chunk_hash IN :values
+        """, chunk_hashes))
+        
+        for chunk_hash in chunk_hashes:
+            if chunk_hash in sizes:
+                continue
+            blob = serialize_chunk(chunks[chunk_hash])
+            connection.execute(text("""
+                INSERT INTO dataset_chunks (chunk_hash, row_count, size_bytes, ref_count, data_blob)
+                VALUES (:chunk_hash, :row_count, :size_bytes, 0, :data_blob)
+            """), {
+                'chunk_hash': chunk_hash,
+                'row_count': len(chunks[chunk_hash]),
+                'size_bytes': len(blob),
+                'data_blob': blob
+            })
+            sizes[chunk_hash] = len(blob)
+        
+        references = Counter(manifest_chunk_hashes(manifest))
+        if references:
+            connection.execute(text("""
+                UPDATE dataset_chunks SET ref_count = ref_count + :count WHERE chunk_hash = :chunk_hash
+            """), [{'chunk_hash': h, 'count': n} for h, n in references.items()])
+        return sum(sizes[chunk_hash] for chunk_hash in chunk_hashes)
+
+    def _store_dataset(self, connection, dataset):
+        """Écrit un jeu de données s'il n'est pas déjà stocké
+        
+        Returns:
+            int: Taille stockée en octets
+        """
+        existing = connection.execute(text("""
+            SELECT size_bytes FROM datasets WHERE dataset_hash = :dataset_hash
+        """), {'dataset_hash': dataset['hash']}).fetchone()
+        if existing:
+            return existing[0]
+        
+        if dataset['manifest'] is not None:
+            storage_format = PROJECT_FORMAT_CHUNKED
+            data_json = json.dumps(dataset['manifest'], default=str)
+            data_blob = None
+            size_bytes = self._store_chunks(connection, dataset['manifest'], dataset['chunks'])
+        else:
+            storage_format, data_json, data_blob = self._serialize_project_data(dataset['data'])
+            size_bytes = len(data_blob) if data_blob is not None else len(data_json.encode('utf-8'))
+        
+        connection.execute(text("""
+            INSERT INTO datasets (dataset_hash, storage_format, format_version,
+                                  data_json, data_blob, size_bytes, ref_count)
+            VALUES (:dataset_hash, :storage_format, :format_version,
+                    :data_json, :data_blob, :size_bytes, 0)
+        """), {
+            'dataset_hash': dataset['hash'],
+            'storage_format': storage_format,
+            'format_version': PROJECT_FORMAT_VERSION,
+            'data_json': data_json if data_blob is None else None,
+            'data_blob': data_blob,
+            'size_bytes': size_bytes
+        })
+        return size_bytes
+
+    def _release_dataset(self, connection, dataset_hash):
+        """Décrémente le compteur de références et supprime le jeu de données orphelin
+        (ainsi que ses blocs qui ne sont plus utilisés)"""
+        params = {'dataset_hash': dataset_hash}
+        connection.execute(text("""
+            UPDATE datasets SET ref_count = ref_count - 1 WHERE dataset_hash = :dataset_hash
+        """), params)
+        row = connection.execute(text("""
+            SELECT ref_count, storage_format, data_json FROM datasets WHERE dataset_hash = :dataset_hash
+        """), params).fetchone()
+        if row is None or row[0] > 0:
+            return
+        
+        if row[1] == PROJECT_FORMAT_CHUNKED:
+            references = Counter(manifest_chunk_hashes(json.loads(row[2])))
+            if references:
+                chunk_params = [{'chunk_hash': h, 'count': n} for h, n in references.items()]
+                connection.execute(text("""
+                    UPDATE dataset_chunks SET ref_count = ref_count - :count WHERE chunk_hash = :chunk_hash
+                """), chunk_params)
+                connection.execute(text("""
+                    DELETE FROM dataset_chunks WHERE chunk_hash = :chunk_hash AND ref_count <= 0
+                """), [{'chunk_hash': h} for h in references])
+        connection.execute(text("DELETE FROM datasets WHERE dataset_hash = :dataset_hash"), params)
+
+    def _prepare_result_entries(self, results_dict):
+        """Sérialise chaque résultat d'analyse séparément
+        
+        Returns:
+            dict: {clé: (empreinte, json)}
+        """
+        entries = {}
+        for key, value in (results_dict or {}).items():
+            entry_json = json.dumps(value, default=str)
+            entries[str(key)] = (hashlib.sha256(entry_json.encode('utf-8')).hexdigest(), entry_json)
+        return entries
+
+    def _store_result_entries(self, connection, entries):
+        """Écrit uniquement les entrées de résultats absentes de la base"""
+        entry_hashes = list({entry_hash for entry_hash, _ in entries.values()})
+        existing = {row[0] for row in self._select_in(connection, """
+            SELECT entry_hash FROM result_entries WHERE entry_hash IN :values
+        """, entry_hashes)}
+        for entry_hash, entry_json in entries.values():
+            if entry_hash not in existing:
+                connection.execute(text("""
+                    INSERT INTO result_entries (entry_hash, ref_count, entry_json)
+                    VALUES (:entry_hash, 0, :entry_json)
+                """), {'entry_hash': entry_hash, 'entry_json': entry_json})
+                existing.add(entry_hash)
+
+    def _adjust_result_entries(self, connection, results_manifest, delta):
+        """Ajoute delta au compteur des entrées d'un manifeste de résultats"""
+        references = Counter((results_manifest or {}).values())
+        if not references:
+            return
+        connection.execute(text("""
+            UPDATE result_entries SET ref_count = ref_count + :count WHERE entry_hash = :entry_hash
+        """), [{'entry_hash': h, 'count': n * delta} for h, n in references.items()])
+        if delta < 0:
+            connection.execute(text("""
+                DELETE FROM result_entries WHERE entry_hash = :entry_hash AND ref_count <= 0
+            """), [{'entry_hash': h} for h in references])
+
+    def _release_version(self, connection, project_id, version, dataset_hash, results_manifest):
+        """Supprime une version de projet et libère ce qu'elle référence"""
+        if dataset_hash:
+            self._release_dataset(connection, dataset_hash)
+        if results_manifest:
+            self._adjust_result_entries(connection, json.loads(results_manifest), -1)
+        connection.execute(text("""
+            DELETE FROM project_versions WHERE project_id = :project_id AND version = :version
+        """), {'project_id': project_id, 'version': version})
+
+    def _prune_project_versions(self, connection, project_id):
+        """Ne conserve que les PROJECT_HISTORY_LIMIT dernières versions d'un projet"""
+        versions = connection.execute(text("""
+            SELECT version, dataset_hash, results_manifest FROM project_versions
+            WHERE project_id = :project_id
+            ORDER BY version DESC
+        """), {'project_id': project_id}).fetchall()
+        for version, dataset_hash, results_manifest in versions[max(PROJECT_HISTORY_LIMIT, 1):]:
+            self._release_version(connection, project_id, version, dataset_hash, results_manifest)
 
     def save_project(self, user_id, project_name, data_dict, results_dict=None):
-        """Sauvegarde un projet pour un utilisateur"""
+        """Sauvegarde un projet pour un utilisateur
+        
+        Les métadonnées, les données et les résultats sont écrits dans des tables
+        séparées afin de pouvoir les relire indépendamment. Les DataFrames sont
+        découpés en blocs immuables de colonnes (dataset_chunks) et les résultats
+        en entrées (result_entries), tous indexés par l'empreinte de leur contenu:
+        une nouvelle sauvegarde n'écrit que les blocs et entrées qui ont changé,
+        puis une nouvelle version (project_versions) pointant vers eux.
+        
+        Args:
+            user_id: ID de l'utilisateur
+            project_name: Nom du projet
+            data_dict: DataFrame (stockage en colonnes) ou objet sérialisable en JSON
+            results_dict: Résultats d'analyse (optionnel)
+        """
         try:
-            data_json = json.dumps(data_dict, default=str)
-            results_json = json.dumps(results_dict, default=str) if results_dict else None
+            dataset = self._prepare_dataset(data_dict)
+            entries = self._prepare_result_entries(results_dict)
+            results_manifest = {key: entry_hash for key, (entry_hash, _) in entries.items()}
+            results_manifest_json = json.dumps(results_manifest, sort_keys=True)
             
-            with self.engine.connect() as connection:
-                # Utiliser INSERT OR REPLACE pour gérer l'upsert (mise à jour ou insertion)
-                # Note: La syntaxe exacte dépend du dialecte SQL (MySQL, TiDB, etc.)
-                # Pour une compatibilité maximale, on tente un UPDATE puis un INSERT
+            with self._write_connection() as connection:
+                # 1. Ligne d'identité du projet (les colonnes historiques sont vidées)
+                update_result = connection.execute(text(f"""
+                    UPDATE saved_projects
+                    SET data_json = 'null', results_json = NULL, data_blob = NULL,
+                        updated_at = {self._now_sql()}
+                    WHERE user_id = :user_id AND project_name = :project_name
+                """), {'user_id': user_id, 'project_name': project_name})
                 
-                # 1. Tenter la mise à jour
-                if self.is_sqlite:
-                    update_query = """
-                        UPDATE saved_projects
-                        SET data_json = :data_json, results_json = :results_json, updated_at = datetime('now')
-                        WHERE user_id = :user_id AND project_name = :project_name
-                    """
-                else:
-                    update_query = """
-                        UPDATE saved_projects
-                        SET data_json = :data_json, results_json = :results_json, updated_at = NOW()
-                        WHERE user_id = :user_id AND project_name = :project_name
-                    """
+                if update_result.rowcount == 0:
+                    connection.execute(text("""
+                        INSERT INTO saved_projects (user_id, project_name, data_json)
+                        VALUES (:user_id, :project_name, 'null')
+                    """), {'user_id': user_id, 'project_name': project_name})
                 
-                update_result = connection.execute(text(update_query), {
-                    'user_id': user_id,
-                    'project_name': project_name,
-                    'data_json': data_json,
-                    'results_json': results_json
-                })
+                project_id = self._get_project_id(connection, user_id, project_name)
+                key = {'project_id': project_id}
                 
-                if update_result.rowcount == 0:
-                    # 2. Si aucune ligne n'a été mise à jour, effectuer l'insertion
+                # 2. Blocs de données et entrées de résultats: seuls les nouveaux sont écrits
+                size_bytes = self._store_dataset(connection, dataset)
+                self._store_result_entries(connection, entries)
+                
+                # 3. Nouvelle version uniquement si quelque chose a changé
+                latest = connection.execute(text("""
+                    SELECT version, dataset_hash, results_manifest FROM project_versions
+                    WHERE project_id = :project_id
+                    ORDER BY version DESC
+                    LIMIT 1
+                """), key).fetchone()
+                
+                if latest is None or latest[1] != dataset['hash'] or latest[2] != results_manifest_json:
+                    version = (latest[0] if latest else 0) + 1
                     connection.execute(text("""
-                        INSERT INTO saved_projects (user_id, project_name, data_json, results_json)
-                        VALUES (:user_id, :project_name, :data_json, :results_json)
+                        INSERT INTO project_versions (project_id, version, dataset_hash, results_manifest)
+                        VALUES (:project_id, :version, :dataset_hash, :results_manifest)
                     """), {
-                        'user_id': user_id,
-                        'project_name': project_name,
-                        'data_json': data_json,
-                        'results_json': results_json
+                        'project_id': project_id,
+                        'version': version,
+                        'dataset_hash': dataset['hash'],
+                        'results_manifest': results_manifest_json
                     })
+                    connection.execute(text("""
+                        UPDATE datasets SET ref_count = ref_count + 1
+                        WHERE dataset_hash = :dataset_hash
+                    """), {'dataset_hash': dataset['hash']})
+                    self._adjust_result_entries(connection, results_manifest, 1)
+                    self._prune_project_versions(connection, project_id)
+                else:
+                    version = latest[0]
+                
+                # 4. Pointeurs vers la version courante
+                connection.execute(text("""
+                    UPDATE saved_projects SET current_version = :version WHERE id = :project_id
+                """), {'version': version, 'project_id': project_id})
+                self._upsert(connection, 'project_data', key, {
+                    'dataset_hash': dataset['hash'],
+                    'storage_format': 'dataset',
+                    'format_version': PROJECT_FORMAT_VERSION,
+                    'data_json': None,
+                    'data_blob': None
+                })
+                # Résultats enregistrés d'un bloc avant le stockage par entrées
+                connection.execute(text("""
+                    DELETE FROM project_results WHERE project_id = :project_id
+                """), key)
+                
+                # 5. Métadonnées
+                metadata = self._build_project_metadata(
+                    data_dict, dataset['hash'], size_bytes, results_dict,
+                    sum(len(entry_json.encode('utf-8')) for _, entry_json in entries.values())
+                )
+                self._upsert(connection, 'project_metadata', key, metadata)
+                connection.execute(text(f"""
+                    UPDATE project_metadata SET updated_at = {self._now_sql()}
+                    WHERE project_id = :project_id
+                """), key)
                 
                 connection.commit()
                 return True
@@ -424,23 +1266,173 @@ class Database:
             print(f"Erreur lors de la sauvegarde du projet: {e}")
             return False
 
-    def load_project(self, user_id, project_name):
-        """Charge un projet pour un utilisateur"""
+    def get_project_metadata(self, user_id, project_name):
+        """Récupère les métadonnées d'un projet sans lire ses données
+        
+        Returns:
+            dict: Nombre de lignes, schéma des colonnes, tailles, checksum et
+            résumé des analyses (None si le projet n'existe pas)
+        """
         with self.engine.connect() as connection:
             result = connection.execute(text("""
-                SELECT data_json, results_json
-                FROM saved_projects
-                WHERE user_id = :user_id AND project_name = :project_name
+                SELECT p.id, p.project_name, p.created_at, p.updated_at, p.current_version,
+                       m.row_count, m.column_count, m.columns_json, m.data_size_bytes,
+                       m.results_size_bytes, m.checksum, m.analysis_summary
+                FROM saved_projects p
+                LEFT JOIN project_metadata m ON m.project_id = p.id
+                WHERE p.user_id = :user_id AND p.project_name = :project_name
+            """), {'user_id': user_id, 'project_name': project_name})
+            
+            row = result.fetchone()
+            return self._metadata_row_to_dict(row) if row else None
+
+    def _metadata_row_to_dict(self, row):
+        metadata = dict(row._mapping)
+        for key in ('columns_json', 'analysis_summary'):
+            value = metadata.get(key)
+            if isinstance(value, str):
+                metadata[key] = json.loads(value)
+        metadata['columns'] = metadata.pop('columns_json', None) or []
+        return metadata
+
+    def _load_dataset(self, connection, storage_format, data_json, data_blob):
+        """Reconstruit un jeu de données, en relisant ses blocs s'il est découpé"""
+        if storage_format != PROJECT_FORMAT_CHUNKED:
+            return self._deserialize_project_data(storage_format, data_json, data_blob)
+        
+        manifest = json.loads(data_json)
+        chunk_hashes = list(dict.fromkeys(manifest_chunk_hashes(manifest)))
+        rows = self._select_in(connection, """
+            SELECT chunk_hash, data_blob FROM dataset_chunks WHERE chunk_hash IN :values
+        """, chunk_hashes)
+        chunks = {chunk_hash: deserialize_chunk(blob) for chunk_hash, blob in rows}
+        return assemble_dataframe(manifest, chunks)
+
+    def load_project_data(self, user_id, project_name, version=None):
+        """Charge uniquement les données d'un projet
+        
+        Args:
+            version: Numéro de version à charger (version courante par défaut)
+        
+        Returns:
+            DataFrame pour les projets stockés en colonnes, l'objet JSON
+            d'origine sinon (None si le projet ou la version n'existe pas)
+        """
+        with self.engine.connect() as connection:
+            if version is not None:
+                row = connection.execute(text("""
+                    SELECT s.storage_format, s.data_json, s.data_blob
+                    FROM saved_projects p
+                    JOIN project_versions v ON v.project_id = p.id AND v.version = :version
+                    JOIN datasets s ON s.dataset_hash = v.dataset_hash
+                    WHERE p.user_id = :user_id AND p.project_name = :project_name
+                """), {'user_id': user_id, 'project_name': project_name, 'version': version}).fetchone()
+                return self._load_dataset(connection, *row) if row else None
+            
+            result = connection.execute(text("""
+                SELECT d.project_id, d.dataset_hash,
+                       s.storage_format, s.data_json, s.data_blob,
+                       d.storage_format, d.data_json, d.data_blob,
+                       p.storage_format, p.data_json, p.data_blob
+                FROM saved_projects p
+                LEFT JOIN project_data d ON d.project_id = p.id
+                LEFT JOIN datasets s ON s.dataset_hash = d.dataset_hash
+                WHERE p.user_id = :user_id AND p.project_name = :project_name
             """), {'user_id': user_id, 'project_name': project_name})
             
-            project = result.fetchone()
+            row = result.fetchone()
+            if not row:
+                return None
             
-            if project:
-                data_dict = json.loads(project[0])
-                results_dict = json.loads(project[1]) if project[1] else None
-                return data_dict, results_dict
+            if row[1] is not None:
+                return self._load_dataset(connection, row[2], row[3], row[4])
+            if row[0] is not None:
+                # Données copiées dans project_data avant le stockage partagé
+                return self._deserialize_project_data(row[5], row[6], row[7])
+            # Projet enregistré avant la séparation des tables
+            return self._deserialize_project_data(row[8], row[9], row[10])
+
+    def load_project_results(self, user_id, project_name, version=None):
+        """Charge uniquement les résultats d'analyse d'un projet
+        
+        Args:
+            version: Numéro de version à charger (version courante par défaut)
+        """
+        with self.engine.connect() as connection:
+            result = connection.execute(text("""
+                SELECT v.results_manifest, r.project_id, r.results_json, p.results_json
+                FROM saved_projects p
+                LEFT JOIN project_versions v
+                       ON v.project_id = p.id AND v.version = COALESCE(:version, p.current_version)
+                LEFT JOIN project_results r ON r.project_id = p.id
+                WHERE p.user_id = :user_id AND p.project_name = :project_name
+            """), {'user_id': user_id, 'project_name': project_name, 'version': version})
+            
+            row = result.fetchone()
+            if not row:
+                return None
+            
+            if row[0] is not None:
+                results_manifest = json.loads(row[0])
+                if not results_manifest:
+                    return None
+                entries = dict(self._select_in(connection, """
+                    SELECT entry_hash, entry_json FROM result_entries WHERE entry_hash IN :values
+                """, list(set(results_manifest.values()))))
+                return {key: json.loads(entries[entry_hash]) for key, entry_hash in results_manifest.items()}
             
+            # Résultats enregistrés avant le stockage par entrées
+            results_json = row[2] if row[1] is not None else row[3]
+            return json.loads(results_json) if results_json else None
+
+    def list_project_versions(self, user_id, project_name):
+        """Liste l'historique des versions d'un projet (de la plus récente à la plus ancienne)"""
+        with self.engine.connect() as connection:
+            result = connection.execute(text("""
+                SELECT v.version, v.created_at, v.dataset_hash, s.size_bytes,
+                       v.results_manifest, p.current_version
+                FROM saved_projects p
+                JOIN project_versions v ON v.project_id = p.id
+                LEFT JOIN datasets s ON s.dataset_hash = v.dataset_hash
+                WHERE p.user_id = :user_id AND p.project_name = :project_name
+                ORDER BY v.version DESC
+            """), {'user_id': user_id, 'project_name': project_name})
+            
+            versions = []
+            for row in result:
+                versions.append({
+                    'version': row[0],
+                    'created_at': row[1],
+                    'dataset_hash': row[2],
+                    'size_bytes': row[3],
+                    'results': sorted(json.loads(row[4])) if row[4] else [],
+                    'is_current': row[0] == row[5]
+                })
+            return versions
+
+    def load_project(self, user_id, project_name):
+        """Charge un projet pour un utilisateur
+        
+        Returns:
+            tuple: (données, résultats). Les données sont un DataFrame pour les
+            projets stockés en colonnes, l'objet JSON d'origine sinon.
+        """
+        data = self.load_project_data(user_id, project_name)
+        if data is None:
             return None, None
+        return data, self.load_project_results(user_id, project_name)
+
+    def open_project(self, user_id, project_name, version=None):
+        """Ouvre un projet en chargement paresseux
+        
+        Args:
+            version: Numéro de version à ouvrir (version courante par défaut)
+        
+        Returns:
+            LazyProject: accès à .metadata, .data et .results, chacun lu en base
+            uniquement lors du premier accès
+        """
+        return LazyProject(self, user_id, project_name, version)
 
     def list_projects(self, user_id):
         """Liste les projets sauvegardés pour un utilisateur"""
@@ -456,7 +1448,19 @@ class Database:
 
     def delete_project(self, user_id, project_name):
         """Supprime un projet"""
-        with self.engine.connect() as connection:
+        with self._write_connection() as connection:
+            project_id = self._get_project_id(connection, user_id, project_name)
+            if project_id is not None:
+                versions = connection.execute(text("""
+                    SELECT version, dataset_hash, results_manifest FROM project_versions
+                    WHERE project_id = :project_id
+                """), {'project_id': project_id}).fetchall()
+                for version, dataset_hash, results_manifest in versions:
+                    self._release_version(connection, project_id, version, dataset_hash, results_manifest)
+                for table_name in ('project_metadata', 'project_data', 'project_results'):
+                    connection.execute(text(f"""
+                        DELETE FROM {table_name} WHERE project_id = :project_id
+                    """), {'project_id': project_id})
             connection.execute(text("""
                 DELETE FROM saved_projects
                 WHERE user_id = :user_id AND project_name = :project_name
@@ -464,8 +1468,53 @@ class Database:
             connection.commit()
             return True
 
+    def collect_unreferenced_datasets(self):
+        """Recalcule les compteurs de références et supprime les données orphelines
+        (jeux de données, blocs et entrées de résultats)
+        
+        Returns:
+            int: Nombre de jeux de données supprimés
+        """
+        with self._write_connection() as connection:
+            connection.execute(text("""
+                UPDATE datasets SET ref_count = (
+                    SELECT COUNT(*) FROM project_versions v
+                    WHERE v.dataset_hash = datasets.dataset_hash
+                )
+            """))
+            removed = connection.execute(text("DELETE FROM datasets WHERE ref_count <= 0")).rowcount
+            
+            chunk_references = Counter()
+            for (data_json,) in connection.execute(text("""
+                SELECT data_json FROM datasets WHERE storage_format = :storage_format
+            """), {'storage_format': PROJECT_FORMAT_CHUNKED}):
+                chunk_references.update(manifest_chunk_hashes(json.loads(data_json)))
+            
+            entry_references = Counter()
+            for (results_manifest,) in connection.execute(text("""
+                SELECT results_manifest FROM project_versions WHERE results_manifest IS NOT NULL
+            """)):
+                entry_references.update(json.loads(results_manifest).values())
+            
+            for table_name, key_column, references in (
+                ('dataset_chunks', 'chunk_hash', chunk_references),
+                ('result_entries', 'entry_hash', entry_references),
+            ):
+                connection.execute(text(f"UPDATE {table_name} SET ref_count = 0"))
+                if references:
+                    connection.execute(text(f"""
+                        UPDATE {table_name} SET ref_count = :count WHERE {key_column} = :key
+                    """), [{'key': key, 'count': count} for key, count in references.items()])
+                connection.execute(text(f"DELETE FROM {table_name} WHERE ref_count <= 0"))
+            
+            connection.commit()
+            return removed
+
     def get_user_profile(self, user_id):
-        """Récupère le profil complet d'un utilisateur"""
+        """Récupère le profil complet d'un utilisateur (avec cache)"""
+        return self._cached_user_value('profile', user_id, self._query_user_profile)
+
+    def _query_user_profile(self, user_id):
         with self.engine.connect() as connection:
             result = connection.execute(text("""
                 SELECT * FROM users
@@ -494,21 +1543,70 @@ class Database:
         params = dict(profile_data)
         params['user_id'] = user_id
         
-        with self.engine.connect() as connection:
+        with self._write_connection() as connection:
             connection.execute(text(query), params)
             connection.commit()
+        self.invalidate_user_cache(user_id, 'profile')
+        if 'is_premium' in profile_data or 'premium_expires' in profile_data:
+            premium_entitlements.invalidate(user_id)
 
     def get_user_projects(self, user_id):
-        """Récupère tous les projets d'un utilisateur"""
+        """Récupère tous les projets d'un utilisateur avec leurs métadonnées
+        
+        Seule la table project_metadata est jointe: aucune donnée ni aucun
+        résultat de projet n'est lu.
+        """
         with self.engine.connect() as connection:
             result = connection.execute(text("""
-                SELECT id, project_name, created_at, updated_at
-                FROM saved_projects
-                WHERE user_id = :user_id
-                ORDER BY updated_at DESC
+                SELECT p.id, p.project_name, p.created_at, p.updated_at, p.current_version,
+                       m.row_count, m.column_count, m.columns_json, m.data_size_bytes,
+                       m.results_size_bytes, m.checksum, m.analysis_summary
+                FROM saved_projects p
+                LEFT JOIN project_metadata m ON m.project_id = p.id
+                WHERE p.user_id = :user_id
+                ORDER BY p.updated_at DESC
             """), {'user_id': user_id})
             
-            return [dict(row._mapping) for row in result]
+            return [self._metadata_row_to_dict(row) for row in result]
+
+
+class LazyProject:
+    """Projet sauvegardé dont chaque partie est chargée au premier accès"""
+
+    def __init__(self, db, user_id, project_name, version=None):
+        self.db = db
+        self.user_id = user_id
+        self.project_name = project_name
+        self.version = version
+        self._metadata = None
+        self._data = None
+        self._results = None
+        self._loaded = set()
+
+    @property
+    def metadata(self):
+        if 'metadata' not in self._loaded:
+            self._metadata = self.db.get_project_metadata(self.user_id, self.project_name)
+            self._loaded.add('metadata')
+        return self._metadata
+
+    @property
+    def data(self):
+        if 'data' not in self._loaded:
+            self._data = self.db.load_project_data(self.user_id, self.project_name, self.version)
+            self._loaded.add('data')
+        return self._data
+
+    @property
+    def results(self):
+        if 'results' not in self._loaded:
+            self._results = self.db.load_project_results(self.user_id, self.project_name, self.version)
+            self._loaded.add('results')
+        return self._results
+
+    def exists(self):
+        """Indique si le projet existe (lecture des seules métadonnées)"""
+        return self.metadata is not None
 
 # Note: Ce fichier contient l'implémentation de la base de données
 # Les opérations de migration/renommage de fichiers doivent être faites manuellement si nécessaire
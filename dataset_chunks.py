@@ -0,0 +1,180 @@
+"""
+Module de découpage des jeux de données en blocs immuables
+Chaque colonne est découpée en blocs dont les frontières dépendent du contenu,
+si bien qu'une modification locale (colonne ajoutée, lignes filtrées, valeurs
+corrigées) ne change que les blocs concernés.
+"""
+
+import io
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+# Tailles des blocs en lignes (la taille moyenne doit être une puissance de 2)
+CHUNK_MIN_ROWS = 4096
+CHUNK_AVG_ROWS = 16384
+CHUNK_MAX_ROWS = 65536
+# Nombre de valeurs consécutives prises en compte pour placer une frontière
+BOUNDARY_WINDOW = 32
+
+MANIFEST_VERSION = 1
+
+
+def _series_hashes(series):
+    """Hachage vectorisé des valeurs d'une colonne (uint64 par ligne)"""
+    try:
+        hashes = pd.util.hash_pandas_object(series, index=False)
+    except TypeError:
+        hashes = pd.util.hash_pandas_object(series.astype(str), index=False)
+    return hashes.to_numpy(dtype=np.uint64)
+
+
+def _mix(values):
+    """Mélange les bits d'un tableau uint64 (finaliseur de splitmix64)"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def chunk_boundaries(row_hashes, min_rows=CHUNK_MIN_ROWS, avg_rows=CHUNK_AVG_ROWS,
+                     max_rows=CHUNK_MAX_ROWS):
+    """
+    Place les frontières de blocs à partir du contenu
+
+    Une frontière est posée après la ligne i lorsque le hachage glissant des
+    BOUNDARY_WINDOW dernières valeurs est multiple de avg_rows, dans la limite
+    des tailles minimale et maximale.
+
+    Parameters:
+    row_hashes (np.ndarray): Hachages uint64 des valeurs
+    min_rows (int): Taille minimale d'un bloc
+    avg_rows (int): Taille moyenne visée (puissance de 2)
+    max_rows (int): Taille maximale d'un bloc
+
+    Returns:
+    list: Positions [0, ..., n] délimitant les blocs
+    """
+    n = len(row_hashes)
+    if n <= min_rows:
+        return [0, n]
+
+    with np.errstate(over='ignore'):
+        cumulative = np.cumsum(row_hashes, dtype=np.uint64)
+        window = cumulative.copy()
+        window[BOUNDARY_WINDOW:] -= cumulative[:-BOUNDARY_WINDOW]
+        mixed = _mix(window)
+    candidates = np.flatnonzero((mixed & np.uint64(avg_rows - 1)) == 0) + 1
+
+    boundaries = [0]
+    last = 0
+    for cut in candidates.tolist():
+        while cut - last > max_rows:
+            last += max_rows
+            boundaries.append(last)
+        if cut - last >= min_rows and n - cut >= min_rows:
+            boundaries.append(cut)
+            last = cut
+    while n - last > max_rows:
+        last += max_rows
+        boundaries.append(last)
+    boundaries.append(n)
+    return boundaries
+
+
+def split_dataframe(df):
+    """
+    Découpe un DataFrame en blocs colonne par colonne
+
+    Parameters:
+    df (pd.DataFrame): Données à découper
+
+    Returns:
+    tuple: (manifest, chunks) où manifest décrit les colonnes et la liste
+    ordonnée de leurs blocs, et chunks associe chaque empreinte de bloc à la
+    série correspondante
+    """
+    columns = []
+    chunks = {}
+
+    for position in range(df.shape[1]):
+        name = df.columns[position]
+        series = df.iloc[:, position]
+        hashes = _series_hashes(series)
+
+        # Le type (catégories comprises) fait partie de l'empreinte de chaque bloc
+        dtype_token = str(series.dtype)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories_hash = _series_hashes(pd.Series(series.cat.categories))
+            dtype_token += hashlib.sha256(categories_hash.tobytes()).hexdigest()
+            dtype_token += str(series.cat.ordered)
+
+        chunk_hashes = []
+        boundaries = chunk_boundaries(hashes)
+        for start, stop in zip(boundaries[:-1], boundaries[1:]):
+            digest = hashlib.sha256(dtype_token.encode('utf-8'))
+            digest.update(str(stop - start).encode('utf-8'))
+            digest.update(hashes[start:stop].tobytes())
+            chunk_hash = digest.hexdigest()
+            chunk_hashes.append(chunk_hash)
+            if chunk_hash not in chunks:
+                chunks[chunk_hash] = series.iloc[start:stop]
+
+        columns.append({'name': name, 'dtype': str(series.dtype), 'chunks': chunk_hashes})
+
+    manifest = {'version': MANIFEST_VERSION, 'row_count': len(df), 'columns': columns}
+    return manifest, chunks
+
+
+def manifest_chunk_hashes(manifest):
+    """Liste de toutes les références de blocs d'un manifeste (avec répétitions)"""
+    return [chunk_hash for column in manifest['columns'] for chunk_hash in column['chunks']]
+
+
+def serialize_chunk(series):
+    """Sérialise un bloc de colonne en Parquet compressé"""
+    frame = pd.DataFrame({'values': series.reset_index(drop=True)})
+    buffer = io.BytesIO()
+    try:
+        frame.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+    except (ValueError, TypeError):
+        # Colonne texte aux types mélangés (refusée par pyarrow): conserver la représentation texte
+        values = frame['values']
+        frame['values'] = values.where(values.isna(), values.astype(str))
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+    return buffer.getvalue()
+
+
+def deserialize_chunk(blob):
+    """Relit un bloc de colonne sérialisé par serialize_chunk"""
+    return pd.read_parquet(io.BytesIO(blob), engine='pyarrow')['values']
+
+
+def assemble_dataframe(manifest, chunks):
+    """
+    Reconstruit un DataFrame à partir de son manifeste
+
+    Parameters:
+    manifest (dict): Manifeste produit par split_dataframe
+    chunks (dict): Séries des blocs indexées par empreinte
+
+    Returns:
+    pd.DataFrame: Données reconstruites
+    """
+    data = {}
+    names = []
+    for position, column in enumerate(manifest['columns']):
+        parts = [chunks[chunk_hash] for chunk_hash in column['chunks']]
+        if parts:
+            series = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+        else:
+            series = pd.Series([], dtype=object)
+        data[position] = series
+        names.append(column['name'])
+
+    df = pd.DataFrame(data, index=pd.RangeIndex(manifest['row_count']))
+    df.columns = names
+    return df
@@ -0,0 +1,115 @@
+"""
+Module de diagnostics de distribution
+Chaque test de normalité (Shapiro-Wilk, Kolmogorov-Smirnov, Jarque-Bera,
+Anderson-Darling) est calculé une seule fois par échantillon et mémorisé.
+Au-delà de la limite de validité de Shapiro-Wilk (5000 valeurs), le test est
+effectué sur un sous-échantillon aléatoire reproductible.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from scipy import stats
+
+# Limite de validité de la p-value de Shapiro-Wilk
+SHAPIRO_MAX_N = 5000
+# Nombre de résultats conservés en mémoire
+DIAGNOSTICS_CACHE_SIZE = 512
+NORMALITY_ALPHA = 0.05
+
+
+class DistributionDiagnostics:
+    """Tests de distribution mémorisés par empreinte d'échantillon"""
+
+    def __init__(self, cache_size=DIAGNOSTICS_CACHE_SIZE, shapiro_max_n=SHAPIRO_MAX_N, seed=0):
+        self.cache_size = cache_size
+        self.shapiro_max_n = shapiro_max_n
+        self.seed = seed
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _memoize(self, test_name, data, compute):
+        values = np.ascontiguousarray(np.asarray(data, dtype=float))
+        digest = hashlib.sha256(values.tobytes())
+        digest.update(test_name.encode('utf-8'))
+        key = digest.hexdigest()
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return dict(self._cache[key])
+            self.stats['misses'] += 1
+
+        result = compute(values)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(result)
+
+    def shapiro(self, data):
+        """Shapiro-Wilk (sous-échantillon de shapiro_max_n valeurs au-delà de la limite)"""
+        def compute(values):
+            sample = values
+            if len(values) > self.shapiro_max_n:
+                rng = np.random.default_rng(self.seed)
+                sample = rng.choice(values, self.shapiro_max_n, replace=False)
+            statistic, p_value = stats.shapiro(sample)
+            return {
+                'statistic': statistic,
+                'p_value': p_value,
+                'normal': p_value > NORMALITY_ALPHA,
+                'sample_size': len(sample),
+                'subsampled': len(sample) < len(values)
+            }
+        return self._memoize('shapiro', data, compute)
+
+    def kstest(self, data, distribution='norm'):
+        """Kolmogorov-Smirnov contre une loi de référence (paramètres par défaut de scipy)"""
+        def compute(values):
+            statistic, p_value = stats.kstest(values, distribution)
+            return {'statistic': statistic, 'p_value': p_value, 'normal': p_value > NORMALITY_ALPHA}
+        return self._memoize(f'kstest:{distribution}', data, compute)
+
+    def jarque_bera(self, data):
+        def compute(values):
+            statistic, p_value = stats.jarque_bera(values)
+            return {'statistic': statistic, 'p_value': p_value, 'normal': p_value > NORMALITY_ALPHA}
+        return self._memoize('jarque_bera', data, compute)
+
+    def anderson(self, data):
+        """Anderson-Darling (loi normale): statistique, valeurs critiques et seuils"""
+        def compute(values):
+            result = stats.anderson(values, dist='norm')
+            return {
+                'statistic': result[0],
+                'critical_values': result[1],
+                'significance_levels': result[2]
+            }
+        return self._memoize('anderson', data, compute)
+
+    def normality_tests(self, data, tests=('shapiro_wilk', 'kolmogorov_smirnov', 'jarque_bera')):
+        """
+        Batterie de tests de normalité d'un échantillon
+
+        Returns:
+        dict: {nom du test: {'statistic', 'p_value', 'normal', ...}}
+        """
+        methods = {
+            'shapiro_wilk': self.shapiro,
+            'kolmogorov_smirnov': self.kstest,
+            'jarque_bera': self.jarque_bera,
+            'anderson_darling': self.anderson,
+        }
+        return {name: methods[name](data) for name in tests}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Instance partagée par les analyseurs du processus
+distribution_diagnostics = DistributionDiagnostics()
@@ -0,0 +1,59 @@
+"""
+Module d'agrégation par groupe en un seul passage
+Une spécification déclarative décrit les métriques à calculer sous la forme
+(nom de la métrique, colonne source, fonction). La clé de groupe est
+factorisée une seule fois et toutes les métriques sont calculées par un seul
+appel à agg sur le même regroupement; les lignes sans clé sont écartées par
+leur code (-1) plutôt que par une copie filtrée des données.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def metric_spec(columns, functions):
+    """
+    Spécification « une métrique par colonne et par fonction »
+
+    Parameters:
+    columns (list): Colonnes sources
+    functions (dict): {suffixe du nom: fonction}, ex. {'moyenne': 'mean'}
+
+    Returns:
+    list: [(f'{colonne}_{suffixe}', colonne, fonction)]
+    """
+    return [(f'{column}_{suffix}', column, function)
+            for column in columns for suffix, function in functions.items()]
+
+
+def aggregate_by_group(df, by, spec, size_name=None, sort=True):
+    """
+    Agrège les métriques d'une spécification par groupe
+
+    Parameters:
+    df (pd.DataFrame): Données
+    by (str ou pd.Series): Colonne de groupe, ou série alignée sur df
+    spec (list): [(nom, colonne, fonction)]; les métriques dont la colonne
+        est absente sont ignorées
+    size_name (str): Nom de la colonne du nombre de lignes par groupe (None = aucune)
+    sort (bool): Groupes triés (sinon dans l'ordre d'apparition)
+
+    Returns:
+    pd.DataFrame: Une ligne par groupe (index = valeurs de la clé), colonnes
+    dans l'ordre de la spécification
+    """
+    key = df[by] if isinstance(by, str) else by
+    codes, uniques = pd.factorize(key, sort=sort)
+    named = {name: pd.NamedAgg(column=column, aggfunc=function)
+             for name, column, function in spec if column in df.columns}
+
+    # Regroupement sur les codes déjà calculés (code -1 = clé manquante, écartée)
+    group_codes = pd.Categorical.from_codes(codes, categories=np.arange(len(uniques)))
+    grouped = df.groupby(group_codes, observed=True, sort=True)
+    stats = grouped.agg(**named) if named else pd.DataFrame(index=grouped.size().index)
+    if size_name:
+        stats[size_name] = grouped.size()
+
+    stats.index = pd.Index(uniques).take(stats.index.to_numpy(dtype=np.intp))
+    stats.index.name = key.name
+    return stats
@@ -0,0 +1,108 @@
+"""
+Module de regroupement des données en un seul passage
+La colonne de groupes est factorisée une seule fois et les valeurs sont rangées
+dans un tampon NumPy contigu: chaque groupe est une vue (sans copie) de ce
+tampon, partagée par le test principal, les post-hoc, les statistiques
+descriptives et les tests de normalité.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class GroupedArrays:
+    """Valeurs d'une colonne regroupées selon une colonne de groupes"""
+
+    def __init__(self, df, column, group_column):
+        """
+        Parameters:
+        df (pd.DataFrame): Données
+        column (str): Colonne de valeurs (les valeurs manquantes sont ignorées)
+        group_column (str): Colonne définissant les groupes
+        """
+        # Ordre des groupes identique à df[group_column].unique()
+        codes, uniques = pd.factorize(df[group_column], sort=False)
+        values = df[column].to_numpy()
+
+        valid = (codes >= 0) & pd.notna(values)
+        positions = np.flatnonzero(valid)
+        codes = codes[valid]
+
+        # Tri stable par code: les lignes de chaque groupe gardent leur ordre d'origine
+        order = np.argsort(codes, kind='stable')
+        self.positions = positions[order]
+        self.values = np.ascontiguousarray(values[self.positions])
+        self._index = df.index
+
+        counts = np.bincount(codes, minlength=len(uniques))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        non_empty = np.flatnonzero(counts > 0)
+
+        self.labels = [uniques[i] for i in non_empty]
+        self.starts = offsets[non_empty]
+        self.stops = offsets[non_empty + 1]
+        self.sizes = counts[non_empty]
+        self._ranks = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def n_total(self):
+        return len(self.values)
+
+    def array(self, i):
+        """Valeurs du groupe i (vue sur le tampon contigu)"""
+        return self.values[self.starts[i]:self.stops[i]]
+
+    def arrays(self):
+        """Vues de tous les groupes, dans l'ordre des libellés"""
+        return [self.array(i) for i in range(len(self))]
+
+    def series(self, i):
+        """Valeurs du groupe i en Series indexée comme les lignes d'origine (sans copie)"""
+        index = self._index[self.positions[self.starts[i]:self.stops[i]]]
+        return pd.Series(self.array(i), index=index, copy=False)
+
+    @property
+    def ranks(self):
+        """Rangs de toutes les valeurs (ex-aequo moyennés), calculés une seule fois"""
+        if self._ranks is None:
+            self._ranks = stats.rankdata(self.values)
+        return self._ranks
+
+    def kruskal(self):
+        """
+        Test de Kruskal-Wallis à partir des rangs communs (identique à stats.kruskal)
+
+        Returns:
+        tuple: (statistique H, p-value)
+        """
+        n = self.n_total
+        rank_sums = np.add.reduceat(self.ranks, self.starts)
+        h = 12.0 / (n * (n + 1)) * np.sum(rank_sums ** 2 / self.sizes) - 3 * (n + 1)
+        ties = stats.tiecorrect(self.ranks)
+        if ties == 0:
+            return np.nan, np.nan
+        h /= ties
+        return h, stats.chi2.sf(h, len(self) - 1)
+
+    def describe(self, i):
+        """Statistiques descriptives du groupe i (mêmes conventions que pandas)"""
+        data = self.array(i)
+        q25, median, q75 = np.quantile(data, [0.25, 0.5, 0.75])
+        std = data.std(ddof=1) if len(data) > 1 else np.nan
+        return {
+            'group': self.labels[i],
+            'n': len(data),
+            'mean': data.mean(),
+            'median': median,
+            'std': std,
+            'q25': q25,
+            'q75': q75,
+            'min': data.min(),
+            'max': data.max(),
+            'skewness': stats.skew(data),
+            'kurtosis': stats.kurtosis(data)
+        }
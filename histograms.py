@@ -0,0 +1,102 @@
+"""
+Module de calcul des histogrammes côté serveur
+Les effectifs sont calculés avec np.histogram et mis en cache par empreinte
+des données, métrique et choix des classes: le graphique ne reçoit que les
+bornes et effectifs des classes. Par défaut, la largeur des classes suit la
+règle de Freedman-Diaconis; pour les distributions à queue lourde (likes,
+vues), les classes sont logarithmiques.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from utils import dataframe_fingerprint
+
+load_dotenv()
+
+# Bornes du nombre de classes
+HISTOGRAM_MAX_BINS = int(os.getenv('HISTOGRAM_MAX_BINS', '100'))
+HISTOGRAM_MIN_BINS = 10
+# Étendue / étendue des 98 % centraux au-delà de laquelle les classes sont logarithmiques
+HEAVY_TAIL_RATIO = 10
+# Histogrammes conservés en mémoire
+HISTOGRAM_CACHE_SIZE = 64
+
+_histograms = OrderedDict()
+_histograms_lock = threading.Lock()
+
+
+def _freedman_diaconis_bins(values):
+    """Nombre de classes de Freedman-Diaconis (None si l'écart interquartile est nul)"""
+    q25, q75 = np.quantile(values, [0.25, 0.75])
+    width = 2 * (q75 - q25) / len(values) ** (1 / 3)
+    if width <= 0:
+        return None
+    return int(np.ceil((values.max() - values.min()) / width))
+
+
+def _bin_edges(values, bins):
+    """Bornes des classes et échelle ('linear' ou 'log')"""
+    if isinstance(bins, int):
+        return np.histogram_bin_edges(values, bins=bins), 'linear'
+
+    # Queue lourde: l'étendue dépasse largement celle des 98 % centraux
+    q01, q99 = np.quantile(values, [0.01, 0.99])
+    heavy_tailed = values.min() >= 0 and values.max() - values.min() > HEAVY_TAIL_RATIO * (q99 - q01)
+    if bins == 'log' or (bins == 'auto' and heavy_tailed):
+        if values.min() < 0:
+            raise ValueError("Classes logarithmiques impossibles avec des valeurs négatives")
+        # Classes régulières sur log(1 + x): les valeurs nulles restent représentées
+        edges = np.expm1(np.linspace(np.log1p(values.min()), np.log1p(values.max()), HISTOGRAM_MAX_BINS // 2 + 1))
+        # Les extrêmes exacts (l'arrondi de expm1 exclurait la valeur maximale)
+        edges[0], edges[-1] = values.min(), values.max()
+        return edges, 'log'
+    if bins not in ('auto', 'fd'):
+        raise ValueError(f"Choix de classes inconnu: {bins}")
+
+    n_bins = int(np.clip(_freedman_diaconis_bins(values) or HISTOGRAM_MIN_BINS, HISTOGRAM_MIN_BINS, HISTOGRAM_MAX_BINS))
+    return np.histogram_bin_edges(values, bins=n_bins), 'linear'
+
+
+def compute_histogram(df, metric, bins='auto'):
+    """
+    Histogramme d'une colonne numérique (mis en cache)
+
+    Parameters:
+    df (pd.DataFrame): Données
+    metric (str): Colonne
+    bins: Nombre de classes, 'auto' (Freedman-Diaconis, logarithmique si queue
+        lourde), 'fd' ou 'log'
+
+    Returns:
+    dict: {'edges', 'counts', 'scale', 'mean', 'n'} ou None sans valeur valide
+    """
+    key = (dataframe_fingerprint(df, [metric]), metric, str(bins))
+    with _histograms_lock:
+        if key in _histograms:
+            _histograms.move_to_end(key)
+            return _histograms[key]
+
+    values = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+
+    edges, scale = _bin_edges(values, bins)
+    counts, edges = np.histogram(values, bins=edges)
+    histogram = {'edges': edges, 'counts': counts, 'scale': scale, 'mean': values.mean(), 'n': len(values)}
+
+    with _histograms_lock:
+        _histograms[key] = histogram
+        while len(_histograms) > HISTOGRAM_CACHE_SIZE:
+            _histograms.popitem(last=False)
+    return histogram
+
+
+def clear_histogram_cache():
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,195 @@
+"""
+Module de recherche d'hyperparamètres par divisions successives
+Toutes les combinaisons de la grille sont évaluées avec peu de ressources, puis
+seule la meilleure fraction passe au palier suivant avec plus de ressources:
+- ensembles d'arbres (warm_start): la ressource est le nombre d'arbres, chaque
+  palier complète les modèles du palier précédent au lieu de les réentraîner;
+- autres modèles: la ressource est le nombre de lignes d'apprentissage.
+Les ajustements d'un palier (combinaisons x plis) sont répartis sur les cœurs
+et les scores par pli sont mis en cache selon l'empreinte des données.
+"""
+
+import os
+import json
+import math
+import hashlib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import KFold, ParameterGrid
+from dotenv import load_dotenv
+
+from analysis_cache import analysis_cache
+
+load_dotenv()
+
+# Processus utilisés pour les ajustements (-1 = tous les cœurs)
+HYPERPARAM_SEARCH_N_JOBS = int(os.getenv('HYPERPARAM_SEARCH_N_JOBS', '-1'))
+# Au-delà, la recherche se fait sur un sous-échantillon aléatoire de cette taille
+HYPERPARAM_SEARCH_MAX_ROWS = int(os.getenv('HYPERPARAM_SEARCH_MAX_ROWS', '10000'))
+# Fraction des combinaisons conservée à chaque palier (1 / facteur)
+HALVING_FACTOR = 3
+# Nombre minimal de lignes d'apprentissage au premier palier
+HALVING_MIN_ROWS = 200
+
+# Grilles par classe d'estimateur
+PARAM_GRIDS = {
+    'Ridge': {'alpha': [0.1, 1.0, 10.0, 100.0]},
+    'Lasso': {'alpha': [0.01, 0.1, 1.0, 10.0]},
+    'ElasticNet': {'alpha': [0.01, 0.1, 1.0], 'l1_ratio': [0.2, 0.5, 0.8]},
+    'RandomForestRegressor': {'n_estimators': [50, 100, 200], 'max_depth': [None, 10, 20]},
+    'GradientBoostingRegressor': {'n_estimators': [50, 100, 200], 'learning_rate': [0.01, 0.1, 0.2]},
+    'AdaBoostRegressor': {'n_estimators': [50, 100, 200], 'learning_rate': [0.1, 0.5, 1.0]},
+    'SVR': {'C': [0.1, 1.0, 10.0], 'gamma': ['scale', 0.1, 1.0]},
+    'MLPRegressor': {'alpha': [0.0001, 0.001, 0.01]},
+}
+
+
+def _fingerprint(X, y):
+    digest = hashlib.sha256()
+    digest.update(str(X.shape).encode('utf-8'))
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def _scores_key(fingerprint, estimator_name, params, resource, cv):
+    payload = json.dumps({
+        'search': 'successive_halving',
+        'data': fingerprint,
+        'estimator': estimator_name,
+        'params': params,
+        'resource': resource,
+        'cv': cv,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _fit_fold(estimator, X, y, train, test):
+    """Ajuste un pli et retourne (score R² sur le pli de test, estimateur ajusté)"""
+    estimator.fit(X[train], y[train])
+    return estimator.score(X[test], y[test]), estimator
+
+
+def _rungs(n_candidates, max_resource, min_resource, factor):
+    """Ressources croissantes (géométriques) jusqu'à max_resource"""
+    n_rungs = 1 + (math.ceil(math.log(n_candidates, factor)) if n_candidates > 1 else 0)
+    n_rungs = max(1, min(n_rungs, 1 + int(math.log(max(max_resource / min_resource, 1), factor))))
+    return [int(max_resource / factor ** (n_rungs - 1 - k)) for k in range(n_rungs)]
+
+
+def successive_halving_search(model, X, y, param_grid=None, cv=3, factor=HALVING_FACTOR,
+                              n_jobs=None, max_rows=None, random_state=42, refit=True):
+    """
+    Recherche des meilleurs hyperparamètres par divisions successives
+
+    Parameters:
+    model: Estimateur scikit-learn (non modifié)
+    param_grid (dict): Grille (PARAM_GRIDS[classe] par défaut)
+    cv (int): Nombre de plis (KFold sans mélange, comme GridSearchCV)
+    n_jobs (int): Processus (HYPERPARAM_SEARCH_N_JOBS par défaut)
+    max_rows (int): Taille maximale de l'échantillon de recherche
+    refit (bool): Réentraîner la meilleure combinaison sur l'échantillon de recherche
+
+    Returns:
+    dict: {'best_params', 'best_score', 'best_estimator' (None si refit=False), 'resource', 'rungs',
+           'n_candidates', 'n_fits', 'cache_hits', 'sample_size'} ou None sans grille
+    """
+    estimator_name = type(model).__name__
+    param_grid = PARAM_GRIDS.get(estimator_name) if param_grid is None else param_grid
+    if not param_grid:
+        return None
+    n_jobs = HYPERPARAM_SEARCH_N_JOBS if n_jobs is None else n_jobs
+    max_rows = HYPERPARAM_SEARCH_MAX_ROWS if max_rows is None else max_rows
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    rng = np.random.default_rng(random_state)
+    if len(y) > max_rows:
+        sample = np.sort(rng.choice(len(y), max_rows, replace=False))
+        X, y = X[sample], y[sample]
+    fingerprint = _fingerprint(X, y)
+    folds = list(KFold(n_splits=cv).split(X))
+
+    # Ressource: nombre d'arbres (warm start) ou nombre de lignes d'apprentissage
+    warm_start = 'warm_start' in model.get_params() and 'n_estimators' in param_grid
+    if warm_start:
+        grid = {name: values for name, values in param_grid.items() if name != 'n_estimators'}
+        candidates = list(ParameterGrid(grid)) if grid else [{}]
+        resource = 'n_estimators'
+        max_resource = max(param_grid['n_estimators'])
+        min_resource = min(param_grid['n_estimators'])
+    else:
+        candidates = list(ParameterGrid(param_grid))
+        resource = 'n_samples'
+        max_resource = min(len(train) for train, _ in folds)
+        min_resource = min(HALVING_MIN_ROWS, max_resource)
+    rungs = _rungs(len(candidates), max_resource, min_resource, factor)
+    # Lignes d'apprentissage de chaque pli dans un ordre aléatoire (préfixes = sous-échantillons)
+    shuffled_trains = [rng.permutation(train) for train, _ in folds]
+
+    fitted = {}  # (candidat, pli) -> estimateur du palier précédent (warm start)
+    history = []
+    n_fits = cache_hits = 0
+    survivors = list(range(len(candidates)))
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, amount in enumerate(rungs):
+            scores = {}
+            tasks, task_keys = [], []
+            for c in survivors:
+                params = candidates[c]
+                cached = analysis_cache.get(_scores_key(fingerprint, estimator_name, params, (resource, amount), cv))
+                if cached is not None:
+                    scores[c] = cached
+                    cache_hits += 1
+                    continue
+                for f, (train, test) in enumerate(folds):
+                    if warm_start:
+                        estimator = fitted.get((c, f))
+                        if estimator is None:
+                            estimator = clone(model).set_params(**params, warm_start=True)
+                        estimator.set_params(n_estimators=amount)
+                        rows = train
+                    else:
+                        estimator = clone(model).set_params(**params)
+                        rows = shuffled_trains[f][:amount]
+                    tasks.append(delayed(_fit_fold)(estimator, X, y, rows, test))
+                    task_keys.append((c, f))
+
+            for (c, f), (score, estimator) in zip(task_keys, parallel(tasks)):
+                scores.setdefault(c, [np.nan] * cv)[f] = score
+                if warm_start:
+                    fitted[(c, f)] = estimator
+            n_fits += len(tasks)
+            for c in {c for c, _ in task_keys}:
+                analysis_cache.put(_scores_key(fingerprint, estimator_name, candidates[c], (resource, amount), cv), scores[c])
+
+            mean_scores = {c: float(np.mean(scores[c])) for c in survivors}
+            history.append({'resource': amount, 'n_candidates': len(survivors),
+                            'best_score': max(mean_scores.values())})
+
+            ranked = sorted(survivors, key=lambda c: mean_scores[c], reverse=True)
+            if rung < len(rungs) - 1:
+                survivors = ranked[:max(1, math.ceil(len(survivors) / factor))]
+                fitted = {key: est for key, est in fitted.items() if key[0] in survivors}
+            else:
+                best = ranked[0]
+                best_score = mean_scores[best]
+
+    best_params = dict(candidates[best])
+    if warm_start:
+        best_params['n_estimators'] = rungs[-1]
+    best_estimator = clone(model).set_params(**best_params).fit(X, y) if refit else None
+
+    return {
+        'best_params': best_params,
+        'best_score': best_score,
+        'best_estimator': best_estimator,
+        'resource': resource,
+        'rungs': history,
+        'n_candidates': len(candidates),
+        'n_fits': n_fits,
+        'cache_hits': cache_hits,
+        'sample_size': len(y)
+    }
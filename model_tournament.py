@@ -0,0 +1,152 @@
+"""
+Module de tournoi de modèles de régression
+Tous les ajustements (partition apprentissage/test et plis de validation
+croisée de chaque modèle) sont des tâches indépendantes réparties sur les
+cœurs avec joblib. Les prédictions de chaque pli sont conservées: R² et RMSE
+de validation croisée proviennent du même ajustement. Un budget de temps
+global écarte les modèles qui ne terminent pas à temps, et les modèles lents
+(SVR, MLP...) sont écartés d'office sur les grands échantillons.
+"""
+
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.metrics import mean_squared_error, r2_score
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Processus utilisés pour les ajustements (-1 = tous les cœurs)
+MODEL_TOURNAMENT_N_JOBS = int(os.getenv('MODEL_TOURNAMENT_N_JOBS', '-1'))
+# Budget de temps global du tournoi (secondes)
+MODEL_TOURNAMENT_BUDGET_SECONDS = float(os.getenv('MODEL_TOURNAMENT_BUDGET_SECONDS', '120'))
+# Au-delà de ce nombre de lignes, les modèles lents ne sont pas entraînés
+SLOW_MODEL_MAX_ROWS = int(os.getenv('SLOW_MODEL_MAX_ROWS', '20000'))
+# Estimateurs dont le coût croît trop vite avec le nombre de lignes
+SLOW_ESTIMATORS = ('SVR', 'NuSVR', 'KernelRidge', 'MLPRegressor', 'GaussianProcessRegressor')
+
+# Pli -1: ajustement sur la partition apprentissage/test
+HOLDOUT_FOLD = -1
+
+
+def _fit_task(name, fold, model, X, y, train_idx, test_idx, deadline):
+    """Ajuste une copie du modèle sur un pli (rien si le budget est épuisé)"""
+    if time.time() > deadline:
+        return name, fold, None
+
+    estimator = clone(model)
+    start = time.perf_counter()
+    estimator.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    output = {'fit_seconds': fit_seconds, 'y_pred_test': estimator.predict(X[test_idx])}
+    if fold == HOLDOUT_FOLD:
+        output['model'] = estimator
+        output['y_pred_train'] = estimator.predict(X[train_idx])
+    return name, fold, output
+
+
+def run_tournament(models, X, y, cv=5, test_size=0.2, random_state=42,
+                   n_jobs=None, budget_seconds=None, slow_max_rows=None):
+    """
+    Entraîne et évalue des modèles candidats en parallèle
+
+    Parameters:
+    models (dict): {nom: estimateur non ajusté}
+    X (array-like): Variables explicatives (déjà standardisées)
+    y (pd.Series): Variable cible
+    cv (int): Nombre de plis (KFold sans mélange, comme cross_val_score)
+    n_jobs (int): Processus (MODEL_TOURNAMENT_N_JOBS par défaut)
+    budget_seconds (float): Budget global (MODEL_TOURNAMENT_BUDGET_SECONDS par défaut),
+        vérifié avant chaque ajustement, sans interrompre un ajustement en cours
+    slow_max_rows (int): Taille au-delà de laquelle SLOW_ESTIMATORS sont écartés
+
+    Returns:
+    dict: {
+        'models': {nom: {'model', 'y_pred_train', 'y_pred_test', 'cv_r2', 'cv_mse',
+                         'fit_seconds', 'cv_fit_seconds'}},
+        'y_train', 'y_test': partition utilisée (mêmes types que y),
+        'skipped': {nom: raison}, 'elapsed_seconds', 'budget_seconds', 'n_jobs'
+    }
+    """
+    n_jobs = MODEL_TOURNAMENT_N_JOBS if n_jobs is None else n_jobs
+    budget_seconds = MODEL_TOURNAMENT_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+    slow_max_rows = SLOW_MODEL_MAX_ROWS if slow_max_rows is None else slow_max_rows
+
+    X_values = np.asarray(X)
+    y_values = np.asarray(y)
+    n = len(y_values)
+    positions = np.arange(n)
+    train_idx, test_idx = train_test_split(positions, test_size=test_size, random_state=random_state)
+    y_train, y_test = train_test_split(y, test_size=test_size, random_state=random_state)
+    folds = [(HOLDOUT_FOLD, (train_idx, test_idx))] + list(enumerate(KFold(n_splits=cv).split(X_values)))
+
+    skipped = {}
+    candidates = {}
+    for name, model in models.items():
+        if n > slow_max_rows and type(model).__name__ in SLOW_ESTIMATORS:
+            skipped[name] = f"écarté: trop lent au-delà de {slow_max_rows} lignes"
+        else:
+            candidates[name] = model
+
+    # Un pli pour tous les modèles avant le pli suivant: si le budget s'épuise,
+    # seuls les derniers plis (et donc les modèles non terminés) sont perdus
+    start = time.time()
+    deadline = start + budget_seconds
+    tasks = [
+        delayed(_fit_task)(name, fold, model, X_values, y_values, fold_train, fold_test, deadline)
+        for fold, (fold_train, fold_test) in folds
+        for name, model in candidates.items()
+    ]
+    outputs = {name: {} for name in candidates}
+    for name, fold, output in Parallel(n_jobs=n_jobs)(tasks):
+        if output is not None:
+            outputs[name][fold] = output
+
+    results = {}
+    for name, fold_outputs in outputs.items():
+        if len(fold_outputs) < len(folds):
+            skipped[name] = f"écarté: budget de {budget_seconds:.0f} s dépassé"
+            continue
+        holdout = fold_outputs[HOLDOUT_FOLD]
+        cv_r2, cv_mse = [], []
+        for fold, (_, fold_test) in folds[1:]:
+            y_fold, y_pred = y_values[fold_test], fold_outputs[fold]['y_pred_test']
+            cv_r2.append(r2_score(y_fold, y_pred))
+            cv_mse.append(mean_squared_error(y_fold, y_pred))
+        results[name] = {
+            'model': holdout['model'],
+            'y_pred_train': holdout['y_pred_train'],
+            'y_pred_test': holdout['y_pred_test'],
+            'cv_r2': np.array(cv_r2),
+            'cv_mse': np.array(cv_mse),
+            'fit_seconds': holdout['fit_seconds'],
+            'cv_fit_seconds': sum(fold_outputs[fold]['fit_seconds'] for fold, _ in folds[1:])
+        }
+
+    return {
+        'models': results,
+        'y_train': y_train,
+        'y_test': y_test,
+        'skipped': skipped,
+        'elapsed_seconds': time.time() - start,
+        'budget_seconds': budget_seconds,
+        'n_jobs': n_jobs
+    }
+
+
+def tournament_summary(tournament):
+    """Résumé du tournoi (temps d'ajustement par modèle et modèles écartés)"""
+    return {
+        'elapsed_seconds': tournament['elapsed_seconds'],
+        'budget_seconds': tournament['budget_seconds'],
+        'n_jobs': tournament['n_jobs'],
+        'timings': {
+            name: {'fit_seconds': entry['fit_seconds'], 'cv_fit_seconds': entry['cv_fit_seconds']}
+            for name, entry in tournament['models'].items()
+        },
+        'skipped_models': tournament['skipped']
+    }
@@ -6,7 +6,7 @@ Gère les abonnements premium et les paiements
 import stripe
 import os
 from dotenv import load_dotenv
-from database import Database
+from database import Database, invalidate_premium_entitlement
 
 load_dotenv()
 
@@ -209,6 +209,14 @@ class PaymentHandler:
         except stripe.error.SignatureVerificationError as e:
             return {'error': 'Signature invalide'}
         
+        # Le statut premium de l'utilisateur concerné doit être relu par toutes les sessions
+        event_user_id = (event['data']['object'].get('metadata') or {}).get('user_id')
+        if event_user_id:
+            try:
+                invalidate_premium_entitlement(int(event_user_id))
+            except (ValueError, TypeError) as e:
+                print(f"Webhook: user_id invalide dans les métadonnées ({event_user_id!r}): {str(e)}")
+        
         # Gérer les événements
         if event['type'] == 'payment_intent.succeeded':
             payment_intent = event['data']['object']
@@ -0,0 +1,212 @@
+"""
+Module de réduction des données envoyées aux graphiques
+Au-delà d'un budget de points, les graphiques ne reçoivent plus toutes les
+lignes: échantillon aléatoire stratifié par groupe (la densité du nuage est
+conservée) ou histogramme 2D précalculé. Les droites de régression sont
+calculées sur toutes les lignes à partir de statistiques suffisantes
+(effectifs et sommes par groupe), sans réajuster de modèle. Les courbes
+sont réduites avec Largest-Triangle-Three-Buckets (LTTB) et les boîtes à
+moustaches reçoivent leurs quartiles précalculés.
+"""
+
+import os
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Nombre maximal de points envoyés au navigateur pour un nuage de points
+SCATTER_POINT_BUDGET = int(os.getenv('SCATTER_POINT_BUDGET', '50000'))
+# Au-delà de ce nombre de lignes, le nuage devient un histogramme 2D
+SCATTER_HEATMAP_MIN_ROWS = int(os.getenv('SCATTER_HEATMAP_MIN_ROWS', '500000'))
+# Nombre minimal de points conservés par groupe (petits groupes visibles)
+SAMPLE_MIN_PER_GROUP = 200
+HEATMAP_BINS = 200
+# Valeurs aberrantes affichées au plus par boîte à moustaches
+BOX_MAX_OUTLIERS = int(os.getenv('BOX_MAX_OUTLIERS', '500'))
+
+
+def sample_positions(n, budget, codes=None, seed=0):
+    """
+    Positions d'un échantillon aléatoire stratifié (sans remise, triées)
+
+    Chaque groupe garde une part proportionnelle à son effectif, avec au moins
+    SAMPLE_MIN_PER_GROUP points (ou tout le groupe s'il est plus petit).
+
+    Parameters:
+    n (int): Nombre de lignes
+    budget (int): Taille visée de l'échantillon
+    codes (np.ndarray): Code de groupe de chaque ligne (None = un seul groupe)
+
+    Returns:
+    np.ndarray: Positions retenues
+    """
+    if n <= budget:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    if codes is None:
+        return np.sort(rng.choice(n, budget, replace=False))
+
+    # Clés aléatoires: les plus petites de chaque groupe forment l'échantillon
+    counts = np.bincount(codes)
+    quotas = np.minimum(counts, np.maximum(np.round(counts * budget / n), SAMPLE_MIN_PER_GROUP)).astype(int)
+    order = np.lexsort((rng.random(n), codes))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    rank_in_group = np.arange(n) - np.repeat(offsets[:-1], counts)
+    return np.sort(order[rank_in_group < np.repeat(quotas, counts)])
+
+
+def linear_fit_by_group(x, y, codes=None, n_groups=1):
+    """
+    Droite des moindres carrés de y en x par groupe, via statistiques suffisantes
+
+    Returns:
+    dict: Tableaux par groupe 'n', 'slope', 'intercept', 'r2', 'x_min', 'x_max'
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes = np.zeros(len(x), dtype=np.intp) if codes is None else codes
+
+    def total(weights=None):
+        return np.bincount(codes, weights=weights, minlength=n_groups)
+
+    n = total()
+    sx, sy = total(x), total(y)
+    sxx, syy, sxy = total(x * x), total(y * y), total(x * y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx ** 2
+        var_y = n * syy - sy ** 2
+        slope = cov / var_x
+        intercept = (sy - slope * sx) / n
+        r2 = cov ** 2 / (var_x * var_y)
+
+    x_min = np.full(n_groups, np.inf)
+    x_max = np.full(n_groups, -np.inf)
+    np.minimum.at(x_min, codes, x)
+    np.maximum.at(x_max, codes, x)
+    return {'n': n, 'slope': slope, 'intercept': intercept, 'r2': r2, 'x_min': x_min, 'x_max': x_max}
+
+
+def binned_counts(x, y, bins=HEATMAP_BINS):
+    """
+    Histogramme 2D précalculé (cases vides à None pour rester transparentes)
+
+    Returns:
+    tuple: (centres x, centres y, effectifs transposés pour go.Heatmap)
+    """
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    z = counts.T.astype(object)
+    z[counts.T == 0] = None
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, z
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices de n_out points conservant la forme de la courbe
+
+    Le premier et le dernier point sont gardés; dans chaque case intermédiaire,
+    on retient le point formant le plus grand triangle avec le point retenu
+    précédemment et la moyenne de la case suivante.
+
+    Parameters:
+    x, y (array-like): Abscisses croissantes et ordonnées
+    n_out (int): Nombre de points à conserver
+
+    Returns:
+    np.ndarray: Indices retenus (croissants)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bornes des n_out - 2 cases entre le premier et le dernier point
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.intp) + 1
+    edges[-1] = n - 1
+    sizes = np.diff(edges)
+    # Moyennes de chaque case, suivies du dernier point (la « case suivante » de la dernière)
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        areas = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def box_statistics(values, codes, n_groups, max_outliers=BOX_MAX_OUTLIERS, seed=0):
+    """
+    Statistiques de boîtes à moustaches de tous les groupes en un passage trié
+
+    Quartiles par interpolation linéaire (comme np.quantile), moustaches de
+    Tukey (valeurs extrêmes à moins de 1,5 IQR des quartiles) et au plus
+    max_outliers valeurs aberrantes par groupe (au moins 2: les deux extrêmes
+    sont toujours gardés).
+
+    Parameters:
+    values (np.ndarray): Valeurs (sans valeurs manquantes)
+    codes (np.ndarray): Code de groupe de chaque valeur (0..n_groups-1)
+
+    Returns:
+    dict: Tableaux par groupe 'n', 'q1', 'median', 'q3', 'lowerfence',
+          'upperfence' et liste 'outliers' (un tableau par groupe)
+    """
+    max_outliers = max(max_outliers, 2)
+    values = np.asarray(values, dtype=float)
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    non_empty = counts > 0
+
+    def quantile(q):
+        position = starts + q * np.maximum(counts - 1, 0)
+        low = np.minimum(np.floor(position).astype(np.intp), len(sorted_values) - 1)
+        high = np.minimum(low + 1, starts + counts - 1)
+        high = np.where(non_empty, high, low)
+        fraction = position - np.floor(position)
+        result = sorted_values[low] + fraction * (sorted_values[high] - sorted_values[low])
+        return np.where(non_empty, result, np.nan)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    sorted_codes = codes[order]
+    inside = ((sorted_values >= (q1 - 1.5 * iqr)[sorted_codes])
+              & (sorted_values <= (q3 + 1.5 * iqr)[sorted_codes]))
+
+    lowerfence = np.full(n_groups, np.nan)
+    upperfence = np.full(n_groups, np.nan)
+    reduce_starts = starts[non_empty]
+    lowerfence[non_empty] = np.minimum.reduceat(np.where(inside, sorted_values, np.inf), reduce_starts)
+    upperfence[non_empty] = np.maximum.reduceat(np.where(inside, sorted_values, -np.inf), reduce_starts)
+
+    rng = np.random.default_rng(seed)
+    outliers = []
+    for group in range(n_groups):
+        group_values = sorted_values[starts[group]:starts[group] + counts[group]]
+        group_outliers = group_values[~inside[starts[group]:starts[group] + counts[group]]]
+        if len(group_outliers) > max_outliers:
+            middle = rng.choice(np.arange(1, len(group_outliers) - 1), max_outliers - 2, replace=False)
+            group_outliers = group_outliers[np.sort(np.concatenate([[0, len(group_outliers) - 1], middle]))]
+        outliers.append(group_outliers)
+
+    return {
+        'n': counts,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': lowerfence,
+        'upperfence': upperfence,
+        'outliers': outliers
+    }
@@ -0,0 +1,209 @@
+"""
+Module de tests post-hoc sur toutes les paires de groupes
+Les statistiques de toutes les paires sont dérivées en quelques opérations
+vectorisées à partir des données regroupées une seule fois (GroupedArrays):
+Mann-Whitney U, test de Dunn sur les rangs communs et corrections de
+Holm / Benjamini-Hochberg. Le travail restant propre à chaque paire
+(Kolmogorov-Smirnov) peut être réparti sur un pool de processus.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy import stats, sparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Nombre de processus pour le travail par paire (1 = pas de pool)
+POSTHOC_N_JOBS = int(os.getenv('POSTHOC_N_JOBS', '1'))
+# En dessous de ce nombre de paires, le pool coûte plus qu'il ne rapporte
+POSTHOC_PARALLEL_MIN_PAIRS = 50
+# Taille d'échantillon en dessous de laquelle scipy utilise la loi exacte de U
+MANN_WHITNEY_EXACT_MAX_N = 8
+
+
+def pair_indices(n_groups):
+    """Indices (i, j) avec i < j de toutes les paires, dans l'ordre des doubles boucles"""
+    return np.triu_indices(n_groups, k=1)
+
+
+def adjust_pvalues(p_values, method='holm'):
+    """
+    Correction des comparaisons multiples (vectorisée)
+
+    Parameters:
+    p_values (array-like): p-values brutes
+    method (str): 'holm' ou 'fdr_bh' (Benjamini-Hochberg)
+
+    Returns:
+    np.ndarray: p-values ajustées, dans l'ordre d'origine
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    if m == 0:
+        return p_values
+    order = np.argsort(p_values)
+    ranked = p_values[order]
+
+    if method == 'holm':
+        adjusted = np.maximum.accumulate((m - np.arange(m)) * ranked)
+    elif method == 'fdr_bh':
+        adjusted = np.minimum.accumulate((m / np.arange(m, 0, -1)) * ranked[::-1])[::-1]
+    else:
+        raise ValueError(f"Méthode de correction inconnue: {method}")
+
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def _value_count_matrix(grouped):
+    """Matrice creuse (valeurs distinctes x groupes) des effectifs"""
+    _, value_codes = np.unique(grouped.values, return_inverse=True)
+    group_codes = np.repeat(np.arange(len(grouped)), grouped.sizes)
+    return sparse.csr_matrix(
+        (np.ones(grouped.n_total), (value_codes, group_codes)),
+        shape=(value_codes.max() + 1, len(grouped))
+    )
+
+
+def mann_whitney_all_pairs(grouped):
+    """
+    Mann-Whitney U (bilatéral) pour toutes les paires de groupes
+
+    U[i, j] compte les couples (x du groupe i, y du groupe j) avec x > y
+    (ex-aequo comptés pour moitié); il est obtenu pour une colonne j entière
+    par une recherche dichotomique de toutes les valeurs dans le groupe j trié.
+    Les p-values suivent l'approximation normale de scipy (correction de
+    continuité et des ex-aequo); la loi exacte est conservée pour les petites
+    paires sans ex-aequo, comme stats.mannwhitneyu.
+
+    Returns:
+    tuple: (U, p_values) matrices k x k
+    """
+    k = len(grouped)
+    sizes = grouped.sizes.astype(float)
+    # Valeurs triées à l'intérieur de chaque groupe (les bornes des groupes ne changent pas):
+    # chaque groupe trié sert de table de recherche et les requêtes triées restent locales en cache
+    group_codes = np.repeat(np.arange(k), grouped.sizes)
+    values = grouped.values[np.lexsort((grouped.values, group_codes))]
+    u = np.zeros((k, k))
+    for j in range(k):
+        sorted_j = values[grouped.starts[j]:grouped.stops[j]]
+        below = np.searchsorted(sorted_j, values, side='left')
+        ties = np.searchsorted(sorted_j, values, side='right') - below
+        u[:, j] = np.add.reduceat(below + 0.5 * ties, grouped.starts)
+
+    # Terme des ex-aequo de chaque paire: somme sur les valeurs de t^3 - t, t = c_i + c_j
+    counts = _value_count_matrix(grouped)
+    squares = counts.multiply(counts)
+    cubes = np.asarray(squares.multiply(counts).sum(axis=0)).ravel()
+    cross = (squares.T @ counts).toarray()
+    tie_term = cubes[:, None] + cubes[None, :] + 3 * (cross + cross.T) - sizes[:, None] - sizes[None, :]
+
+    n1, n2 = sizes[:, None], sizes[None, :]
+    n = n1 + n2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u_max = np.maximum(u, n1 * n2 - u)
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (u_max - n1 * n2 / 2 - 0.5) / sigma
+        p_values = np.clip(2 * stats.norm.sf(z), 0, 1)
+
+    small = (np.minimum(n1, n2) <= MANN_WHITNEY_EXACT_MAX_N) & (tie_term == 0)
+    for i, j in zip(*np.nonzero(np.triu(small, k=1))):
+        result = stats.mannwhitneyu(grouped.array(i), grouped.array(j), alternative='two-sided')
+        u[i, j], p_values[i, j] = result.statistic, result.pvalue
+        u[j, i], p_values[j, i] = n1[i, 0] * n2[0, j] - result.statistic, result.pvalue
+
+    return u, p_values
+
+
+def dunn_all_pairs(grouped):
+    """
+    Test de Dunn sur les rangs communs (un seul classement de toutes les valeurs)
+
+    Returns:
+    tuple: (z, p_values) matrices k x k
+    """
+    n = grouped.n_total
+    mean_ranks = np.add.reduceat(grouped.ranks, grouped.starts) / grouped.sizes
+    _, tie_counts = np.unique(grouped.values, return_counts=True)
+    tie_term = np.sum(tie_counts ** 3 - tie_counts) / (12 * (n - 1))
+    variance = n * (n + 1) / 12 - tie_term
+
+    inverse_sizes = 1 / grouped.sizes.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (mean_ranks[:, None] - mean_ranks[None, :]) / np.sqrt(
+            variance * (inverse_sizes[:, None] + inverse_sizes[None, :])
+        )
+    p_values = 2 * stats.norm.sf(np.abs(z))
+    return z, p_values
+
+
+_worker_arrays = None
+
+
+def _init_worker(arrays):
+    global _worker_arrays
+    _worker_arrays = arrays
+
+
+def _ks_pairs(pairs, arrays=None):
+    arrays = _worker_arrays if arrays is None else arrays
+    return [tuple(stats.ks_2samp(arrays[i], arrays[j])) for i, j in pairs]
+
+
+def ks_all_pairs(grouped, n_jobs=None):
+    """
+    Kolmogorov-Smirnov à deux échantillons pour toutes les paires
+
+    Parameters:
+    n_jobs (int): Processus à utiliser (POSTHOC_N_JOBS par défaut)
+
+    Returns:
+    list: (statistique, p-value) dans l'ordre de pair_indices
+    """
+    n_jobs = POSTHOC_N_JOBS if n_jobs is None else n_jobs
+    pairs = list(zip(*pair_indices(len(grouped))))
+    arrays = grouped.arrays()
+
+    if n_jobs <= 1 or len(pairs) < POSTHOC_PARALLEL_MIN_PAIRS:
+        return _ks_pairs(pairs, arrays)
+
+    batch_size = -(-len(pairs) // (n_jobs * 4))
+    batches = [pairs[start:start + batch_size] for start in range(0, len(pairs), batch_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=([np.asarray(a) for a in arrays],)) as executor:
+        return [result for batch in executor.map(_ks_pairs, batches) for result in batch]
+
+
+def posthoc_table(grouped, correction='holm'):
+    """
+    Tableau des comparaisons de toutes les paires (Mann-Whitney et Dunn)
+
+    Returns:
+    pd.DataFrame: Une ligne par paire (i < j) avec statistiques, p-values
+    brutes et ajustées (Holm et Benjamini-Hochberg)
+    """
+    rows, cols = pair_indices(len(grouped))
+    u, u_p = mann_whitney_all_pairs(grouped)
+    z, dunn_p = dunn_all_pairs(grouped)
+    sizes = grouped.sizes.astype(float)
+    means = np.add.reduceat(grouped.values.astype(float), grouped.starts) / sizes
+
+    table = pd.DataFrame({
+        'i': rows,
+        'j': cols,
+        'u_statistic': u[rows, cols],
+        'p_value': u_p[rows, cols],
+        'effect_size_r': np.abs(1 - 2 * u[rows, cols] / (sizes[rows] * sizes[cols])),
+        'mean_diff': means[rows] - means[cols],
+        'dunn_z': z[rows, cols],
+        'dunn_p_value': dunn_p[rows, cols],
+    })
+    table['p_value_adjusted'] = adjust_pvalues(table['p_value'], correction)
+    table['dunn_p_value_adjusted'] = adjust_pvalues(table['dunn_p_value'], correction)
+    table['dunn_p_value_bh'] = adjust_pvalues(table['dunn_p_value'], 'fdr_bh')
+    return table
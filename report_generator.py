@@ -7,6 +7,8 @@ import pandas as pd
 from datetime import datetime
 import io
 
+from group_aggregation import aggregate_by_group, metric_spec
+
 class ReportGenerator:
     def __init__(self, df, analysis_results=None):
         """
@@ -115,25 +117,16 @@ class ReportGenerator:
     
     def export_summary_to_csv(self):
         """Exporte un résumé en CSV"""
-        summary_data = []
-        
         if 'platform' in self.df.columns:
-            for platform in self.df['platform'].unique():
-                platform_data = self.df[self.df['platform'] == platform]
-                
-                row = {
-                    'Plateforme': platform,
-                    'Nombre de posts': len(platform_data),
-                }
-                
-                numeric_cols = platform_data.select_dtypes(include=['number']).columns
-                for col in numeric_cols:
-                    row[f'{col}_moyenne'] = platform_data[col].mean()
-                    row[f'{col}_total'] = platform_data[col].sum()
-                
-                summary_data.append(row)
+            # Moyenne et total de chaque colonne numérique, en une seule agrégation
+            numeric_cols = self.df.select_dtypes(include=['number']).columns
+            spec = metric_spec(numeric_cols, {'moyenne': 'mean', 'total': 'sum'})
+            summary = aggregate_by_group(self.df, 'platform', spec, size_name='Nombre de posts', sort=False)
+            summary_df = summary[['Nombre de posts'] + [name for name, _, _ in spec]]
+            summary_df = summary_df.rename_axis('Plateforme').reset_index()
+        else:
+            summary_df = pd.DataFrame()
         
-        summary_df = pd.DataFrame(summary_data)
         output = io.StringIO()
         summary_df.to_csv(output, index=False)
         return output.getvalue()
@@ -0,0 +1,82 @@
+"""
+Module de corrélation de Spearman sur fenêtres glissantes
+Les fenêtres sont extraites sans copie (sliding_window_view), classées par lots
+de manière vectorisée, puis corrélées ligne par ligne: aucun appel scipy par
+fenêtre. Un pas (stride) permet de ne calculer qu'un nombre borné de fenêtres.
+"""
+
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Nombre maximal de fenêtres évaluées (le pas est choisi en conséquence)
+ROLLING_MAX_WINDOWS = int(os.getenv('ROLLING_MAX_WINDOWS', '200'))
+# Nombre maximal de valeurs classées simultanément (borne mémoire d'un lot)
+ROLLING_BATCH_VALUES = 2_000_000
+
+
+def window_starts(n, window_size, stride=None, max_windows=None):
+    """
+    Débuts des fenêtres évaluées
+
+    Parameters:
+    n (int): Nombre d'observations
+    window_size (int): Taille des fenêtres
+    stride (int): Pas entre deux fenêtres (déduit de max_windows si absent)
+    max_windows (int): Nombre maximal de fenêtres (ROLLING_MAX_WINDOWS par défaut)
+
+    Returns:
+    np.ndarray: Positions de début (la dernière fenêtre possible est toujours incluse)
+    """
+    last = n - window_size
+    if last < 0:
+        return np.array([], dtype=int)
+    if stride is None:
+        max_windows = max_windows or ROLLING_MAX_WINDOWS
+        stride = max(1, -(-last // max(max_windows - 1, 1)))
+    starts = np.arange(0, last + 1, stride)
+    if starts[-1] != last:
+        starts = np.append(starts, last)
+    return starts
+
+
+def _row_pearson(a, b):
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (a * b).sum(axis=1) / np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+
+
+def rolling_spearman(x, y, window_size, stride=None, max_windows=None):
+    """
+    Corrélation de Spearman sur fenêtres glissantes
+
+    Parameters:
+    x, y (array-like): Séries de même longueur
+    window_size (int): Taille des fenêtres
+    stride (int): Pas entre deux fenêtres
+    max_windows (int): Nombre maximal de fenêtres
+
+    Returns:
+    tuple: (débuts des fenêtres, corrélations) — NaN pour une fenêtre constante,
+    comme stats.spearmanr
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    starts = window_starts(len(x), window_size, stride, max_windows)
+    x_windows = sliding_window_view(x, window_size)
+    y_windows = sliding_window_view(y, window_size)
+
+    correlations = np.empty(len(starts))
+    batch = max(1, ROLLING_BATCH_VALUES // window_size)
+    for begin in range(0, len(starts), batch):
+        rows = starts[begin:begin + batch]
+        # Rangs moyens des ex-aequo, comme spearmanr
+        x_ranks = stats.rankdata(x_windows[rows], axis=1)
+        y_ranks = stats.rankdata(y_windows[rows], axis=1)
+        correlations[begin:begin + batch] = _row_pearson(x_ranks, y_ranks)
+    return starts, correlations
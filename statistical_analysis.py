@@ -13,6 +13,10 @@ from sklearn.metrics import mean_squared_error, r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
+from analysis_cache import analysis_cache, analysis_key
+from grouped_arrays import GroupedArrays
+from correlation_matrix import correlation_matrices, correlation_pair, strongest_pairs
+
 class StatisticalAnalyzer:
     def __init__(self, df):
         """
@@ -66,16 +70,19 @@ class StatisticalAnalyzer:
         if column not in self.df.columns or group_column not in self.df.columns:
             return None
         
-        groups = self.df[group_column].unique()
-        group_data = [self.df[self.df[group_column] == group][column].dropna() for group in groups]
+        cache_key = analysis_key('kruskal_wallis', self.df, [column, group_column])
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            self.results['kruskal_wallis'] = cached
+            return cached
         
-        # Filtrer les groupes vides
-        group_data = [g for g in group_data if len(g) > 0]
+        # Groupes construits en un seul passage (groupes vides exclus)
+        grouped = GroupedArrays(self.df, column, group_column)
         
-        if len(group_data) < 2:
+        if len(grouped) < 2:
             return None
         
-        statistic, p_value = stats.kruskal(*group_data)
+        statistic, p_value = grouped.kruskal()
         
         result = {
             'test': 'Kruskal-Wallis',
@@ -84,9 +91,10 @@ class StatisticalAnalyzer:
             'significant': p_value < 0.05,
             'column': column,
             'groups': group_column,
-            'interpretation': self._interpret_kruskal_wallis(p_value, groups)
+            'interpretation': self._interpret_kruskal_wallis(p_value, grouped.labels)
         }
         
+        analysis_cache.put(cache_key, result)
         self.results['kruskal_wallis'] = result
         return result
     
@@ -97,6 +105,12 @@ class StatisticalAnalyzer:
         if column1 not in self.df.columns or column2 not in self.df.columns:
             return None
         
+        cache_key = analysis_key('wilcoxon', self.df, [column1, column2])
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            self.results['wilcoxon'] = cached
+            return cached
+        
         data1 = self.df[column1].dropna()
         data2 = self.df[column2].dropna()
         
@@ -116,6 +130,7 @@ class StatisticalAnalyzer:
             'interpretation': self._interpret_wilcoxon(p_value, column1, column2)
         }
         
+        analysis_cache.put(cache_key, result)
         self.results['wilcoxon'] = result
         return result
     
@@ -127,15 +142,23 @@ class StatisticalAnalyzer:
         if column1 not in self.df.columns or column2 not in self.df.columns:
             return None
         
-        data1 = self.df[column1].dropna()
-        data2 = self.df[column2].dropna()
+        cache_key = analysis_key('spearman', self.df, [column1, column2])
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            self.results['spearman'] = cached
+            return cached
         
-        # Assurer que les données ont la même longueur
-        valid_indices = self.df[[column1, column2]].dropna().index
-        data1 = self.df.loc[valid_indices, column1]
-        data2 = self.df.loc[valid_indices, column2]
-        
-        correlation, p_value = stats.spearmanr(data1, data2)
+        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        if column1 in numeric_cols and column2 in numeric_cols and column1 != column2:
+            # Lecture dans les matrices partagées (toutes les colonnes rangées une seule fois)
+            correlation, p_value, _ = correlation_pair(correlation_matrices(self.df), column1, column2)
+        else:
+            # Assurer que les données ont la même longueur
+            valid_indices = self.df[[column1, column2]].dropna().index
+            data1 = self.df.loc[valid_indices, column1]
+            data2 = self.df.loc[valid_indices, column2]
+            
+            correlation, p_value = stats.spearmanr(data1, data2)
         
         result = {
             'test': 'Spearman Correlation',
@@ -146,6 +169,7 @@ class StatisticalAnalyzer:
             'interpretation': self._interpret_spearman(correlation, p_value, column1, column2)
         }
         
+        analysis_cache.put(cache_key, result)
         self.results['spearman'] = result
         return result
     
@@ -156,6 +180,12 @@ class StatisticalAnalyzer:
         if column1 not in self.df.columns or column2 not in self.df.columns:
             return None
         
+        cache_key = analysis_key('chi2', self.df, [column1, column2])
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            self.results['chi2'] = cached
+            return cached
+        
         # Créer une table de contingence
         contingency_table = pd.crosstab(self.df[column1], self.df[column2])
         
@@ -172,6 +202,7 @@ class StatisticalAnalyzer:
             'interpretation': self._interpret_chi2(p_value, column1, column2)
         }
         
+        analysis_cache.put(cache_key, result)
         self.results['chi2'] = result
         return result
     
@@ -191,6 +222,13 @@ class StatisticalAnalyzer:
         if not available_features:
             return None
         
+        cache_key = analysis_key('predict_metric', self.df, available_features + [target],
+                                 {'model_type': model_type})
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            self.results[f'prediction_{target}'] = cached
+            return cached
+        
         df_clean = self.df[available_features + [target]].dropna()
         if len(df_clean) < 10:
             return None
@@ -218,6 +256,7 @@ class StatisticalAnalyzer:
             'interpretation': self._interpret_prediction(r2, available_features, target)
         }
         
+        analysis_cache.put(cache_key, result)
         self.results[f'prediction_{target}'] = result
         return result
     
@@ -341,6 +380,28 @@ class StatisticalAnalyzer:
                 return lower_map[candidate.lower()]
         return None
     
+    def correlation_overview(self, method='spearman', top=5):
+        """
+        Paires de variables numériques les plus corrélées (matrices partagées)
+        """
+        matrices = correlation_matrices(self.df)
+        if matrices is None:
+            return None
+        
+        result = {
+            'test': 'Correlation Matrix',
+            'method': method,
+            'columns': matrices['columns'],
+            'top_pairs': strongest_pairs(matrices, method, top)
+        }
+        symbol = 'ρ' if method == 'spearman' else 'r'
+        result['interpretation'] = "Corrélations les plus fortes: " + ", ".join(
+            f"{pair['columns'][0]} / {pair['columns'][1]} ({symbol} = {pair['correlation']:.3f})"
+            for pair in result['top_pairs']
+        )
+        self.results['correlation_matrix'] = result
+        return result
+    
     def get_all_results(self):
         """Retourne tous les résultats des analyses"""
         return self.results
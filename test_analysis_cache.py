@@ -0,0 +1,87 @@
+"""
+Test du cache des résultats d'analyse
+Mêmes données et mêmes paramètres: résultat servi sans recalcul
+"""
+
+import os
+import tempfile
+import pandas as pd
+import numpy as np
+from analysis_cache import AnalysisCache, analysis_cache, analysis_key
+from statistical_analysis import StatisticalAnalyzer
+
+def create_sample_data(n_rows=500, seed=42):
+    np.random.seed(seed)
+    return pd.DataFrame({
+        'platform': np.random.choice(['TikTok', 'Instagram', 'YouTube'], n_rows),
+        'likes': np.random.randint(100, 5000, n_rows),
+        'followers': np.random.randint(1000, 100000, n_rows),
+        'views': np.random.randint(1000, 50000, n_rows),
+    })
+
+def test_repeated_analyses_hit_cache():
+    """Une analyse répétée (même dans une autre session) est servie depuis le cache"""
+    print("🧪 TEST DU CACHE DES ANALYSES")
+    print("=" * 60)
+
+    analysis_cache.clear()
+    df = create_sample_data()
+    first = StatisticalAnalyzer(df).predict_metric(['followers', 'views'], 'likes')
+    hits = analysis_cache.get_stats()['hits']
+
+    # Nouvel analyseur sur une copie: même empreinte, aucun entraînement
+    analyzer = StatisticalAnalyzer(df.copy())
+    second = analyzer.predict_metric(['followers', 'views'], 'likes')
+    assert analysis_cache.get_stats()['hits'] == hits + 1
+    assert second['r2_score'] == first['r2_score']
+    assert analyzer.results['prediction_likes'] is second
+    assert analyzer.predict_single(second, {'followers': 5000, 'views': 2000}) is not None
+    print(f"✅ Prédiction servie depuis le cache (R² = {second['r2_score']:.3f})")
+
+    kw = analyzer.kruskal_wallis_test('likes', 'platform')
+    assert analyzer.kruskal_wallis_test('likes', 'platform')['p_value'] == kw['p_value']
+
+    # Une colonne modifiée change la clé
+    df_modified = df.copy()
+    df_modified.loc[0, 'likes'] += 1
+    assert analysis_key('spearman', df, ['likes', 'followers']) != \
+        analysis_key('spearman', df_modified, ['likes', 'followers'])
+    # Une colonne non utilisée ne la change pas
+    df_modified = df.copy()
+    df_modified['views'] = 0
+    assert analysis_key('spearman', df, ['likes', 'followers']) == \
+        analysis_key('spearman', df_modified, ['likes', 'followers'])
+    print("✅ Clé dépendante des seules colonnes utilisées")
+
+def test_lru_eviction_and_disk_persistence():
+    """Le cache reste borné et peut être relu depuis le disque"""
+    cache_dir = tempfile.mkdtemp()
+    cache = AnalysisCache(max_entries=2, max_mb=1, cache_dir=cache_dir, secret='test-secret')
+    for i in range(3):
+        cache.put(f"key{i}", {'value': i})
+    assert cache.get_stats()['entries'] == 2
+    assert cache.get_stats()['evictions'] == 1
+
+    # Une nouvelle instance (autre processus) relit le disque
+    reloaded = AnalysisCache(max_entries=2, max_mb=1, cache_dir=cache_dir, secret='test-secret')
+    assert reloaded.get("key0") == {'value': 0}
+    assert reloaded.get_stats()['disk_hits'] == 1
+
+    # Fichier modifié ou signé avec un autre secret: ignoré sans être désérialisé
+    with open(os.path.join(cache_dir, "key1.pkl"), 'r+b') as handle:
+        handle.seek(-1, os.SEEK_END)
+        handle.write(b'\x00')
+    assert reloaded.get("key1") is None
+    other = AnalysisCache(max_entries=2, max_mb=1, cache_dir=cache_dir, secret='autre')
+    assert other.get("key2") is None
+    # Sans secret, pas de persistance disque
+    assert AnalysisCache(cache_dir=cache_dir, secret='').cache_dir is None
+
+    # Une valeur trop volumineuse n'est pas gardée en mémoire
+    cache.put("big", np.zeros(300000))
+    assert cache.get_stats()['size_mb'] <= 1
+    print("✅ Éviction LRU et persistance disque OK")
+
+if __name__ == "__main__":
+    test_repeated_analyses_hit_cache()
+    test_lru_eviction_and_disk_persistence()
@@ -0,0 +1,50 @@
+"""
+Test du bootstrap de stabilité
+Tirages reproductibles, évaluation hors sac et arrêt anticipé
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from bootstrap_stability import bootstrap_scores, draw_indices
+from ultra_advanced_statistical_analysis import UltraAdvancedStatisticalAnalyzer
+
+def create_regression_data(n_rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 2))
+    y = pd.Series(X @ [1.5, -0.5] + rng.normal(size=n_rows))
+    return X, y
+
+def test_bootstrap_is_seeded_and_out_of_bag():
+    """Même graine, mêmes scores; le modèle d'origine n'est pas modifié"""
+    print("🧪 TEST DU BOOTSTRAP DE STABILITÉ")
+    print("=" * 60)
+
+    X, y = create_regression_data()
+    assert draw_indices(len(y), 5).shape == (5, 400)
+    model = LinearRegression()
+    first = bootstrap_scores(model, X, y, n_bootstrap=40, n_jobs=2, ci_tolerance=0)
+    second = bootstrap_scores(model, X, y, n_bootstrap=40, n_jobs=1, ci_tolerance=0)
+    assert np.array_equal(first['scores'], second['scores'])
+    assert first['n_resamples'] == 40 and not first['early_stopped']
+    assert not hasattr(model, 'coef_')
+
+    # Hors sac, le R² est inférieur au R² d'apprentissage
+    in_sample = LinearRegression().fit(X, y).score(X, y)
+    assert np.mean(first['scores']) < in_sample
+    print(f"✅ R² hors sac moyen {np.mean(first['scores']):.3f} < {in_sample:.3f}")
+
+def test_early_stopping():
+    X, y = create_regression_data()
+    result = bootstrap_scores(LinearRegression(), X, y, n_bootstrap=500, n_jobs=1, ci_tolerance=0.5)
+    assert result['early_stopped'] and result['n_resamples'] < 500
+    assert result['ci_low'] <= np.median(result['scores']) <= result['ci_high']
+
+    analyzer = UltraAdvancedStatisticalAnalyzer(pd.DataFrame(X, columns=['a', 'b']))
+    stability = analyzer._analyze_model_stability(LinearRegression(), X, y)
+    assert stability['scoring'] == 'out_of_bag' and stability['n_resamples'] <= 100
+    print(f"✅ Arrêt anticipé après {result['n_resamples']} rééchantillonnages")
+
+if __name__ == "__main__":
+    test_bootstrap_is_seeded_and_out_of_bag()
+    test_early_stopping()
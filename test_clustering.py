@@ -0,0 +1,49 @@
+"""
+Test du clustering adapté aux grands volumes
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.datasets import make_blobs
+from clustering import find_optimal_k, clustering_score
+from advanced_statistical_analysis import AdvancedStatisticalAnalyzer
+
+def test_small_data_matches_kmeans():
+    """Sous le seuil: KMeans et silhouette exacte, comme avant"""
+    print("🧪 TEST DU CLUSTERING")
+    print("=" * 60)
+
+    data, _ = make_blobs(n_samples=500, centers=3, random_state=0)
+    selection = find_optimal_k(data, range(2, 8))
+    assert selection['best_k'] == 3 and selection['method'] == 'KMeans'
+    expected = KMeans(n_clusters=3, random_state=42).fit_predict(data)
+    assert np.array_equal(selection['model'].predict(data), expected)
+    print("✅ Petits volumes: résultat identique à KMeans")
+
+    # Une seule valeur distincte: aucune partition valide, pas d'exception
+    constant = pd.DataFrame({'likes': [5.0] * 50, 'views': [1.0] * 50})
+    assert find_optimal_k(constant.to_numpy(), range(2, 8)) is None
+    assert AdvancedStatisticalAnalyzer(constant).cluster_analysis(['likes', 'views']) is None
+    print("✅ Données sans partition possible gérées")
+
+def test_large_data_uses_minibatch_and_sampled_scores():
+    data, _ = make_blobs(n_samples=30000, n_features=3, centers=4, random_state=1)
+    df = pd.DataFrame(data, columns=['likes', 'views', 'comments'])
+
+    start = time.time()
+    result = AdvancedStatisticalAnalyzer(df).cluster_analysis(['likes', 'views', 'comments'])
+    assert result['n_clusters'] == 4
+    assert result['clustering_method'] == 'MiniBatchKMeans'
+    assert sum(cluster['size'] for cluster in result['cluster_analysis']) == 30000
+    assert 0.5 < result['silhouette_score'] <= 1
+
+    ch = find_optimal_k(data, range(2, 7), criterion='calinski_harabasz')
+    assert ch['best_k'] == 4
+    assert clustering_score(data, np.zeros(len(data))) is None
+    print(f"✅ 30 000 lignes regroupées en {time.time() - start:.1f} s")
+
+if __name__ == "__main__":
+    test_small_data_matches_kmeans()
+    test_large_data_uses_minibatch_and_sampled_scores()
@@ -0,0 +1,74 @@
+"""
+Test des matrices de corrélation partagées
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+from scipy import stats
+from analysis_cache import analysis_cache
+from correlation_matrix import correlation_matrices, correlation_pair, strongest_pairs
+from statistical_analysis import StatisticalAnalyzer
+from visualizations import DataVisualizer
+
+def create_sample_data(n_rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    followers = rng.integers(100, 100000, n_rows)
+    return pd.DataFrame({
+        'followers': followers,
+        'likes': followers // 20 + rng.integers(0, 500, n_rows),
+        'comments': rng.integers(0, 50, n_rows),
+        'shares': rng.normal(size=n_rows),
+    })
+
+def test_matrices_match_pandas_and_scipy():
+    """Pearson et Spearman identiques à pandas / scipy, avec ou sans valeurs manquantes"""
+    print("🧪 TEST DES MATRICES DE CORRÉLATION")
+    print("=" * 60)
+
+    analysis_cache.clear()
+    df = create_sample_data()
+    df.loc[::7, 'shares'] = np.nan
+    matrices = correlation_matrices(df)
+    assert np.allclose(matrices['pearson'], df.corr(), equal_nan=True)
+    assert np.allclose(matrices['spearman'], df.corr(method='spearman'), equal_nan=True)
+
+    for a, b in [('likes', 'followers'), ('comments', 'shares')]:
+        valid = df[[a, b]].dropna()
+        expected_r, expected_p = stats.spearmanr(valid[a], valid[b])
+        r, p, n = correlation_pair(matrices, a, b)
+        assert np.isclose(r, expected_r) and np.isclose(p, expected_p) and n == len(valid)
+        expected = stats.pearsonr(valid[a], valid[b])
+        r, p, _ = correlation_pair(matrices, a, b, method='pearson')
+        assert np.isclose(r, expected[0]) and np.isclose(p, expected[1], atol=1e-12)
+    print("✅ Coefficients et p-values identiques à scipy")
+
+    # Colonne constante avec valeurs manquantes: NaN, sans avertissement par paire
+    df['constant'] = 1.0
+    df.loc[::5, 'constant'] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        matrices = correlation_matrices(df)
+    assert matrices['spearman']['constant'].drop('constant').isna().all()
+    print("✅ Colonne constante sans avertissement")
+
+def test_one_computation_shared():
+    """La heatmap, l'onglet Spearman et l'aperçu IA réutilisent le même calcul"""
+    analysis_cache.clear()
+    df = create_sample_data()
+    DataVisualizer(df).plot_correlation_heatmap()
+    misses = analysis_cache.get_stats()['misses']
+
+    analyzer = StatisticalAnalyzer(df)
+    result = analyzer.spearman_correlation('likes', 'followers')
+    assert np.isclose(result['correlation'], stats.spearmanr(df['likes'], df['followers'])[0])
+    overview = analyzer.correlation_overview()
+    assert overview['top_pairs'][0]['columns'] == ['followers', 'likes']
+    # Seule la clé propre au test Spearman a manqué
+    assert analysis_cache.get_stats()['misses'] == misses + 1
+    assert strongest_pairs(correlation_matrices(df), top=2)[0]['correlation'] > 0.9
+    print("✅ Un seul calcul partagé")
+
+if __name__ == "__main__":
+    test_matrices_match_pandas_and_scipy()
+    test_one_computation_shared()
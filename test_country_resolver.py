@@ -0,0 +1,93 @@
+"""
+Test de la résolution mémorisée des noms de pays
+"""
+
+import numpy as np
+import pandas as pd
+
+from country_resolver import CountryResolver, COUNTRY_ALIASES, country_key, build_lookup_table, load_lookup_table
+from country_map import CountryMapVisualizer, _choropleth_base_layout
+
+
+def test_exact_index_and_aliases():
+    print("Test de l'index exact (noms, codes ISO, alias)...")
+    resolver = CountryResolver()
+    for value in ['France', 'FR', 'fra', ' france ', 'U.S.A.', 'USA', 'United States', 'UK', 'Russia', 'Vietnam']:
+        name, iso = resolver.resolve(value)
+        assert iso is not None, value
+    assert resolver.resolve('U.S.A.')[1] == 'USA'
+    assert resolver.resolve('uk')[1] == 'GBR'
+    assert resolver.resolve('Côte d\'Ivoire')[1] == 'CIV'
+    assert resolver.resolve('South Korea') == resolver.resolve('KR')
+    assert resolver.stats['fuzzy'] == 0
+    assert resolver.resolve(np.nan) == (None, None)
+    assert resolver.resolve('Atlantis') == ('ATLANTIS', None)
+    assert country_key(' São  Tomé ') == 'SAO TOME' and country_key('U.S.A.') == 'USA'
+    print("✅ Index exact OK")
+
+
+def test_lookup_table():
+    print("\nTest de la table précalculée...")
+    table = load_lookup_table()
+    assert table is not None, "country_lookup.json absent ou d'une autre version"
+    # La table livrée doit suivre les règles actuelles (sinon: python country_resolver.py)
+    assert all(country_key(key) == key for key in table['keys'])
+    assert all(table['keys'][country_key(alias)] == iso for alias, iso in COUNTRY_ALIASES.items())
+    assert len(table['countries']) == len(build_lookup_table()['countries'])
+    assert table['countries']['DEU']['pays'] == 'Allemagne'
+    resolver = CountryResolver()
+    assert resolver.index == CountryResolver(lookup_path='/nonexistent').index
+    for value, iso in [('Allemagne', 'DEU'), ('Japon', 'JPN'), ('États-Unis', 'USA'), ('Royaume-Uni', 'GBR')]:
+        assert resolver.resolve(value)[1] == iso, value
+    assert resolver.stats['fuzzy'] == 0
+    print("✅ Table précalculée OK")
+
+
+def test_series_resolves_each_value_once():
+    print("\nTest de la résolution par valeur distincte...")
+    resolver = CountryResolver()
+    series = pd.Series(['France', 'USA', None, 'FR', 'usa', 'Atlantis'] * 1000)
+    normalized = resolver.normalize(series)
+    assert isinstance(normalized.dtype, pd.CategoricalDtype)
+    assert normalized.isna().sum() == 1000
+    assert normalized.iloc[0] == normalized.iloc[3] == 'FRANCE'
+    assert normalized.iloc[1] == normalized.iloc[4]
+    # 5 valeurs distinctes résolues une fois chacune, puis mémo
+    assert resolver.stats['exact'] + resolver.stats['unresolved'] == 5
+    iso = resolver.iso_codes(series)
+    assert iso.iloc[0] == 'FRA' and iso.iloc[5] is None and iso.iloc[2] is None
+    assert resolver.stats['memo_hits'] == 5
+    print("✅ Résolution par valeur distincte OK")
+
+
+def test_engagement_by_country():
+    print("\nTest de l'agrégation par pays...")
+    df = pd.DataFrame({
+        'country': ['France', 'FR', 'USA', 'United States', None],
+        'engagement_rate': [1.0, 3.0, 5.0, 7.0, 9.0],
+        'likes': [10, 20, 30, 40, 50]
+    })
+    original_columns = list(df.columns)
+    visualizer = CountryMapVisualizer(df)
+    stats = visualizer.calculate_engagement_by_country('country')
+    assert list(df.columns) == original_columns
+    stats = stats.set_index('country')
+    assert stats.loc['FRANCE', 'avg_engagement'] == 2.0
+    assert stats.loc['FRANCE', 'post_count'] == 2
+    assert stats['total_likes'].sum() == 100
+    fig = visualizer.create_interactive_map(stats.reset_index())
+    assert sorted(fig.data[0].locations) == ['FRA', 'USA']
+    # Mise en page partagée, non modifiée par les figures produites
+    fig.update_layout(height=100)
+    assert _choropleth_base_layout().height == 600
+    other = visualizer.create_interactive_map(stats.reset_index(), 'total_likes')
+    assert other.layout.height == 600 and other.layout.title.text == 'Carte mondiale - Total de likes'
+    print("✅ Agrégation par pays OK")
+
+
+if __name__ == "__main__":
+    test_exact_index_and_aliases()
+    test_lookup_table()
+    test_series_resolves_each_value_once()
+    test_engagement_by_country()
+    print("\n✅ Tous les tests de résolution des pays sont passés")
@@ -0,0 +1,91 @@
+"""
+Test de l'ingestion par blocs des fichiers CSV
+Vérifie que le mode streaming produit les mêmes données que la lecture directe
+"""
+
+import io
+import pandas as pd
+import numpy as np
+from data_loader import read_csv_streaming, load_csv, MemoryLimitExceeded
+from statistical_analysis import StatisticalAnalyzer
+
+def create_sample_csv(n_rows=5000):
+    """Crée un CSV d'exemple en mémoire"""
+    np.random.seed(42)
+    df = pd.DataFrame({
+        'platform': np.random.choice(['TikTok', 'Instagram', 'Facebook', 'YouTube'], n_rows),
+        'country': np.random.choice(['France', 'Canada', 'Belgique'], n_rows),
+        'likes': np.random.randint(100, 5000, n_rows),
+        'comments': np.random.randint(10, 500, n_rows),
+        'followers': np.random.randint(5000, 100000, n_rows),
+        'post_id': [f"post_{i}" for i in range(n_rows)],
+    })
+    # Valeurs manquantes tardives: la colonne entière doit passer en flottant
+    df.loc[n_rows - 10:, 'comments'] = np.nan
+    return df, df.to_csv(index=False).encode('utf-8')
+
+def test_streaming_matches_single_shot():
+    """Le mode streaming doit donner les mêmes valeurs que pd.read_csv"""
+    print("🧪 TEST DE L'INGESTION PAR BLOCS")
+    print("=" * 60)
+
+    _, csv_bytes = create_sample_csv()
+
+    reference = pd.read_csv(io.BytesIO(csv_bytes))
+    reference = StatisticalAnalyzer(reference).calculate_engagement_rate()
+
+    progress = []
+    streamed = read_csv_streaming(
+        io.BytesIO(csv_bytes),
+        chunk_rows=700,
+        progress_callback=lambda fraction, rows: progress.append((fraction, rows))
+    )
+
+    print(f"✅ {len(streamed)} lignes lues en {streamed.attrs['ingestion']['chunks']} blocs")
+    assert len(streamed) == len(reference)
+    assert list(streamed.columns) == list(reference.columns)
+    assert isinstance(streamed['platform'].dtype, pd.CategoricalDtype)
+    assert streamed['post_id'].dtype == object
+    assert streamed['comments'].dtype == np.float64
+    assert progress[-1] == (1.0, len(reference))
+
+    for col in reference.columns:
+        expected = reference[col].astype(object) if reference[col].dtype != np.float64 else reference[col]
+        actual = streamed[col].astype(object) if reference[col].dtype != np.float64 else streamed[col]
+        pd.testing.assert_series_equal(actual, expected, check_names=False)
+    print("✅ Données identiques à la lecture directe")
+
+def test_memory_ceiling():
+    """Le plafond mémoire doit interrompre la lecture"""
+    _, csv_bytes = create_sample_csv(n_rows=20000)
+
+    try:
+        read_csv_streaming(io.BytesIO(csv_bytes), chunk_rows=1000, max_memory_mb=0.5)
+    except MemoryLimitExceeded as e:
+        print(f"✅ Plafond respecté: {e}")
+        assert e.rows_read < 20000
+    else:
+        raise AssertionError("Le plafond mémoire n'a pas été appliqué")
+
+def test_existing_engagement_kept():
+    """Une colonne engagement_rate fournie par le fichier n'est pas recalculée"""
+    df, _ = create_sample_csv(n_rows=2000)
+    df['engagement_rate'] = 42.0
+    streamed = read_csv_streaming(io.BytesIO(df.to_csv(index=False).encode('utf-8')), chunk_rows=700)
+    assert (streamed['engagement_rate'] == 42.0).all()
+    assert not streamed.attrs['ingestion']['engagement_computed']
+    print("✅ Colonne engagement_rate d'origine conservée")
+
+def test_small_file_single_shot():
+    """Les petits fichiers gardent la lecture directe"""
+    _, csv_bytes = create_sample_csv(n_rows=100)
+    df = load_csv(io.BytesIO(csv_bytes))
+    assert df.attrs['ingestion']['mode'] == 'single'
+    assert len(df) == 100
+    print("✅ Petit fichier lu en une seule fois")
+
+if __name__ == "__main__":
+    test_streaming_matches_single_shot()
+    test_memory_ceiling()
+    test_existing_engagement_kept()
+    test_small_file_single_shot()
@@ -0,0 +1,312 @@
+"""
+Test du stockage des projets en base de données
+Sauvegarde en colonnes, compatibilité avec les anciens projets JSON
+"""
+
+import os
+import json
+import tempfile
+import pandas as pd
+import numpy as np
+from sqlalchemy import text
+
+def create_test_database():
+    """Crée une base SQLite temporaire isolée"""
+    from database import Database
+    db_path = os.path.join(tempfile.mkdtemp(), "test_social_analytics.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    try:
+        return Database()
+    finally:
+        del os.environ['DATABASE_URL']
+
+def create_project_dataframe(n_rows=1000):
+    """Crée un DataFrame de projet représentatif"""
+    np.random.seed(42)
+    return pd.DataFrame({
+        'platform': pd.Categorical(np.random.choice(['TikTok', 'Instagram', 'YouTube'], n_rows)),
+        'likes': np.random.randint(100, 5000, n_rows),
+        'engagement_rate': np.random.uniform(0, 10, n_rows),
+        'date': pd.date_range('2024-01-01', periods=n_rows, freq='h'),
+        'caption': [f"post {i}" if i % 7 else None for i in range(n_rows)],
+    })
+
+def test_columnar_project_roundtrip():
+    """Un DataFrame sauvegardé doit être rechargé à l'identique"""
+    print("🧪 TEST DU STOCKAGE EN COLONNES DES PROJETS")
+    print("=" * 60)
+
+    db = create_test_database()
+    df = create_project_dataframe()
+    results = {'kruskal_wallis': {'p_value': np.float64(0.01), 'significant': True}}
+
+    assert db.save_project(1, "Projet test", df, results)
+    loaded_df, loaded_results = db.load_project(1, "Projet test")
+
+    pd.testing.assert_frame_equal(loaded_df, df)
+    assert loaded_results['kruskal_wallis']['significant'] is True
+    print(f"✅ {len(loaded_df)} lignes rechargées à l'identique")
+
+    # Une nouvelle sauvegarde sous le même nom remplace le projet
+    assert db.save_project(1, "Projet test", df.head(10))
+    loaded_df, loaded_results = db.load_project(1, "Projet test")
+    assert len(loaded_df) == 10
+    assert loaded_results is None
+    print("✅ Mise à jour du projet OK")
+
+def test_legacy_json_project_still_loads():
+    """Les projets enregistrés avant le format colonnes restent lisibles"""
+    db = create_test_database()
+    records = [{'platform': 'TikTok', 'likes': 120}, {'platform': 'Instagram', 'likes': 80}]
+
+    with db.engine.connect() as connection:
+        connection.execute(text("""
+            INSERT INTO saved_projects (user_id, project_name, data_json, results_json)
+            VALUES (1, 'Ancien projet', :data_json, NULL)
+        """), {'data_json': json.dumps(records)})
+        connection.commit()
+
+    loaded, results = db.load_project(1, "Ancien projet")
+    assert loaded == records
+    assert results is None
+    print("✅ Projet JSON historique rechargé")
+
+def test_project_metadata_and_lazy_loading():
+    """La liste des projets et le chargement paresseux lisent chaque partie séparément"""
+    db = create_test_database()
+    df = create_project_dataframe(n_rows=250)
+    results = {'spearman': {'test': 'Spearman Correlation', 'p_value': 0.2, 'significant': False}}
+    db.save_project(1, "Projet lazy", df, results)
+
+    projects = db.get_user_projects(1)
+    assert len(projects) == 1
+    metadata = projects[0]
+    assert metadata['row_count'] == 250
+    assert metadata['column_count'] == len(df.columns)
+    assert metadata['columns'][0] == {'name': 'platform', 'dtype': 'category'}
+    assert metadata['data_size_bytes'] > 0 and len(metadata['checksum']) == 64
+    assert metadata['analysis_summary']['spearman']['significant'] is False
+    print(f"✅ Métadonnées: {metadata['row_count']} lignes, {metadata['data_size_bytes']} octets")
+
+    project = db.open_project(1, "Projet lazy")
+    assert project.exists()
+    assert project._loaded == {'metadata'}
+    assert project.results['spearman']['p_value'] == 0.2
+    assert 'data' not in project._loaded
+    pd.testing.assert_frame_equal(project.data, df)
+    print("✅ Chargement paresseux OK")
+
+    db.delete_project(1, "Projet lazy")
+    assert db.get_user_projects(1) == []
+    with db.engine.connect() as connection:
+        for table_name in ('project_metadata', 'project_data', 'project_results'):
+            count = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+            assert count == 0, table_name
+    print("✅ Suppression complète du projet")
+
+def count_datasets(db):
+    with db.engine.connect() as connection:
+        rows = connection.execute(text("SELECT dataset_hash, ref_count FROM datasets")).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+def test_deduplicated_dataset_store():
+    """Un même jeu de données sauvegardé sous plusieurs noms n'est stocké qu'une fois"""
+    db = create_test_database()
+    df = create_project_dataframe(n_rows=300)
+
+    db.save_project(1, "Q3 v1", df)
+    db.save_project(1, "Q3 v2 après filtres", df.copy())
+    db.save_project(2, "Q3 partagé", df)
+
+    datasets = count_datasets(db)
+    assert len(datasets) == 1
+    assert list(datasets.values()) == [3]
+    print("✅ 3 projets, 1 seul jeu de données stocké")
+
+    # Un projet modifié pointe vers un nouveau jeu de données,
+    # l'ancien reste référencé par l'historique de ses versions
+    db.save_project(1, "Q3 v2 après filtres", df[df['likes'] > 1000])
+    datasets = count_datasets(db)
+    assert sorted(datasets.values()) == [1, 3]
+
+    db.delete_project(1, "Q3 v2 après filtres")
+    db.delete_project(1, "Q3 v1")
+    assert list(count_datasets(db).values()) == [1]
+    pd.testing.assert_frame_equal(db.load_project_data(2, "Q3 partagé"), df)
+
+    db.delete_project(2, "Q3 partagé")
+    assert count_datasets(db) == {}
+    assert db.collect_unreferenced_datasets() == 0
+    print("✅ Jeux de données orphelins supprimés")
+
+def test_dataset_key_shared_across_storage_formats():
+    """Un jeu de données stocké d'un seul tenant (avant le découpage en blocs) est réutilisé"""
+    from utils import dataframe_fingerprint
+    db = create_test_database()
+    df = create_project_dataframe(n_rows=300)
+
+    # Ligne écrite par l'ancien format (Parquet d'un seul tenant, clé = empreinte du DataFrame)
+    with db.engine.begin() as connection:
+        db._store_dataset(connection, {'hash': dataframe_fingerprint(df), 'manifest': None, 'chunks': None, 'data': df})
+    db.save_project(1, "Nouvelle sauvegarde", df.copy())
+
+    assert count_datasets(db) == {dataframe_fingerprint(df): 1}
+    pd.testing.assert_frame_equal(db.load_project_data(1, "Nouvelle sauvegarde"), df)
+    print("✅ Même clé de jeu de données pour les deux formats")
+
+def count_rows(db, table_name):
+    with db.engine.connect() as connection:
+        return connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+def test_incremental_saves_and_versions():
+    """Une nouvelle sauvegarde n'écrit que les blocs modifiés et crée une version"""
+    from dataset_chunks import CHUNK_MIN_ROWS
+    db = create_test_database()
+    df = create_project_dataframe(n_rows=CHUNK_MIN_ROWS * 8)
+    results = {
+        'kruskal_wallis': {'p_value': 0.01, 'significant': True},
+        'spearman': {'p_value': 0.2, 'significant': False},
+    }
+
+    db.save_project(1, "Campagne", df, results)
+    chunks_v1 = count_rows(db, 'dataset_chunks')
+    assert chunks_v1 > len(df.columns)
+    assert count_rows(db, 'result_entries') == 2
+
+    # Sauvegarde identique: ni nouveau bloc ni nouvelle version
+    db.save_project(1, "Campagne", df.copy(), results)
+    assert count_rows(db, 'dataset_chunks') == chunks_v1
+    assert len(db.list_project_versions(1, "Campagne")) == 1
+
+    # Colonne ajoutée et un seul résultat modifié
+    df_v2 = df.copy()
+    df_v2['shares'] = np.arange(len(df_v2))
+    results_v2 = dict(results, spearman={'p_value': 0.03, 'significant': True})
+    db.save_project(1, "Campagne", df_v2, results_v2)
+
+    new_chunks = count_rows(db, 'dataset_chunks') - chunks_v1
+    assert 0 < new_chunks <= len(df_v2) // CHUNK_MIN_ROWS
+    assert count_rows(db, 'result_entries') == 3
+    print(f"✅ Sauvegarde incrémentale: {new_chunks} nouveaux blocs sur {chunks_v1 + new_chunks}")
+
+    versions = db.list_project_versions(1, "Campagne")
+    assert [v['version'] for v in versions] == [2, 1]
+    assert versions[0]['is_current'] and not versions[1]['is_current']
+    assert db.get_project_metadata(1, "Campagne")['current_version'] == 2
+
+    pd.testing.assert_frame_equal(db.load_project_data(1, "Campagne"), df_v2)
+    pd.testing.assert_frame_equal(db.load_project_data(1, "Campagne", version=1), df)
+    assert db.load_project_results(1, "Campagne", version=1)['spearman']['p_value'] == 0.2
+    assert db.load_project_results(1, "Campagne")['spearman']['p_value'] == 0.03
+    print("✅ Historique des versions rechargé")
+
+    db.delete_project(1, "Campagne")
+    for table_name in ('datasets', 'dataset_chunks', 'result_entries', 'project_versions'):
+        assert count_rows(db, table_name) == 0, table_name
+    assert db.collect_unreferenced_datasets() == 0
+    print("✅ Blocs et versions supprimés avec le projet")
+
+def test_sqlite_engine_tuning_and_concurrent_saves():
+    """Le moteur SQLite est partagé, en WAL, et les écritures concurrentes aboutissent"""
+    from concurrent.futures import ThreadPoolExecutor
+    db = create_test_database()
+
+    with db.engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar().lower() == 'wal'
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() > 0
+    print("✅ SQLite en mode WAL avec busy timeout")
+
+    df = create_project_dataframe(n_rows=200)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        saved = list(executor.map(
+            lambda i: db.save_project(i % 4, f"Projet {i}", df.head(100 + i)),
+            range(16)
+        ))
+    assert all(saved)
+    assert sum(len(db.get_user_projects(user_id)) for user_id in range(4)) == 16
+    print("✅ 16 sauvegardes concurrentes sans verrouillage")
+
+def test_user_cache_invalidation():
+    """Les lectures répétées sont servies par le cache et les écritures l'invalident"""
+    db = create_test_database()
+    db.create_user("cache@example.com", "secret")
+    user_id = db.authenticate_user("cache@example.com", "secret")['id']
+
+    from database import invalidate_premium_entitlement
+    invalidate_premium_entitlement()
+    for _ in range(5):
+        assert db.get_user_preferences(user_id)['font_family'] in (None, 'Arial')
+        assert db.check_premium_status(user_id) is False
+    stats = db.get_cache_stats()
+    assert stats['misses'] == 2 and stats['hits'] == 8
+    print(f"✅ Cache: {stats['hits']} succès, {stats['misses']} échecs")
+
+    # Une valeur modifiée par l'appelant ne doit pas polluer le cache
+    db.get_user_preferences(user_id)['font_family'] = 'Roboto'
+    assert db.get_user_preferences(user_id)['font_family'] != 'Roboto'
+
+    db.update_user_preferences(user_id, font_family='Poppins')
+    assert db.get_user_preferences(user_id)['font_family'] == 'Poppins'
+    db.update_premium_status(user_id, True)
+    assert db.check_premium_status(user_id) is True
+    db.update_user_profile(user_id, first_name='Ada')
+    assert db.get_user_profile(user_id)['first_name'] == 'Ada'
+    print("✅ Invalidation à l'écriture OK")
+
+def test_premium_entitlements_expire_in_batch():
+    """Le statut premium est servi en mémoire jusqu'à l'expiration, puis désactivé en lot"""
+    from datetime import datetime, timedelta
+    import database
+    db = create_test_database()
+    user_ids = []
+    for i in range(3):
+        db.create_user(f"premium{i}@example.com", "secret")
+        user_ids.append(db.authenticate_user(f"premium{i}@example.com", "secret")['id'])
+        db.update_premium_status(user_ids[-1], True)
+
+    assert all(db.check_premium_status(user_id) for user_id in user_ids)
+    misses = db.cache_stats['misses']
+    assert all(db.check_premium_status(user_id) for user_id in user_ids)
+    assert db.cache_stats['misses'] == misses
+    print("✅ Statut premium servi depuis la mémoire")
+
+    # Deux abonnements arrivent à échéance
+    past = (datetime.now() - timedelta(minutes=1)).strftime('%Y-%m-%d %H:%M:%S')
+    with db.engine.connect() as connection:
+        connection.execute(text("UPDATE users SET premium_expires = :past WHERE id IN (:a, :b)"),
+                           {'past': past, 'a': user_ids[0], 'b': user_ids[1]})
+        connection.commit()
+    database.invalidate_premium_entitlement()
+    database.premium_entitlements.next_sweep = 0.0
+
+    assert db.check_premium_status(user_ids[0]) is False
+    with db.engine.connect() as connection:
+        active = connection.execute(text("SELECT COUNT(*) FROM users WHERE is_premium = 1")).scalar()
+    assert active == 1
+    assert db.check_premium_status(user_ids[1]) is False
+    assert db.check_premium_status(user_ids[2]) is True
+    print("✅ Abonnements échus désactivés en une seule passe")
+
+    # Annulation faite par un autre processus (sans invalidation locale): vue après l'âge maximal
+    with db.engine.connect() as connection:
+        connection.execute(text("UPDATE users SET is_premium = 0 WHERE id = :id"), {'id': user_ids[2]})
+        connection.commit()
+    assert db.check_premium_status(user_ids[2]) is True
+    max_age = database.PREMIUM_CACHE_MAX_AGE_SECONDS
+    database.PREMIUM_CACHE_MAX_AGE_SECONDS = 0
+    try:
+        assert db.check_premium_status(user_ids[2]) is False
+    finally:
+        database.PREMIUM_CACHE_MAX_AGE_SECONDS = max_age
+    print("✅ Statut premium relu après l'âge maximal du cache")
+
+if __name__ == "__main__":
+    test_columnar_project_roundtrip()
+    test_legacy_json_project_still_loads()
+    test_project_metadata_and_lazy_loading()
+    test_deduplicated_dataset_store()
+    test_dataset_key_shared_across_storage_formats()
+    test_incremental_saves_and_versions()
+    test_sqlite_engine_tuning_and_concurrent_saves()
+    test_user_cache_invalidation()
+    test_premium_entitlements_expire_in_batch()
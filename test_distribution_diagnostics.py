@@ -0,0 +1,57 @@
+"""
+Test des diagnostics de distribution
+Un test par échantillon, mémorisé, et sous-échantillonnage au-delà de 5000 valeurs
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from distribution_diagnostics import DistributionDiagnostics, SHAPIRO_MAX_N
+from ultra_advanced_statistical_analysis import UltraAdvancedStatisticalAnalyzer
+
+def test_tests_computed_once_and_memoized():
+    """Mêmes valeurs que scipy, puis servies depuis la mémoire"""
+    print("🧪 TEST DES DIAGNOSTICS DE DISTRIBUTION")
+    print("=" * 60)
+
+    diagnostics = DistributionDiagnostics()
+    data = np.random.default_rng(0).normal(size=500)
+    tests = diagnostics.normality_tests(data)
+    assert np.isclose(tests['shapiro_wilk']['p_value'], stats.shapiro(data)[1])
+    assert np.isclose(tests['kolmogorov_smirnov']['statistic'], stats.kstest(data, 'norm')[0])
+    assert np.isclose(tests['jarque_bera']['p_value'], stats.jarque_bera(data)[1])
+    assert diagnostics.stats['misses'] == 3
+
+    # Même échantillon sous forme de Series: aucun recalcul
+    diagnostics.normality_tests(pd.Series(data))
+    assert diagnostics.stats == {'hits': 3, 'misses': 3}
+    print("✅ Chaque test calculé une seule fois")
+
+def test_large_sample_shapiro_is_subsampled():
+    """Au-delà de la limite de Shapiro-Wilk, un sous-échantillon reproductible est utilisé"""
+    diagnostics = DistributionDiagnostics()
+    data = np.random.default_rng(1).exponential(size=SHAPIRO_MAX_N * 4)
+    result = diagnostics.shapiro(data)
+    assert result['subsampled'] and result['sample_size'] == SHAPIRO_MAX_N
+    assert not result['normal']
+    assert DistributionDiagnostics().shapiro(data)['p_value'] == result['p_value']
+    print(f"✅ Shapiro-Wilk sur {result['sample_size']} valeurs parmi {len(data)}")
+
+def test_ultra_analyzer_reports_keep_their_shape():
+    """Les rapports de l'analyseur ultra gardent la même structure"""
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        'platform': rng.choice(['TikTok', 'Instagram', 'YouTube'], 600),
+        'engagement_rate': rng.gamma(2.0, 2.0, 600),
+    })
+    analyzer = UltraAdvancedStatisticalAnalyzer(df)
+    kruskal = analyzer.ultra_advanced_kruskal_wallis_analysis()
+    assert {'shapiro_wilk', 'kolmogorov_smirnov', 'jarque_bera'} <= set(kruskal['normality_tests'][0])
+    ks = analyzer.kolmogorov_smirnov_distribution_test('engagement_rate')
+    assert 'critical_values' in ks['additional_normality_tests']['anderson_darling']
+    print("✅ Structure des rapports inchangée")
+
+if __name__ == "__main__":
+    test_tests_computed_once_and_memoized()
+    test_large_sample_shapiro_is_subsampled()
+    test_ultra_analyzer_reports_keep_their_shape()
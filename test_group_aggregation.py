@@ -0,0 +1,60 @@
+"""
+Test de l'agrégation par groupe en un seul passage
+"""
+
+import numpy as np
+import pandas as pd
+
+from group_aggregation import aggregate_by_group, metric_spec
+from report_generator import ReportGenerator
+
+
+def create_data(n_rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'platform': rng.choice(['Instagram', 'TikTok', 'YouTube'], n_rows),
+        'likes': rng.integers(0, 1000, n_rows),
+        'engagement_rate': rng.random(n_rows) * 10,
+    })
+    df.loc[::50, 'platform'] = None
+    return df
+
+
+def test_matches_separate_groupbys():
+    print("Test de l'agrégation déclarative...")
+    df = create_data()
+    spec = [
+        ('avg_engagement', 'engagement_rate', 'mean'),
+        ('median_engagement', 'engagement_rate', 'median'),
+        ('total_likes', 'likes', 'sum'),
+        ('absent', 'followers', 'mean'),
+    ]
+    stats = aggregate_by_group(df, 'platform', spec, size_name='post_count')
+    assert list(stats.columns) == ['avg_engagement', 'median_engagement', 'total_likes', 'post_count']
+    assert list(stats.index) == ['Instagram', 'TikTok', 'YouTube']
+    grouped = df.groupby('platform')
+    assert np.allclose(stats['avg_engagement'], grouped['engagement_rate'].mean())
+    assert np.allclose(stats['median_engagement'], grouped['engagement_rate'].median())
+    assert (stats['total_likes'] == grouped['likes'].sum()).all()
+    assert (stats['post_count'] == grouped.size()).all()
+    # Ordre d'apparition sans tri
+    unsorted = aggregate_by_group(df, 'platform', spec, sort=False)
+    assert list(unsorted.index) == list(df['platform'].dropna().unique())
+    print("✅ Agrégation déclarative OK")
+
+
+def test_summary_csv():
+    print("\nTest de l'export CSV du résumé...")
+    df = create_data()
+    csv = ReportGenerator(df).export_summary_to_csv()
+    lines = csv.strip().splitlines()
+    assert lines[0] == 'Plateforme,Nombre de posts,likes_moyenne,likes_total,engagement_rate_moyenne,engagement_rate_total'
+    assert len(lines) == 4
+    assert metric_spec(['likes'], {'total': 'sum'}) == [('likes_total', 'likes', 'sum')]
+    print("✅ Export CSV OK")
+
+
+if __name__ == "__main__":
+    test_matches_separate_groupbys()
+    test_summary_csv()
+    print("\n✅ Tous les tests d'agrégation sont passés")
@@ -0,0 +1,63 @@
+"""
+Test du regroupement en un seul passage
+Les groupes, le test de Kruskal-Wallis et les descriptives doivent être
+identiques à la construction par masques booléens
+"""
+
+import pandas as pd
+import numpy as np
+from scipy import stats
+from grouped_arrays import GroupedArrays
+from advanced_statistical_analysis import AdvancedStatisticalAnalyzer
+
+def create_sample_data(n_rows=2000):
+    np.random.seed(42)
+    df = pd.DataFrame({
+        'platform': np.random.choice(['TikTok', 'Instagram', 'YouTube', 'Facebook'], n_rows),
+        'engagement_rate': np.random.randint(0, 40, n_rows).astype(float),
+    }, index=np.arange(n_rows) * 10)
+    df.loc[df.index[::13], 'engagement_rate'] = np.nan
+    df.loc[df.index[::29], 'platform'] = None
+    return df
+
+def test_grouped_arrays_match_masks():
+    """Mêmes groupes, même statistique H et mêmes index que les masques"""
+    print("🧪 TEST DU REGROUPEMENT EN UN PASSAGE")
+    print("=" * 60)
+
+    df = create_sample_data()
+    grouped = GroupedArrays(df, 'engagement_rate', 'platform')
+    expected = {
+        group: df[df['platform'] == group]['engagement_rate'].dropna()
+        for group in df['platform'].dropna().unique()
+    }
+
+    assert grouped.labels == list(expected)
+    for i, label in enumerate(grouped.labels):
+        series = grouped.series(i)
+        pd.testing.assert_series_equal(series, expected[label], check_names=False)
+        assert np.shares_memory(grouped.array(i), grouped.values)
+
+    statistic, p_value = grouped.kruskal()
+    reference = stats.kruskal(*expected.values())
+    assert np.isclose(statistic, reference.statistic) and np.isclose(p_value, reference.pvalue)
+    print(f"✅ H = {statistic:.3f}, identique à scipy (ex-aequo compris)")
+
+    description = grouped.describe(0)
+    data = expected[grouped.labels[0]]
+    assert np.isclose(description['std'], data.std())
+    assert description['q75'] == data.quantile(0.75)
+    print("✅ Statistiques descriptives identiques à pandas")
+
+def test_advanced_kruskal_uses_non_empty_groups():
+    """Les libellés des post-hoc restent alignés sur les groupes non vides"""
+    df = create_sample_data()
+    df.loc[df['platform'] == 'Facebook', 'engagement_rate'] = np.nan
+    result = AdvancedStatisticalAnalyzer(df).advanced_kruskal_wallis_analysis()
+    assert result['groups_compared'] == 3
+    assert {r['group'] for r in result['descriptive_statistics']} == {'TikTok', 'Instagram', 'YouTube'}
+    print("✅ Post-hoc alignés sur les groupes non vides")
+
+if __name__ == "__main__":
+    test_grouped_arrays_match_masks()
+    test_advanced_kruskal_uses_non_empty_groups()
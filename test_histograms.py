@@ -0,0 +1,48 @@
+"""
+Test des histogrammes calculés côté serveur
+"""
+
+import numpy as np
+import pandas as pd
+from histograms import compute_histogram, clear_histogram_cache
+from visualizations import DataVisualizer
+
+def create_data(n_rows=200000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'likes': np.floor(rng.pareto(1.2, n_rows) * 100),
+        'engagement_rate': rng.normal(5, 1, n_rows),
+    })
+
+def test_bins_and_cache():
+    """Freedman-Diaconis sur une loi normale, classes log sur une queue lourde, cache"""
+    print("🧪 TEST DES HISTOGRAMMES")
+    print("=" * 60)
+
+    clear_histogram_cache()
+    df = create_data()
+    normal = compute_histogram(df, 'engagement_rate')
+    assert normal['scale'] == 'linear' and 10 <= len(normal['counts']) <= 100
+    assert normal['counts'].sum() == len(df)
+    assert np.isclose(normal['mean'], df['engagement_rate'].mean())
+
+    heavy = compute_histogram(df, 'likes')
+    assert heavy['scale'] == 'log' and heavy['counts'].sum() == len(df)
+    assert compute_histogram(df.copy(), 'likes') is heavy
+
+    fixed = compute_histogram(df, 'likes', bins=30)
+    assert np.array_equal(fixed['counts'], np.histogram(df['likes'], bins=30)[0])
+    print(f"✅ {len(normal['counts'])} classes (FD), {len(heavy['counts'])} classes log")
+
+def test_figure_size_independent_of_rows():
+    df = create_data()
+    large = DataVisualizer(df).plot_metric_distribution_histogram('engagement_rate', bins=30)
+    small = DataVisualizer(df.head(1000)).plot_metric_distribution_histogram('engagement_rate', bins=30)
+    assert large.data[0].type == 'bar' and len(large.data[0].y) == 30
+    assert abs(len(large.to_json()) - len(small.to_json())) < 500
+    assert DataVisualizer(df).plot_metric_distribution_histogram('likes').layout.xaxis.tickvals is not None
+    print("✅ Taille de la figure indépendante du nombre de lignes")
+
+if __name__ == "__main__":
+    test_bins_and_cache()
+    test_figure_size_independent_of_rows()
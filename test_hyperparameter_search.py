@@ -0,0 +1,53 @@
+"""
+Test de la recherche d'hyperparamètres par divisions successives
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.ensemble import RandomForestRegressor
+from analysis_cache import analysis_cache
+from hyperparameter_search import successive_halving_search
+from ultra_advanced_statistical_analysis import UltraAdvancedStatisticalAnalyzer
+
+def create_regression_data(n_rows=6000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 3))
+    y = X @ [2.0, -1.0, 0.5] + rng.normal(size=n_rows)
+    return X, y
+
+def test_halving_on_rows_and_cache():
+    """Les paliers augmentent les lignes et un second appel est servi par le cache"""
+    print("🧪 TEST DE LA RECHERCHE PAR DIVISIONS SUCCESSIVES")
+    print("=" * 60)
+
+    analysis_cache.clear()
+    X, y = create_regression_data()
+    first = successive_halving_search(Ridge(), X, y, n_jobs=1)
+    assert first['resource'] == 'n_samples'
+    assert [rung['n_candidates'] for rung in first['rungs']] == [4, 2, 1]
+    assert first['rungs'][-1]['resource'] > first['rungs'][0]['resource']
+    assert first['best_estimator'].alpha == first['best_params']['alpha']
+
+    second = successive_halving_search(Ridge(), X, y, n_jobs=1)
+    assert second['n_fits'] == 0 and second['cache_hits'] == 7
+    assert second['best_params'] == first['best_params']
+    print(f"✅ {first['n_fits']} ajustements puis 0 (cache): {first['best_params']}")
+
+def test_warm_start_for_tree_ensembles():
+    X, y = create_regression_data(600)
+    search = successive_halving_search(RandomForestRegressor(random_state=42), X, y, n_jobs=1, refit=False)
+    assert search['resource'] == 'n_estimators' and search['best_estimator'] is None
+    assert search['best_params']['n_estimators'] == 200
+    print(f"✅ Ensemble d'arbres complété par paliers: {search['best_params']}")
+
+def test_analyzer_matches_estimator_classes():
+    """Les grilles sont trouvées à partir de la classe du modèle"""
+    X, y = create_regression_data(300)
+    analyzer = UltraAdvancedStatisticalAnalyzer(pd.DataFrame(X, columns=['a', 'b', 'c']))
+    assert analyzer._optimize_hyperparameters(Ridge(), X, pd.Series(y))['optimization_successful']
+
+if __name__ == "__main__":
+    test_halving_on_rows_and_cache()
+    test_warm_start_for_tree_ensembles()
+    test_analyzer_matches_estimator_classes()
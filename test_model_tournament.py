@@ -0,0 +1,62 @@
+"""
+Test du tournoi de modèles de régression
+Mêmes scores que l'entraînement séquentiel, temps par modèle et budget respecté
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.svm import SVR
+from sklearn.model_selection import cross_val_score
+from model_tournament import run_tournament, tournament_summary
+from ultra_advanced_statistical_analysis import UltraAdvancedStatisticalAnalyzer
+
+def create_regression_data(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 3))
+    y = pd.Series(X @ [2.0, -1.0, 0.5] + rng.normal(size=n_rows), name='likes')
+    return X, y
+
+def test_tournament_matches_cross_val_score():
+    """Les plis partagés donnent les mêmes R² que cross_val_score"""
+    print("🧪 TEST DU TOURNOI DE MODÈLES")
+    print("=" * 60)
+
+    X, y = create_regression_data()
+    models = {
+        'Linear Regression': LinearRegression(),
+        'Random Forest': RandomForestRegressor(n_estimators=20, random_state=42)
+    }
+    tournament = run_tournament(models, X, y, n_jobs=2)
+    for name, model in models.items():
+        expected = cross_val_score(model, X, y, cv=5, scoring='r2')
+        assert np.allclose(tournament['models'][name]['cv_r2'], expected)
+        assert tournament['models'][name]['fit_seconds'] > 0
+    assert len(tournament['y_test']) == 60
+    print("✅ Scores de validation croisée identiques à cross_val_score")
+
+def test_slow_models_and_budget():
+    """Les modèles lents et ceux hors budget sont écartés et signalés"""
+    X, y = create_regression_data()
+    models = {'Ridge Regression': Ridge(), 'SVR': SVR()}
+    tournament = run_tournament(models, X, y, n_jobs=1, slow_max_rows=100)
+    assert list(tournament['models']) == ['Ridge Regression']
+    assert 'SVR' in tournament_summary(tournament)['skipped_models']
+
+    tournament = run_tournament(models, X, y, n_jobs=1, budget_seconds=-1)
+    assert tournament['models'] == {} and len(tournament['skipped']) == 2
+    print("✅ Modèles lents et hors budget écartés")
+
+def test_regression_analysis_reports_timings():
+    X, y = create_regression_data()
+    df = pd.DataFrame(X, columns=['followers', 'views', 'comments']).assign(likes=y)
+    result = UltraAdvancedStatisticalAnalyzer(df).ultra_advanced_regression_analysis('likes', ['followers', 'views', 'comments'])
+    assert set(result['tournament']['timings']) == set(result['models_comparison'])
+    assert result['best_model_performance']['test_r2'] > 0.8
+    print(f"✅ Meilleur modèle: {result['best_model']} en {result['tournament']['elapsed_seconds']:.2f} s")
+
+if __name__ == "__main__":
+    test_tournament_matches_cross_val_score()
+    test_slow_models_and_budget()
+    test_regression_analysis_reports_timings()
@@ -0,0 +1,72 @@
+"""
+Test du rendu des nuages de points sur de grands volumes
+"""
+
+import numpy as np
+import pandas as pd
+from plot_downsampling import sample_positions, linear_fit_by_group, box_statistics
+from visualizations import DataVisualizer
+
+def create_large_data(n_rows=200000, seed=0):
+    rng = np.random.default_rng(seed)
+    followers = rng.lognormal(8, 1, n_rows)
+    return pd.DataFrame({
+        'platform': rng.choice(['TikTok', 'Instagram', 'YouTube'], n_rows, p=[0.899, 0.1, 0.001]),
+        'followers': followers,
+        'likes': 0.05 * followers + rng.normal(0, 50, n_rows),
+    })
+
+def test_sampling_and_sufficient_statistics():
+    """Échantillon stratifié et droites identiques aux moindres carrés"""
+    print("🧪 TEST DES NUAGES DE POINTS GRANDS VOLUMES")
+    print("=" * 60)
+
+    df = create_large_data()
+    codes, labels = pd.factorize(df['platform'])
+    positions = sample_positions(len(df), 10000, codes)
+    counts = np.bincount(codes[positions])
+    assert len(np.unique(positions)) == len(positions)
+    assert counts[labels.get_loc('YouTube')] >= min(200, (df['platform'] == 'YouTube').sum())
+    assert abs(len(positions) - 10000) < 500
+
+    fit = linear_fit_by_group(df['followers'], df['likes'], codes, len(labels))
+    for i, label in enumerate(labels):
+        group = df[df['platform'] == label]
+        slope, intercept = np.polyfit(group['followers'], group['likes'], 1)
+        assert np.isclose(fit['slope'][i], slope) and np.isclose(fit['intercept'][i], intercept)
+    print(f"✅ {len(positions)} points échantillonnés, droites exactes")
+
+def test_large_scatter_figure_is_bounded():
+    df = create_large_data()
+    visualizer = DataVisualizer(df)
+    fig = visualizer.plot_scatter_with_regression('followers', 'likes', point_budget=20000)
+    points = sum(len(trace.x) for trace in fig.data if trace.type == 'scattergl')
+    assert points <= 20000 + 3 * 200
+    assert sum(trace.mode == 'lines' for trace in fig.data) == 3
+
+    fig = visualizer.plot_scatter_with_regression('followers', 'likes', point_budget=20000, large_mode='heatmap')
+    assert fig.data[0].type == 'heatmap'
+    print(f"✅ Figure bornée à {points} points au lieu de {len(df)}")
+
+def test_precomputed_box_plots():
+    """Quartiles et moustaches identiques à NumPy, figure de taille constante"""
+    df = create_large_data()
+    codes, labels = pd.factorize(df['platform'])
+    boxes = box_statistics(df['likes'].to_numpy(), codes, len(labels), max_outliers=50)
+    for i, label in enumerate(labels):
+        values = df.loc[df['platform'] == label, 'likes'].to_numpy()
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        assert np.allclose([boxes['q1'][i], boxes['median'][i], boxes['q3'][i]], [q1, median, q3])
+        inside = values[(values >= q1 - 1.5 * (q3 - q1)) & (values <= q3 + 1.5 * (q3 - q1))]
+        assert boxes['lowerfence'][i] == inside.min() and boxes['upperfence'][i] == inside.max()
+        assert len(boxes['outliers'][i]) <= 50
+
+    fig = DataVisualizer(df).plot_likes_distribution()
+    assert all(trace.y is None or len(trace.y) <= 500 for trace in fig.data)
+    assert len(fig.to_json()) < 100000
+    print("✅ Boîtes à moustaches précalculées")
+
+if __name__ == "__main__":
+    test_sampling_and_sufficient_statistics()
+    test_large_scatter_figure_is_bounded()
+    test_precomputed_box_plots()
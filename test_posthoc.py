@@ -0,0 +1,59 @@
+"""
+Test des post-hoc vectorisés
+Mann-Whitney, corrections de Holm / BH et pool de processus
+"""
+
+import pandas as pd
+import numpy as np
+from scipy import stats
+from grouped_arrays import GroupedArrays
+from posthoc import (
+    adjust_pvalues, mann_whitney_all_pairs, dunn_all_pairs, ks_all_pairs, pair_indices
+)
+
+def create_grouped(n_rows=3000, n_groups=12, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'country': rng.choice([f"pays_{i}" for i in range(n_groups)], n_rows),
+        'engagement_rate': rng.integers(0, 60, n_rows).astype(float),
+    })
+    # Petit groupe sans ex-aequo: loi exacte de U
+    small = pd.DataFrame({'country': ['petit'] * 6, 'engagement_rate': np.arange(6) + 0.5})
+    return GroupedArrays(pd.concat([df, small], ignore_index=True), 'engagement_rate', 'country')
+
+def test_mann_whitney_matches_scipy():
+    """Toutes les paires sont identiques à stats.mannwhitneyu"""
+    print("🧪 TEST DES POST-HOC VECTORISÉS")
+    print("=" * 60)
+
+    grouped = create_grouped()
+    u, p_values = mann_whitney_all_pairs(grouped)
+    for i, j in zip(*pair_indices(len(grouped))):
+        reference = stats.mannwhitneyu(grouped.array(i), grouped.array(j), alternative='two-sided')
+        assert np.isclose(u[i, j], reference.statistic)
+        assert np.isclose(p_values[i, j], reference.pvalue)
+    print(f"✅ {len(pair_indices(len(grouped))[0])} paires identiques à scipy")
+
+    z, dunn_p = dunn_all_pairs(grouped)
+    assert np.allclose(z, -z.T) and np.all((dunn_p >= 0) & (dunn_p <= 1))
+
+def test_multiple_comparison_corrections():
+    """Holm et Benjamini-Hochberg vectorisés"""
+    p_values = [0.01, 0.04, 0.03, 0.005]
+    assert np.allclose(adjust_pvalues(p_values, 'holm'), [0.03, 0.06, 0.06, 0.02])
+    assert np.allclose(adjust_pvalues(p_values, 'fdr_bh'), [0.02, 0.04, 0.04, 0.02])
+    print("✅ Corrections de Holm et BH")
+
+def test_ks_process_pool():
+    """Le pool de processus donne les mêmes résultats que le calcul séquentiel"""
+    grouped = create_grouped(n_groups=11)
+    sequential = ks_all_pairs(grouped, n_jobs=1)
+    parallel = ks_all_pairs(grouped, n_jobs=2)
+    assert len(parallel) == len(sequential) >= 50
+    assert np.allclose(np.array(parallel, dtype=float), np.array(sequential, dtype=float))
+    print("✅ Kolmogorov-Smirnov réparti sur 2 processus")
+
+if __name__ == "__main__":
+    test_mann_whitney_matches_scipy()
+    test_multiple_comparison_corrections()
+    test_ks_process_pool()
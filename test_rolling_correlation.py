@@ -0,0 +1,42 @@
+"""
+Test de la corrélation de Spearman sur fenêtres glissantes
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from rolling_correlation import rolling_spearman, window_starts
+from ultra_advanced_statistical_analysis import UltraAdvancedStatisticalAnalyzer
+
+def test_rolling_spearman_matches_scipy():
+    """Avec un pas de 1, chaque fenêtre est identique à stats.spearmanr"""
+    print("🧪 TEST DE LA CORRÉLATION GLISSANTE")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 20, 400).astype(float)
+    y = x + rng.normal(size=400)
+    starts, correlations = rolling_spearman(x, y, 40, stride=1)
+    expected = [stats.spearmanr(x[i:i + 40], y[i:i + 40])[0] for i in range(len(x) - 40 + 1)]
+    assert np.allclose(correlations, expected)
+    print(f"✅ {len(starts)} fenêtres identiques à scipy (ex-aequo compris)")
+
+    starts = window_starts(100000, 10000, max_windows=50)
+    assert len(starts) <= 51 and starts[0] == 0 and starts[-1] == 90000
+
+def test_stability_summary_and_curve():
+    """Le résumé garde ses clés et la courbe complète est fournie"""
+    rng = np.random.default_rng(1)
+    x = pd.Series(rng.normal(size=20000))
+    y = x + pd.Series(rng.normal(size=20000))
+    analyzer = UltraAdvancedStatisticalAnalyzer(pd.DataFrame({'x': x, 'y': y}))
+    stability = analyzer._analyze_correlation_stability(x, y, max_windows=100)
+    assert stability['window_size'] == 2000
+    assert stability['n_windows'] <= 101
+    assert len(stability['curve']['correlation']) == stability['n_windows']
+    assert stability['stability'] and 0.6 < stability['mean_correlation'] < 0.8
+    print(f"✅ {stability['n_windows']} fenêtres (pas de {stability['stride']})")
+
+if __name__ == "__main__":
+    test_rolling_spearman_matches_scipy()
+    test_stability_summary_and_curve()
@@ -0,0 +1,56 @@
+"""
+Test de la préparation et de la réduction des séries temporelles
+"""
+
+import numpy as np
+import pandas as pd
+from plot_downsampling import lttb
+from time_series import prepare_time_series, series_window, clear_time_series_cache
+from visualizations import DataVisualizer
+
+def create_hourly_data(n_hours=3 * 365 * 24, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2022-01-01', periods=n_hours, freq='h').astype(str)
+    return pd.DataFrame({
+        'date': np.tile(dates, 2),
+        'platform': np.repeat(['TikTok', 'Instagram'], n_hours),
+        'likes': rng.integers(0, 1000, 2 * n_hours),
+    })
+
+def test_lttb_keeps_extremes():
+    print("🧪 TEST DES SÉRIES TEMPORELLES")
+    print("=" * 60)
+
+    x = np.arange(10000)
+    y = np.sin(x / 500)
+    y[4321] = 50
+    keep = lttb(x, y, 100)
+    assert len(keep) == 100 and keep[0] == 0 and keep[-1] == 9999
+    assert 4321 in keep and np.all(np.diff(keep) > 0)
+    print("✅ LTTB conserve les extrêmes")
+
+def test_time_series_is_bounded_and_zoomable():
+    """Le DataFrame n'est pas modifié, les séries sont bornées et le zoom affine"""
+    clear_time_series_cache()
+    df = create_hourly_data()
+    visualizer = DataVisualizer(df)
+
+    fig = visualizer.plot_time_series('date', 'likes', max_points=1000)
+    assert not pd.api.types.is_datetime64_any_dtype(df['date'])
+    assert len(fig.data) == 2 and all(len(trace.x) <= 1000 for trace in fig.data)
+    assert '(moyenne par jour)' in fig.layout.title.text
+
+    # Une semaine: aucune agrégation, toutes les heures
+    zoomed = visualizer.plot_time_series('date', 'likes', start='2023-03-01', end='2023-03-07 23:00', max_points=1000)
+    assert len(zoomed.data[0].x) == 7 * 24
+    week = df[(df['platform'] == 'TikTok') & (df['date'] >= '2023-03-01')].head(7 * 24)
+    assert np.array_equal(zoomed.data[0].y, week['likes'].to_numpy(dtype=float))
+
+    prepared = prepare_time_series(df, 'date', 'likes', 'platform')
+    assert prepare_time_series(df.copy(), 'date', 'likes', 'platform') is prepared
+    assert sum(s['n_points'] for s in series_window(prepared)) == len(df)
+    print(f"✅ {len(df)} lignes affichées en {sum(len(t.x) for t in fig.data)} points")
+
+if __name__ == "__main__":
+    test_lttb_keeps_extremes()
+    test_time_series_is_bounded_and_zoomable()
@@ -0,0 +1,179 @@
+"""
+Module de préparation des séries temporelles pour l'affichage
+Les dates sont converties, triées et indexées une seule fois par jeu de
+données (cache du processus, sans modifier le DataFrame d'origine). Chaque
+affichage extrait la fenêtre demandée par recherche dichotomique, agrège à
+l'intervalle le plus fin compatible avec le nombre de points visé, puis
+réduit chaque série avec LTTB. Une fenêtre plus étroite (zoom) est donc
+rendue avec une résolution plus fine.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from utils import dataframe_fingerprint
+from plot_downsampling import lttb
+
+load_dotenv()
+
+# Nombre maximal de points affichés par série
+TIME_SERIES_POINT_BUDGET = int(os.getenv('TIME_SERIES_POINT_BUDGET', '2000'))
+# Une série est agrégée si elle dépasse ce multiple du budget (LTTB termine la réduction)
+RESAMPLE_FACTOR = 4
+# Jeux de données préparés conservés en mémoire
+TIME_SERIES_CACHE_SIZE = 8
+
+# Intervalles d'agrégation, du plus fin au plus grossier (durée approximative, libellé)
+RESAMPLE_RULES = [
+    ('s', pd.Timedelta(seconds=1), 'seconde'),
+    ('min', pd.Timedelta(minutes=1), 'minute'),
+    ('5min', pd.Timedelta(minutes=5), 'tranche de 5 minutes'),
+    ('15min', pd.Timedelta(minutes=15), 'tranche de 15 minutes'),
+    ('h', pd.Timedelta(hours=1), 'heure'),
+    ('6h', pd.Timedelta(hours=6), 'tranche de 6 heures'),
+    ('D', pd.Timedelta(days=1), 'jour'),
+    ('W', pd.Timedelta(weeks=1), 'semaine'),
+    ('MS', pd.Timedelta(days=30), 'mois'),
+    ('QS', pd.Timedelta(days=91), 'trimestre'),
+    ('YS', pd.Timedelta(days=365), 'année'),
+]
+RESAMPLE_LABELS = {rule: label for rule, _, label in RESAMPLE_RULES}
+
+_prepared = OrderedDict()
+_prepared_lock = threading.Lock()
+
+
+def prepare_time_series(df, date_column, metric, group_by=None):
+    """
+    Dates converties et triées par groupe (une fois par contenu de colonnes)
+
+    Returns:
+    dict: {'dates' (int64, ns UTC), 'values', 'labels', 'starts', 'stops', 'tz'}
+    """
+    columns = [date_column, metric] + ([group_by] if group_by else [])
+    key = (dataframe_fingerprint(df, columns), tuple(columns))
+    with _prepared_lock:
+        if key in _prepared:
+            _prepared.move_to_end(key)
+            return _prepared[key]
+
+    dates = df[date_column]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors='coerce')
+    dates = pd.DatetimeIndex(dates).as_unit('ns')
+    values = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=float)
+
+    if group_by:
+        codes, labels = pd.factorize(df[group_by], sort=False)
+        labels = list(labels)
+    else:
+        codes, labels = np.zeros(len(df), dtype=np.intp), [None]
+    valid = ~dates.isna() & np.isfinite(values) & (codes >= 0)
+
+    timestamps = dates.asi8[valid]
+    values, codes = values[valid], codes[valid]
+    order = np.lexsort((timestamps, codes))
+    counts = np.bincount(codes, minlength=len(labels))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    prepared = {
+        'dates': timestamps[order],
+        'values': values[order],
+        'labels': labels,
+        'starts': offsets[:-1],
+        'stops': offsets[1:],
+        'tz': dates.tz
+    }
+    with _prepared_lock:
+        _prepared[key] = prepared
+        while len(_prepared) > TIME_SERIES_CACHE_SIZE:
+            _prepared.popitem(last=False)
+    return prepared
+
+
+def _to_datetime(timestamps, tz):
+    index = pd.DatetimeIndex(np.asarray(timestamps, dtype='datetime64[ns]'))
+    return index.tz_localize('UTC').tz_convert(tz) if tz is not None else index
+
+
+def _to_timestamp(value, tz):
+    value = pd.Timestamp(value)
+    if tz is not None:
+        value = value.tz_localize(tz) if value.tzinfo is None else value.tz_convert(tz)
+    elif value.tzinfo is not None:
+        value = value.tz_localize(None)
+    return value.as_unit('ns').value
+
+
+def resample_rule(span, max_buckets):
+    """Intervalle le plus fin donnant au plus max_buckets cases sur span"""
+    for rule, duration, _ in RESAMPLE_RULES:
+        if span / duration <= max_buckets:
+            return rule
+    return RESAMPLE_RULES[-1][0]
+
+
+def downsample_series(timestamps, values, max_points, tz=None):
+    """
+    Réduit une série triée à max_points points au plus
+
+    Returns:
+    tuple: (dates, valeurs, intervalle d'agrégation ou None)
+    """
+    rule = None
+    if len(timestamps) > max_points * RESAMPLE_FACTOR:
+        span = pd.Timedelta(int(timestamps[-1] - timestamps[0]), unit='ns')
+        rule = resample_rule(span, max_points * RESAMPLE_FACTOR)
+        resampled = pd.Series(values, index=_to_datetime(timestamps, tz)).resample(rule).mean().dropna()
+        # asi8 d'un index avec fuseau est exprimé en UTC, comme les dates préparées
+        timestamps = resampled.index.as_unit('ns').asi8
+        values = resampled.to_numpy()
+    if len(timestamps) > max_points:
+        keep = lttb(timestamps, values, max_points)
+        timestamps, values = timestamps[keep], values[keep]
+    return _to_datetime(timestamps, tz), values, rule
+
+
+def series_window(prepared, start=None, end=None, max_points=None):
+    """
+    Séries de la fenêtre [start, end], réduites pour l'affichage
+
+    Returns:
+    list: [{'label', 'dates', 'values', 'rule', 'n_points'}] (séries non vides)
+    """
+    max_points = TIME_SERIES_POINT_BUDGET if max_points is None else max_points
+    tz = prepared['tz']
+    series = []
+    for label, first, last in zip(prepared['labels'], prepared['starts'], prepared['stops']):
+        timestamps = prepared['dates'][first:last]
+        values = prepared['values'][first:last]
+        low = 0 if start is None else np.searchsorted(timestamps, _to_timestamp(start, tz), side='left')
+        high = len(timestamps) if end is None else np.searchsorted(timestamps, _to_timestamp(end, tz), side='right')
+        if high <= low:
+            continue
+        dates, window_values, rule = downsample_series(timestamps[low:high], values[low:high], max_points, tz)
+        series.append({
+            'label': label,
+            'dates': dates,
+            'values': window_values,
+            'rule': rule,
+            'n_points': high - low
+        })
+    return series
+
+
+def time_bounds(prepared):
+    """Première et dernière date des séries préparées (None si vides)"""
+    if len(prepared['dates']) == 0:
+        return None
+    dates = _to_datetime([prepared['dates'].min(), prepared['dates'].max()], prepared['tz'])
+    return dates[0], dates[1]
+
+
+def clear_time_series_cache():
+    with _prepared_lock:
+        _prepared.clear()
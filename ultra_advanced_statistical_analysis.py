@@ -27,6 +27,14 @@ from plotly.subplots import make_subplots
 import warnings
 warnings.filterwarnings('ignore')
 
+from grouped_arrays import GroupedArrays
+from posthoc import posthoc_table, ks_all_pairs
+from distribution_diagnostics import distribution_diagnostics
+from rolling_correlation import rolling_spearman
+from model_tournament import run_tournament, tournament_summary
+from bootstrap_stability import bootstrap_scores
+from hyperparameter_search import successive_halving_search
+
 class UltraAdvancedStatisticalAnalyzer:
     def __init__(self, df):
         """
@@ -101,111 +109,91 @@ class UltraAdvancedStatisticalAnalyzer:
         if column not in self.df.columns or group_column not in self.df.columns:
             return None
         
-        groups = self.df[group_column].unique()
-        group_data = [self.df[self.df[group_column] == group][column].dropna() for group in groups]
-        group_data = [g for g in group_data if len(g) > 0]
+        # Groupes construits en un seul passage: chaque groupe est une vue sans copie
+        grouped = GroupedArrays(self.df, column, group_column)
+        groups = grouped.labels
+        group_data = grouped.arrays()
         
         if len(group_data) < 2:
             return None
         
-        # Test principal
-        statistic, p_value = stats.kruskal(*group_data)
+        # Test principal (rangs calculés une seule fois)
+        statistic, p_value = grouped.kruskal()
         
         # Effect size (eta-squared)
-        n_total = sum(len(g) for g in group_data)
+        n_total = grouped.n_total
         eta_squared = (statistic - len(groups) + 1) / (n_total - len(groups))
         
-        # Tests post-hoc multiples
+        # Tests post-hoc multiples: toutes les paires à partir des mêmes groupes
+        table = posthoc_table(grouped)
+        ks_results = ks_all_pairs(grouped)
+        
+        # Anderson-Darling ne dépend que du premier groupe de la paire: un calcul par groupe
+        anderson_results = []
+        for data in group_data:
+            try:
+                ad = distribution_diagnostics.anderson(data)
+                anderson_results.append((ad['statistic'], ad['critical_values'], ad['significance_levels']))
+            except:
+                anderson_results.append((None, None, None))
+        medians = [np.median(data) for data in group_data]
+        
         post_hoc_results = []
-        for i in range(len(groups)):
-            for j in range(i+1, len(groups)):
-                group1_name, group2_name = groups[i], groups[j]
-                group1_data, group2_data = group_data[i], group_data[j]
-                
-                # Mann-Whitney U
-                u_stat, u_p_value = mannwhitneyu(group1_data, group2_data, alternative='two-sided')
-                
-                # Effect size pour Mann-Whitney (r)
-                n1, n2 = len(group1_data), len(group2_data)
-                r_effect = 1 - (2 * u_stat) / (n1 * n2)
-                
-                # Test de Kolmogorov-Smirnov
-                ks_stat, ks_p_value = stats.ks_2samp(group1_data, group2_data)
-                
-                # Test de Anderson-Darling
-                try:
-                    ad_stat, ad_critical, ad_significance = anderson(group1_data, dist='norm')
-                except:
-                    ad_stat, ad_critical, ad_significance = None, None, None
-                
-                post_hoc_results.append({
-                    'group1': group1_name,
-                    'group2': group2_name,
-                    'mann_whitney': {
-                        'u_statistic': u_stat,
-                        'p_value': u_p_value,
-                        'effect_size_r': abs(r_effect),
-                        'significant': u_p_value < 0.05
-                    },
-                    'kolmogorov_smirnov': {
-                        'statistic': ks_stat,
-                        'p_value': ks_p_value,
-                        'significant': ks_p_value < 0.05
-                    },
-                    'anderson_darling': {
-                        'statistic': ad_stat,
-                        'critical_values': ad_critical,
-                        'significance_levels': ad_significance
-                    },
-                    'mean_difference': group1_data.mean() - group2_data.mean(),
-                    'median_difference': group1_data.median() - group2_data.median()
-                })
+        for row, (ks_stat, ks_p_value) in zip(table.itertuples(index=False), ks_results):
+            ad_stat, ad_critical, ad_significance = anderson_results[row.i]
+            post_hoc_results.append({
+                'group1': groups[row.i],
+                'group2': groups[row.j],
+                'mann_whitney': {
+                    'u_statistic': row.u_statistic,
+                    'p_value': row.p_value,
+                    'p_value_holm': row.p_value_adjusted,
+                    'effect_size_r': row.effect_size_r,
+                    'significant': row.p_value < 0.05
+                },
+                'dunn': {
+                    'z_statistic': row.dunn_z,
+                    'p_value': row.dunn_p_value,
+                    'p_value_holm': row.dunn_p_value_adjusted,
+                    'p_value_bh': row.dunn_p_value_bh,
+                    'significant': row.dunn_p_value_adjusted < 0.05
+                },
+                'kolmogorov_smirnov': {
+                    'statistic': ks_stat,
+                    'p_value': ks_p_value,
+                    'significant': ks_p_value < 0.05
+                },
+                'anderson_darling': {
+                    'statistic': ad_stat,
+                    'critical_values': ad_critical,
+                    'significance_levels': ad_significance
+                },
+                'mean_difference': row.mean_diff,
+                'median_difference': medians[row.i] - medians[row.j]
+            })
         
         # Statistiques descriptives ultra-détaillées
         descriptive_stats = []
-        for i, group in enumerate(groups):
-            data = group_data[i]
-            descriptive_stats.append({
-                'group': group,
-                'n': len(data),
-                'mean': data.mean(),
-                'median': data.median(),
-                'std': data.std(),
-                'var': data.var(),
-                'q25': data.quantile(0.25),
-                'q75': data.quantile(0.75),
-                'iqr': data.quantile(0.75) - data.quantile(0.25),
-                'min': data.min(),
-                'max': data.max(),
-                'range': data.max() - data.min(),
-                'skewness': stats.skew(data),
-                'kurtosis': stats.kurtosis(data),
-                'coefficient_of_variation': data.std() / data.mean() if data.mean() != 0 else 0,
+        for i in range(len(groups)):
+            description = grouped.describe(i)
+            # Series sans copie, indexée comme les lignes d'origine (indices des outliers)
+            data = grouped.series(i)
+            description.update({
+                'var': description['std'] ** 2,
+                'iqr': description['q75'] - description['q25'],
+                'range': description['max'] - description['min'],
+                'coefficient_of_variation': description['std'] / description['mean'] if description['mean'] != 0 else 0,
                 'outliers_iqr': self._detect_outliers_iqr(data),
                 'outliers_zscore': self._detect_outliers_zscore(data)
             })
+            descriptive_stats.append(description)
         
-        # Tests de normalité par groupe
+        # Tests de normalité par groupe (chaque test calculé une seule fois)
         normality_tests = []
         for i, group in enumerate(groups):
-            data = group_data[i]
             normality_tests.append({
                 'group': group,
-                'shapiro_wilk': {
-                    'statistic': shapiro(data)[0],
-                    'p_value': shapiro(data)[1],
-                    'normal': shapiro(data)[1] > 0.05
-                },
-                'kolmogorov_smirnov': {
-                    'statistic': kstest(data, 'norm')[0],
-                    'p_value': kstest(data, 'norm')[1],
-                    'normal': kstest(data, 'norm')[1] > 0.05
-                },
-                'jarque_bera': {
-                    'statistic': jarque_bera(data)[0],
-                    'p_value': jarque_bera(data)[1],
-                    'normal': jarque_bera(data)[1] > 0.05
-                }
+                **distribution_diagnostics.normality_tests(group_data[i])
             })
         
         # Tests d'homogénéité des variances
@@ -297,23 +285,7 @@ class UltraAdvancedStatisticalAnalyzer:
         
         # Tests de normalité des résidus
         residuals = data[col2] - data[col1] * correlation
-        normality_tests = {
-            'shapiro_wilk': {
-                'statistic': shapiro(residuals)[0],
-                'p_value': shapiro(residuals)[1],
-                'normal': shapiro(residuals)[1] > 0.05
-            },
-            'kolmogorov_smirnov': {
-                'statistic': kstest(residuals, 'norm')[0],
-                'p_value': kstest(residuals, 'norm')[1],
-                'normal': kstest(residuals, 'norm')[1] > 0.05
-            },
-            'jarque_bera': {
-                'statistic': jarque_bera(residuals)[0],
-                'p_value': jarque_bera(residuals)[1],
-                'normal': jarque_bera(residuals)[1] > 0.05
-            }
-        }
+        normality_tests = distribution_diagnostics.normality_tests(residuals)
         
         # Analyse des outliers avancée
         outliers_analysis = self._ultra_advanced_outlier_detection(data[col1], data[col2])
@@ -373,9 +345,6 @@ class UltraAdvancedStatisticalAnalyzer:
         # Standardiser les features
         X_scaled = self.scaler.fit_transform(X)
         
-        # Diviser en train/test avec validation croisée
-        X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-        
         # Modèles ultra-avancés
         models = {
             'Linear Regression': LinearRegression(),
@@ -389,15 +358,17 @@ class UltraAdvancedStatisticalAnalyzer:
             'MLP Regressor': MLPRegressor(hidden_layer_sizes=(100, 50), random_state=42)
         }
         
+        # Entraînement et validation croisée de tous les modèles en parallèle,
+        # sous budget de temps (les modèles lents sont écartés sur les grands échantillons)
+        tournament = run_tournament(models, X_scaled, y, cv=5, test_size=0.2, random_state=42)
+        y_train, y_test = tournament['y_train'], tournament['y_test']
+        
         model_results = {}
         
-        for name, model in models.items():
-            # Entraîner le modèle
-            model.fit(X_train, y_train)
-            
-            # Prédictions
-            y_pred_train = model.predict(X_train)
-            y_pred_test = model.predict(X_test)
+        for name, fitted in tournament['models'].items():
+            model = fitted['model']
+            y_pred_train = fitted['y_pred_train']
+            y_pred_test = fitted['y_pred_test']
             
             # Métriques avancées
             train_r2 = r2_score(y_train, y_pred_train)
@@ -409,9 +380,9 @@ class UltraAdvancedStatisticalAnalyzer:
             train_evs = explained_variance_score(y_train, y_pred_train)
             test_evs = explained_variance_score(y_test, y_pred_test)
             
-            # Validation croisée avancée
-            cv_scores = cross_val_score(model, X_scaled, y, cv=5, scoring='r2')
-            cv_rmse_scores = cross_val_score(model, X_scaled, y, cv=5, scoring='neg_mean_squared_error')
+            # Validation croisée avancée (R² et MSE issus des mêmes plis)
+            cv_scores = fitted['cv_r2']
+            cv_rmse_scores = -fitted['cv_mse']
             
             # Feature importance
             feature_importance = None
@@ -422,12 +393,13 @@ class UltraAdvancedStatisticalAnalyzer:
             
             # Analyse des résidus
             residuals = y_test - y_pred_test
+            residual_shapiro = distribution_diagnostics.shapiro(residuals)
             residual_analysis = {
                 'mean_residual': residuals.mean(),
                 'std_residual': residuals.std(),
-                'shapiro_stat': shapiro(residuals)[0],
-                'shapiro_p_value': shapiro(residuals)[1],
-                'normal_residuals': shapiro(residuals)[1] > 0.05
+                'shapiro_stat': residual_shapiro['statistic'],
+                'shapiro_p_value': residual_shapiro['p_value'],
+                'normal_residuals': residual_shapiro['normal']
             }
             
             model_results[name] = {
@@ -445,17 +417,23 @@ class UltraAdvancedStatisticalAnalyzer:
                 'cv_rmse_std': np.sqrt(cv_rmse_scores.std()),
                 'feature_importance': feature_importance,
                 'overfitting': train_r2 - test_r2 > 0.1,
-                'residual_analysis': residual_analysis
+                'residual_analysis': residual_analysis,
+                'fit_time': fitted['fit_seconds'],
+                'cv_fit_time': fitted['cv_fit_seconds']
             }
         
+        if not model_results:
+            return None
+        
         # Sélectionner le meilleur modèle
         best_model = max(model_results.keys(), key=lambda x: model_results[x]['test_r2'])
         
         # Optimisation des hyperparamètres pour le meilleur modèle
-        hyperparameter_optimization = self._optimize_hyperparameters(models[best_model], X_scaled, y)
+        best_model_obj = tournament['models'][best_model]['model']
+        hyperparameter_optimization = self._optimize_hyperparameters(best_model_obj, X_scaled, y)
         
         # Analyse de la stabilité du modèle
-        stability_analysis = self._analyze_model_stability(models[best_model], X_scaled, y)
+        stability_analysis = self._analyze_model_stability(best_model_obj, X_scaled, y)
         
         # Feature selection
         feature_selection_results = self._advanced_feature_selection(X, y, feature_cols)
@@ -468,6 +446,7 @@ class UltraAdvancedStatisticalAnalyzer:
             'models_comparison': model_results,
             'best_model': best_model,
             'best_model_performance': model_results[best_model],
+            'tournament': tournament_summary(tournament),
             'hyperparameter_optimization': hyperparameter_optimization,
             'stability_analysis': stability_analysis,
             'feature_selection': feature_selection_results,
@@ -560,25 +539,32 @@ class UltraAdvancedStatisticalAnalyzer:
             'linear_relationship': improvement < 0.05
         }
     
-    def _analyze_correlation_stability(self, x, y):
-        """Analyse la stabilité de la corrélation"""
-        # Corrélation par fenêtres glissantes
-        window_size = max(10, len(x) // 10)
-        correlations = []
-        
-        for i in range(len(x) - window_size + 1):
-            window_x = x.iloc[i:i+window_size]
-            window_y = y.iloc[i:i+window_size]
-            corr, _ = stats.spearmanr(window_x, window_y)
-            correlations.append(corr)
+    def _analyze_correlation_stability(self, x, y, window_size=None, stride=None, max_windows=None):
+        """Analyse la stabilité de la corrélation
+        
+        Les fenêtres glissantes sont évaluées avec un pas (au plus max_windows
+        fenêtres, ROLLING_MAX_WINDOWS par défaut) et classées de manière vectorisée.
+        """
+        window_size = window_size or max(10, len(x) // 10)
+        starts, correlations = rolling_spearman(x, y, window_size, stride=stride, max_windows=max_windows)
+        if len(correlations) == 0:
+            # Moins d'observations que la taille d'une fenêtre
+            correlations = np.array([np.nan])
         
         return {
             'window_size': window_size,
+            'stride': int(starts[1] - starts[0]) if len(starts) > 1 else 1,
+            'n_windows': len(starts),
             'mean_correlation': np.mean(correlations),
             'std_correlation': np.std(correlations),
             'min_correlation': np.min(correlations),
             'max_correlation': np.max(correlations),
-            'stability': np.std(correlations) < 0.2
+            'stability': np.std(correlations) < 0.2,
+            # Courbe complète pour les graphiques (position de début de chaque fenêtre)
+            'curve': {
+                'window_start': starts.tolist(),
+                'correlation': correlations.tolist()
+            }
         }
     
     def _calculate_partial_correlation(self, x, y):
@@ -596,53 +582,41 @@ class UltraAdvancedStatisticalAnalyzer:
             return None
     
     def _optimize_hyperparameters(self, model, X, y):
-        """Optimise les hyperparamètres du modèle"""
-        # Paramètres à optimiser selon le type de modèle
-        param_grids = {
-            'Ridge': {'alpha': [0.1, 1.0, 10.0, 100.0]},
-            'Lasso': {'alpha': [0.01, 0.1, 1.0, 10.0]},
-            'Random Forest': {'n_estimators': [50, 100, 200], 'max_depth': [None, 10, 20]},
-            'Gradient Boosting': {'n_estimators': [50, 100, 200], 'learning_rate': [0.01, 0.1, 0.2]}
-        }
-        
-        model_name = type(model).__name__
-        if model_name in param_grids:
-            try:
-                grid_search = GridSearchCV(model, param_grids[model_name], cv=3, scoring='r2')
-                grid_search.fit(X, y)
-                return {
-                    'best_params': grid_search.best_params_,
-                    'best_score': grid_search.best_score_,
-                    'optimization_successful': True
-                }
-            except:
-                return {'optimization_successful': False}
-        else:
+        """Optimise les hyperparamètres du modèle (divisions successives, en parallèle)"""
+        try:
+            search = successive_halving_search(model, X, y, cv=3, refit=False)
+        except Exception:
             return {'optimization_successful': False}
+        if search is None:
+            return {'optimization_successful': False}
+        
+        return {
+            'best_params': search['best_params'],
+            'best_score': search['best_score'],
+            'resource': search['resource'],
+            'rungs': search['rungs'],
+            'n_candidates': search['n_candidates'],
+            'n_fits': search['n_fits'],
+            'cache_hits': search['cache_hits'],
+            'sample_size': search['sample_size'],
+            'optimization_successful': True
+        }
     
-    def _analyze_model_stability(self, model, X, y):
-        """Analyse la stabilité du modèle"""
-        # Bootstrap pour évaluer la stabilité
-        n_bootstrap = 100
-        r2_scores = []
-        
-        for _ in range(n_bootstrap):
-            # Échantillonnage bootstrap
-            indices = np.random.choice(len(X), size=len(X), replace=True)
-            X_bootstrap = X[indices]
-            y_bootstrap = y.iloc[indices]
-            
-            # Entraîner et évaluer
-            model.fit(X_bootstrap, y_bootstrap)
-            r2 = model.score(X_bootstrap, y_bootstrap)
-            r2_scores.append(r2)
+    def _analyze_model_stability(self, model, X, y, n_bootstrap=100, seed=42):
+        """Analyse la stabilité du modèle (bootstrap parallèle, R² hors sac)"""
+        bootstrap = bootstrap_scores(model, X, y, n_bootstrap=n_bootstrap, seed=seed)
+        r2_scores = bootstrap['scores']
         
         return {
-            'bootstrap_r2_mean': np.mean(r2_scores),
-            'bootstrap_r2_std': np.std(r2_scores),
-            'bootstrap_r2_min': np.min(r2_scores),
-            'bootstrap_r2_max': np.max(r2_scores),
-            'stability': np.std(r2_scores) < 0.1
+            'bootstrap_r2_mean': np.nanmean(r2_scores),
+            'bootstrap_r2_std': np.nanstd(r2_scores),
+            'bootstrap_r2_min': np.nanmin(r2_scores),
+            'bootstrap_r2_max': np.nanmax(r2_scores),
+            'bootstrap_r2_ci': (bootstrap['ci_low'], bootstrap['ci_high']),
+            'n_resamples': bootstrap['n_resamples'],
+            'early_stopped': bootstrap['early_stopped'],
+            'scoring': 'out_of_bag',
+            'stability': np.nanstd(r2_scores) < 0.1
         }
     
     def _advanced_feature_selection(self, X, y, feature_cols):
@@ -878,7 +852,8 @@ class UltraAdvancedStatisticalAnalyzer:
             return None
         
         # Test de Kolmogorov-Smirnov
-        ks_statistic, p_value = kstest(data, distribution)
+        ks_result = distribution_diagnostics.kstest(data, distribution)
+        ks_statistic, p_value = ks_result['statistic'], ks_result['p_value']
         
         # Effect size (D statistic)
         effect_size = ks_statistic
@@ -902,26 +877,13 @@ class UltraAdvancedStatisticalAnalyzer:
             'max': data.max(),
             'skewness': stats.skew(data),
             'kurtosis': stats.kurtosis(data),
-            'shapiro_wilk': {
-                'statistic': shapiro(data)[0],
-                'p_value': shapiro(data)[1],
-                'normal': shapiro(data)[1] > 0.05
-            }
+            'shapiro_wilk': distribution_diagnostics.shapiro(data)
         }
         
         # Test de normalité supplémentaire
-        additional_tests = {
-            'jarque_bera': {
-                'statistic': jarque_bera(data)[0],
-                'p_value': jarque_bera(data)[1],
-                'normal': jarque_bera(data)[1] > 0.05
-            },
-            'anderson_darling': {
-                'statistic': anderson(data, dist='norm')[0],
-                'critical_values': anderson(data, dist='norm')[1],
-                'significance_levels': anderson(data, dist='norm')[2]
-            }
-        }
+        additional_tests = distribution_diagnostics.normality_tests(
+            data, tests=('jarque_bera', 'anderson_darling')
+        )
         
         # Analyse des outliers
         outliers_analysis = self._detect_outliers_iqr(data)
@@ -1037,18 +999,9 @@ class UltraAdvancedStatisticalAnalyzer:
         # Test de normalité des différences
         if len(columns) == 2:
             differences = data[columns[0]] - data[columns[1]]
-            normality_differences = {
-                'shapiro_wilk': {
-                    'statistic': shapiro(differences)[0],
-                    'p_value': shapiro(differences)[1],
-                    'normal': shapiro(differences)[1] > 0.05
-                },
-                'jarque_bera': {
-                    'statistic': jarque_bera(differences)[0],
-                    'p_value': jarque_bera(differences)[1],
-                    'normal': jarque_bera(differences)[1] > 0.05
-                }
-            }
+            normality_differences = distribution_diagnostics.normality_tests(
+                differences, tests=('shapiro_wilk', 'jarque_bera')
+            )
         else:
             normality_differences = None
         
@@ -6,6 +6,8 @@ Helpers et fonctions communes
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import hashlib
+import json
 import re
 
 def validate_email(email):
@@ -99,6 +101,38 @@ def detect_outliers(series, method='iqr', threshold=1.5):
     
     return pd.Series([False] * len(series))
 
+def dataframe_fingerprint(df, columns=None):
+    """
+    Calcule une empreinte stable du contenu d'un DataFrame
+    
+    L'empreinte dépend des valeurs, des noms et des types des colonnes (pas de
+    l'index) et se calcule de manière vectorisée avec hash_pandas_object.
+    
+    Parameters:
+    df (pd.DataFrame): DataFrame à identifier
+    columns (list): Colonnes à prendre en compte (toutes par défaut)
+    
+    Returns:
+    str: Empreinte SHA-256 hexadécimale
+    """
+    if columns is not None:
+        df = df[list(columns)]
+    
+    digest = hashlib.sha256()
+    schema = [(str(col), str(dtype)) for col, dtype in df.dtypes.items()]
+    digest.update(json.dumps(schema).encode('utf-8'))
+    digest.update(str(len(df)).encode('utf-8'))
+    
+    if len(df.columns) > 0:
+        try:
+            row_hashes = pd.util.hash_pandas_object(df, index=False)
+        except TypeError:
+            # Valeurs non hachables (listes, dictionnaires): hachage de leur représentation texte
+            row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+        digest.update(row_hashes.to_numpy().tobytes())
+    
+    return digest.hexdigest()
+
 def normalize_platform_name(platform):
     """
     Normalise le nom d'une plateforme
@@ -9,6 +9,22 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
+from plot_downsampling import (
+    SCATTER_POINT_BUDGET, SCATTER_HEATMAP_MIN_ROWS, sample_positions, linear_fit_by_group, binned_counts,
+    box_statistics
+)
+from histograms import compute_histogram
+from correlation_matrix import correlation_matrices
+from time_series import prepare_time_series, series_window, time_bounds, RESAMPLE_RULES, RESAMPLE_LABELS
+from group_aggregation import aggregate_by_group, metric_spec
+
+# Statistiques d'engagement par groupe (nom, colonne source, fonction)
+ENGAGEMENT_COMPARISON_SPEC = [
+    ('mean_engagement', 'engagement_rate', 'mean'),
+    ('std_engagement', 'engagement_rate', 'std'),
+    ('count', 'engagement_rate', 'count'),
+]
+
 class DataVisualizer:
     def __init__(self, df):
         """
@@ -26,8 +42,7 @@ class DataVisualizer:
             return None
         
         # Calculer les moyennes par groupe
-        engagement_by_group = self.df.groupby(group_by)['engagement_rate'].agg(['mean', 'std', 'count']).reset_index()
-        engagement_by_group.columns = [group_by, 'mean_engagement', 'std_engagement', 'count']
+        engagement_by_group = aggregate_by_group(self.df, group_by, ENGAGEMENT_COMPARISON_SPEC).reset_index()
         
         # Créer le graphique en barres
         fig = px.bar(
@@ -53,21 +68,50 @@ class DataVisualizer:
         return fig
     
     def plot_likes_distribution(self, group_by='platform'):
-        """Distribution des likes par plateforme avec box plot"""
+        """
+        Distribution des likes par plateforme avec box plot
+        
+        Quartiles, moustaches et échantillon borné de valeurs aberrantes sont
+        calculés ici: la taille de la figure ne dépend pas du nombre de lignes.
+        """
         if 'likes' not in self.df.columns or group_by not in self.df.columns:
             return None
         
-        fig = px.box(
-            self.df,
-            x=group_by,
-            y='likes',
-            title=f'Distribution des likes par {group_by}',
-            labels={'likes': 'Nombre de likes', group_by: group_by.capitalize()},
-            color=group_by,
-            color_discrete_sequence=self.color_palette
-        )
+        likes = pd.to_numeric(self.df['likes'], errors='coerce').to_numpy(dtype=float)
+        codes, labels = pd.factorize(self.df[group_by], sort=False)
+        valid = np.isfinite(likes) & (codes >= 0)
+        boxes = box_statistics(likes[valid], codes[valid], len(labels))
+        
+        fig = go.Figure()
+        for i, label in enumerate(labels):
+            if boxes['n'][i] == 0:
+                continue
+            color = self.color_palette[i % len(self.color_palette)]
+            fig.add_trace(go.Box(
+                x=[label],
+                q1=[boxes['q1'][i]],
+                median=[boxes['median'][i]],
+                q3=[boxes['q3'][i]],
+                lowerfence=[boxes['lowerfence'][i]],
+                upperfence=[boxes['upperfence'][i]],
+                name=str(label),
+                marker_color=color,
+                boxpoints=False
+            ))
+            if len(boxes['outliers'][i]):
+                fig.add_trace(go.Scatter(
+                    x=[label] * len(boxes['outliers'][i]),
+                    y=boxes['outliers'][i],
+                    mode='markers',
+                    name=str(label),
+                    marker=dict(color=color, size=4),
+                    hovertemplate='%{y}<extra></extra>'
+                ))
         
         fig.update_layout(
+            title=f'Distribution des likes par {group_by}',
+            xaxis_title=group_by.capitalize(),
+            yaxis_title='Nombre de likes',
             height=500,
             showlegend=False,
             plot_bgcolor='rgba(0,0,0,0)',
@@ -76,15 +120,15 @@ class DataVisualizer:
         
         return fig
     
-    def plot_correlation_heatmap(self):
-        """Heatmap des corrélations entre variables numériques"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+    def plot_correlation_heatmap(self, method='pearson'):
+        """Heatmap des corrélations entre variables numériques ('pearson' ou 'spearman')"""
+        # Matrices partagées avec les analyses (calculées une fois par jeu de données)
+        matrices = correlation_matrices(self.df)
         
-        if len(numeric_cols) < 2:
+        if matrices is None:
             return None
         
-        # Calculer la matrice de corrélation
-        corr_matrix = self.df[numeric_cols].corr()
+        corr_matrix = matrices[method]
         
         fig = go.Figure(data=go.Heatmap(
             z=corr_matrix.values,
@@ -108,35 +152,44 @@ class DataVisualizer:
         
         return fig
     
-    def plot_time_series(self, date_column='date', metric='likes', group_by='platform'):
-        """Graphique d'évolution temporelle d'une métrique"""
+    def plot_time_series(self, date_column='date', metric='likes', group_by='platform',
+                         start=None, end=None, max_points=None):
+        """
+        Graphique d'évolution temporelle d'une métrique
+        
+        Les dates sont préparées une seule fois par jeu de données (self.df n'est
+        pas modifié). Chaque série est agrégée à un intervalle adapté puis réduite
+        (LTTB) à max_points points (TIME_SERIES_POINT_BUDGET par défaut); une
+        fenêtre [start, end] plus étroite est rendue plus finement.
+        """
         if date_column not in self.df.columns or metric not in self.df.columns:
             return None
         
-        # Convertir en datetime si nécessaire
-        if not pd.api.types.is_datetime64_any_dtype(self.df[date_column]):
-            self.df[date_column] = pd.to_datetime(self.df[date_column], errors='coerce')
+        group_by = group_by if group_by in self.df.columns else None
+        prepared = prepare_time_series(self.df, date_column, metric, group_by)
+        series = series_window(prepared, start, end, max_points)
         
-        if group_by in self.df.columns:
-            fig = px.line(
-                self.df.sort_values(date_column),
-                x=date_column,
-                y=metric,
-                color=group_by,
-                title=f'Évolution de {metric} dans le temps',
-                labels={metric: metric.capitalize(), date_column: 'Date'},
-                color_discrete_sequence=self.color_palette
-            )
-        else:
-            fig = px.line(
-                self.df.sort_values(date_column),
-                x=date_column,
-                y=metric,
-                title=f'Évolution de {metric} dans le temps',
-                labels={metric: metric.capitalize(), date_column: 'Date'}
-            )
+        fig = go.Figure()
+        for i, entry in enumerate(series):
+            fig.add_trace(go.Scatter(
+                x=entry['dates'],
+                y=entry['values'],
+                mode='lines',
+                name=str(entry['label']) if entry['label'] is not None else metric,
+                line=dict(color=self.color_palette[i % len(self.color_palette)]),
+                showlegend=entry['label'] is not None
+            ))
+        
+        title = f'Évolution de {metric} dans le temps'
+        rules = [rule for rule, _, _ in RESAMPLE_RULES if rule in {entry['rule'] for entry in series}]
+        if rules:
+            title += f" (moyenne par {' / '.join(RESAMPLE_LABELS[rule] for rule in rules)})"
         
         fig.update_layout(
+            title=title,
+            xaxis_title='Date',
+            yaxis_title=metric.capitalize(),
+            legend_title_text=group_by.capitalize() if group_by else None,
             height=500,
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)'
@@ -144,11 +197,28 @@ class DataVisualizer:
         
         return fig
     
-    def plot_scatter_with_regression(self, x_col, y_col, group_by='platform'):
-        """Graphique de dispersion avec ligne de régression"""
+    def time_series_bounds(self, date_column='date', metric='likes', group_by='platform'):
+        """Première et dernière date valides (bornes de la fenêtre de zoom)"""
+        if date_column not in self.df.columns or metric not in self.df.columns:
+            return None
+        group_by = group_by if group_by in self.df.columns else None
+        return time_bounds(prepare_time_series(self.df, date_column, metric, group_by))
+    
+    def plot_scatter_with_regression(self, x_col, y_col, group_by='platform', point_budget=None, large_mode='auto'):
+        """
+        Graphique de dispersion avec ligne de régression
+        
+        Au-delà de point_budget lignes (SCATTER_POINT_BUDGET par défaut), le rendu
+        passe en mode grands volumes (voir _plot_large_scatter). large_mode:
+        'auto', 'sample' (échantillon WebGL) ou 'heatmap' (histogramme 2D).
+        """
         if x_col not in self.df.columns or y_col not in self.df.columns:
             return None
         
+        point_budget = SCATTER_POINT_BUDGET if point_budget is None else point_budget
+        if len(self.df) > point_budget:
+            return self._plot_large_scatter(x_col, y_col, group_by, point_budget, large_mode)
+        
         if group_by in self.df.columns:
             fig = px.scatter(
                 self.df,
@@ -178,6 +248,87 @@ class DataVisualizer:
         
         return fig
     
+    def _plot_large_scatter(self, x_col, y_col, group_by, point_budget, large_mode='auto'):
+        """
+        Nuage de points grands volumes: Scattergl sur un échantillon stratifié par
+        groupe, ou histogramme 2D précalculé; droites de régression calculées sur
+        toutes les lignes à partir de statistiques suffisantes
+        """
+        x = pd.to_numeric(self.df[x_col], errors='coerce').to_numpy(dtype=float)
+        y = pd.to_numeric(self.df[y_col], errors='coerce').to_numpy(dtype=float)
+        valid = np.isfinite(x) & np.isfinite(y)
+        x, y = x[valid], y[valid]
+        
+        if group_by in self.df.columns:
+            codes, labels = pd.factorize(self.df[group_by].to_numpy()[valid], sort=False)
+            keep = codes >= 0
+            x, y, codes = x[keep], y[keep], codes[keep]
+            labels = list(labels)
+        else:
+            codes, labels = None, [None]
+        
+        if large_mode == 'auto':
+            large_mode = 'heatmap' if len(x) >= SCATTER_HEATMAP_MIN_ROWS else 'sample'
+        
+        fig = go.Figure()
+        if large_mode == 'heatmap':
+            x_centers, y_centers, counts = binned_counts(x, y)
+            fig.add_trace(go.Heatmap(
+                x=x_centers,
+                y=y_centers,
+                z=counts,
+                colorscale='Viridis',
+                colorbar=dict(title="Nombre de posts"),
+                hovertemplate=f"{x_col}: %{{x}}<br>{y_col}: %{{y}}<br>Posts: %{{z}}<extra></extra>"
+            ))
+            subtitle = f"densité de {len(x):,} posts".replace(',', ' ')
+        else:
+            positions = sample_positions(len(x), point_budget, codes)
+            sample_codes = codes[positions] if codes is not None else np.zeros(len(positions), dtype=int)
+            for i, label in enumerate(labels):
+                selected = positions[sample_codes == i]
+                fig.add_trace(go.Scattergl(
+                    x=x[selected],
+                    y=y[selected],
+                    mode='markers',
+                    name=str(label) if label is not None else y_col,
+                    legendgroup=str(label),
+                    marker=dict(color=self.color_palette[i % len(self.color_palette)], size=4, opacity=0.6),
+                    showlegend=label is not None
+                ))
+            subtitle = f"échantillon de {len(positions):,} posts sur {len(x):,}".replace(',', ' ')
+        
+        # Droites de régression sur toutes les lignes
+        fit = linear_fit_by_group(x, y, codes, len(labels))
+        for i, label in enumerate(labels):
+            if not np.isfinite(fit['slope'][i]):
+                continue
+            x_line = np.array([fit['x_min'][i], fit['x_max'][i]])
+            fig.add_trace(go.Scatter(
+                x=x_line,
+                y=fit['intercept'][i] + fit['slope'][i] * x_line,
+                mode='lines',
+                name=f"Tendance {label}" if label is not None else 'Tendance',
+                legendgroup=str(label),
+                line=dict(color=self.color_palette[i % len(self.color_palette)], width=2),
+                hovertemplate=(
+                    f"{y_col} = {fit['slope'][i]:.4g} * {x_col} + {fit['intercept'][i]:.4g}"
+                    f"<br>R² = {fit['r2'][i]:.3f} (n = {int(fit['n'][i])})<extra></extra>"
+                ),
+                showlegend=False
+            ))
+        
+        fig.update_layout(
+            title=f'Relation entre {x_col} et {y_col} ({subtitle})',
+            xaxis_title=x_col.capitalize(),
+            yaxis_title=y_col.capitalize(),
+            height=500,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig
+    
     def plot_top_performers(self, metric='likes', top_n=10, group_by='platform'):
         """Graphique des meilleurs performances"""
         if metric not in self.df.columns:
@@ -211,31 +362,53 @@ class DataVisualizer:
         
         return fig
     
-    def plot_metric_distribution_histogram(self, metric='likes'):
-        """Histogramme de distribution d'une métrique"""
+    def plot_metric_distribution_histogram(self, metric='likes', bins='auto'):
+        """
+        Histogramme de distribution d'une métrique
+        
+        Les classes sont calculées ici (voir histograms.compute_histogram): seuls
+        les effectifs sont envoyés au graphique. Avec des classes logarithmiques,
+        l'axe horizontal est gradué en log(1 + valeur).
+        """
         if metric not in self.df.columns:
             return None
         
-        fig = px.histogram(
-            self.df,
-            x=metric,
-            nbins=30,
-            title=f'Distribution de {metric}',
-            labels={metric: metric.capitalize(), 'count': 'Fréquence'},
-            color_discrete_sequence=['#4ECDC4']
-        )
+        histogram = compute_histogram(self.df, metric, bins)
+        if histogram is None:
+            return None
+        
+        edges, mean_value = histogram['edges'], histogram['mean']
+        log_scale = histogram['scale'] == 'log'
+        position = np.log1p(edges) if log_scale else edges
+        
+        fig = go.Figure(go.Bar(
+            x=(position[:-1] + position[1:]) / 2,
+            y=histogram['counts'],
+            width=np.diff(position),
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            hovertemplate='%{customdata[0]:,.4~g} – %{customdata[1]:,.4~g}<br>Fréquence: %{y}<extra></extra>',
+            marker_color='#4ECDC4'
+        ))
         
         # Ajouter une ligne de moyenne
-        mean_value = self.df[metric].mean()
         fig.add_vline(
-            x=mean_value,
+            x=np.log1p(mean_value) if log_scale else mean_value,
             line_dash="dash",
             line_color="red",
             annotation_text=f"Moyenne: {mean_value:.2f}",
             annotation_position="top"
         )
         
+        if log_scale:
+            ticks = 10.0 ** np.arange(0, np.ceil(np.log10(edges[-1] + 1)) + 1)
+            ticks = np.concatenate([[0], ticks[ticks <= edges[-1] * 10]])
+            fig.update_xaxes(tickvals=np.log1p(ticks), ticktext=[f"{tick:,.0f}".replace(',', ' ') for tick in ticks])
+        
         fig.update_layout(
+            title=f'Distribution de {metric}' + (' (échelle logarithmique)' if log_scale else ''),
+            xaxis_title=metric.capitalize(),
+            yaxis_title='Fréquence',
+            bargap=0,
             height=500,
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
@@ -263,17 +436,21 @@ class DataVisualizer:
         if platforms is None:
             platforms = self.df['platform'].unique()[:5]  # Max 5 plateformes
         
-        # Normaliser les données (0-100)
+        # Moyennes de toutes les plateformes en une seule agrégation, puis normalisation (0-100)
+        means = aggregate_by_group(self.df, 'platform', metric_spec(metrics, {'mean': 'mean'}), sort=False)
+        means = means.reindex(platforms)
+        min_vals = self.df[metrics].min()
+        max_vals = self.df[metrics].max()
+        
         normalized_data = []
         
         for platform in platforms:
-            platform_data = self.df[self.df['platform'] == platform]
             values = []
             
             for metric in metrics:
-                max_val = self.df[metric].max()
-                min_val = self.df[metric].min()
-                mean_val = platform_data[metric].mean()
+                max_val = max_vals[metric]
+                min_val = min_vals[metric]
+                mean_val = means.loc[platform, f'{metric}_mean']
                 
                 # Normalisation
                 if max_val != min_val: